@@ -1,23 +1,17 @@
-﻿from flask import Flask, render_template, request, jsonify
-from flask_sqlalchemy import SQLAlchemy
-from flask_cors import CORS
-import tweepy
-import os
-from dotenv import load_dotenv
-import schedule
-import time
-import threading
-from datetime import datetime
-import requests
-from twilio.rest import Client
-
-# Load environment variables
-load_dotenv()
-
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///twitter_scanner.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key-here')
-
-db = SQLAlchemy(app)
-CORS(app)
+﻿"""
+Twitter Scanner default entry point
+Same setup as app_telegram.py; run.py imports app and db from here
+"""
+
+from twitter_scanner import create_app, db
+
+app = create_app('default')
+
+
+if __name__ == '__main__':
+    print("🚀 Starting web server...")
+    print("📱 Open your browser to: http://localhost:5000")
+    print("=" * 50)
+
+    # The reloader would import this module twice and start a second scheduler
+    app.run(debug=True, host='0.0.0.0', port=5000, use_reloader=False)
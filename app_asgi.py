@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+ASGI version of Twitter Scanner
+Same setup as app.py, but scans run as tasks on the server's event loop and
+dashboards can follow them live at /api/events. Run it with:
+    uvicorn app_asgi:app --host 0.0.0.0 --port $PORT
+"""
+
+import os
+
+from twitter_scanner.asgi import create_asgi_app
+
+app = create_asgi_app('default')
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.getenv('PORT', '8000'))
+    print("🚀 Starting ASGI server...")
+    print(f"📱 Open your browser to: http://localhost:{port}")
+    print("=" * 50)
+
+    uvicorn.run(app, host='0.0.0.0', port=port)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark for GET /api/accounts serialization
+Seeds 10k accounts into an in-memory app and compares to_dict() + jsonify
+with the column-only rows and fast encoder the endpoint uses now
+Usage: python bench_api.py [accounts] [repeats]
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+from flask import jsonify
+
+from twitter_scanner import create_app, db, MonitoredAccount
+from twitter_scanner.serialization import account_dicts, json_response, orjson
+
+
+def _best_of(repeats, func):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with mock.patch('twitter_scanner.notifier.TelegramBot.test_connection', return_value=False):
+        app = create_app('serverless', STORE='memory')
+
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.bulk_insert_mappings(MonitoredAccount, [
+            {'username': f'account_{i}', 'display_name': f'Account {i}', 'profile_image_url': '',
+             'created_at': now - timedelta(days=i % 365), 'last_checked': now - timedelta(minutes=i % 60),
+             'last_seen_post_id': str(1_800_000_000_000_000_000 + i), 'last_seen_post_at': now}
+            for i in range(count)
+        ])
+        db.session.commit()
+
+    print(f"🧪 Serializing {count:,} accounts (encoder: {'orjson' if orjson else 'json'})...")
+
+    with app.test_request_context('/api/accounts'):
+        def old():
+            db.session.expire_all()
+            return jsonify([account.to_dict() for account in MonitoredAccount.query.all()]).get_data()
+
+        def new():
+            return json_response(account_dicts(MonitoredAccount.query.order_by(MonitoredAccount.id))).get_data()
+
+        assert len(old()) > 0 and new()
+        before = _best_of(repeats, old)
+        after = _best_of(repeats, new)
+
+    print(f"   to_dict + jsonify: {before * 1000:7.1f} ms")
+    print(f"   columns + encoder: {after * 1000:7.1f} ms ({before / after:.1f}x faster)")
+
+    # End to end through the route, bypassing the response cache with a fresh query string
+    client = app.test_client()
+    start = time.perf_counter()
+    for i in range(repeats):
+        assert client.get(f'/api/accounts?bench={i}').status_code == 200
+    print(f"   GET /api/accounts: {(time.perf_counter() - start) / repeats * 1000:7.1f} ms per request")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Load test: gunicorn (WSGI, as deployed) against uvicorn (ASGI entry point)
+Seeds a SQLite database, starts each server on a free local port with the
+render profile (mock posts, no scheduler) and hammers it with concurrent
+clients. The uvicorn run is repeated with idle SSE clients attached to
+show what holding them costs.
+Usage: python bench_asgi.py [seconds] [clients] [sse_clients]
+Needs gunicorn, uvicorn and httpx (pip install -r requirements_asgi.txt).
+"""
+
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from unittest import mock
+
+from twitter_scanner import create_app, db, MonitoredAccount
+
+
+def asgi_app():
+    """uvicorn --factory target"""
+    from twitter_scanner.asgi import create_asgi_app
+    return create_asgi_app('render')
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _rss_mb(pid):
+    """Resident memory of a process and its children, in MB (Linux only)"""
+    total = 0
+    pids = [pid] + [int(p) for p in subprocess.run(['pgrep', '-P', str(pid)], capture_output=True,
+                                                   text=True).stdout.split()]
+    for p in pids:
+        try:
+            with open(f'/proc/{p}/status') as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith('VmRSS'))
+        except (OSError, StopIteration):
+            pass
+    return total / 1024
+
+
+async def _get(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n\r\n'.encode())
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    await reader.read()
+    writer.close()
+    return status
+
+
+async def _hammer(port, path, seconds, clients):
+    latencies = []
+    errors = 0
+    stop = time.monotonic() + seconds
+
+    async def client():
+        nonlocal errors
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            try:
+                ok = await _get(port, path) == 200
+            except OSError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    await asyncio.gather(*(client() for _ in range(clients)))
+    latencies.sort()
+    return {
+        'rps': len(latencies) / seconds,
+        'p50': latencies[len(latencies) // 2] * 1000 if latencies else None,
+        'p99': latencies[int(len(latencies) * 0.99)] * 1000 if latencies else None,
+        'errors': errors,
+    }
+
+
+async def _hold_sse(port, count):
+    """Open `count` SSE connections and keep them; returns the writers to close later"""
+    writers = []
+    for _ in range(count):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b'GET /api/events HTTP/1.1\r\nHost: bench\r\n\r\n')
+        await writer.drain()
+        await reader.readuntil(b'\r\n\r\n')
+        writers.append(writer)
+    return writers
+
+
+def _wait_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if asyncio.run(_get(port, '/health')) == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+def _report(label, results, rss):
+    for path, r in results.items():
+        print(f"   {label:<28} {path:<22} {r['rps']:8.0f} req/s   p50 {r['p50']:7.1f} ms   "
+              f"p99 {r['p99']:7.1f} ms   errors {r['errors']}")
+    print(f"   {'':<28} RSS {rss:.0f} MB")
+
+
+def _run_server(label, command, env, seconds, clients, sse_clients=0):
+    port = _free_port()
+    command = [arg.replace('{port}', str(port)) for arg in command]
+    server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_ready(port)
+        paths = ['/health', '/api/accounts', '/api/scanner-status']
+        _report(label, {path: asyncio.run(_hammer(port, path, seconds, clients)) for path in paths},
+                _rss_mb(server.pid))
+
+        if sse_clients:
+            async def with_sse():
+                writers = await _hold_sse(port, sse_clients)
+                held = _rss_mb(server.pid)
+                results = {path: await _hammer(port, path, seconds, clients) for path in paths}
+                for writer in writers:
+                    writer.close()
+                return results, held
+
+            results, held = asyncio.run(with_sse())
+            _report(f"{label} + {sse_clients} SSE", results, held)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(10)
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    sse_clients = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+
+    workdir = tempfile.mkdtemp(prefix='bench_asgi_')
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+               TELEGRAM_BOT_TOKEN='', TELEGRAM_CHAT_ID='', PYTHONPATH=os.getcwd())
+    os.environ.update(env)
+    with mock.patch('twitter_scanner.notifier.TelegramBot.test_connection', return_value=False):
+        app = create_app('render')
+    with app.app_context():
+        db.session.bulk_insert_mappings(MonitoredAccount, [
+            {'username': f'account_{i}', 'display_name': f'Account {i}', 'profile_image_url': '',
+             'created_at': datetime.utcnow()} for i in range(1000)
+        ])
+        db.session.commit()
+
+    print(f"🧪 {clients} clients for {seconds:.0f}s per endpoint, 1,000 accounts, SQLite")
+    for workers in (1, 4):
+        _run_server(f"gunicorn sync x{workers}",
+                    ['gunicorn', '--bind', '127.0.0.1:{port}', '--workers', str(workers), 'app_render:app'],
+                    env, seconds, clients)
+    _run_server("uvicorn (1 process)",
+                ['uvicorn', '--factory', 'bench_asgi:asgi_app', '--host', '127.0.0.1', '--port', '{port}',
+                 '--log-level', 'warning', '--backlog', '4096', '--limit-concurrency', '10000'],
+                env, seconds, clients, sse_clients)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark for scraped post records
+Holds 1M posts as the old dicts and as ScrapedPost records and compares memory
+Usage: python bench_records.py [count] [accounts]
+"""
+
+import gc
+import sys
+import tracemalloc
+from datetime import datetime
+
+from twitter_scanner.records import ScrapedPost
+
+
+def _as_dicts(count, usernames, now):
+    posts = []
+    for i in range(count):
+        username = usernames[i % len(usernames)]
+        tweet_id = str(1_800_000_000_000_000_000 + i)
+        posts.append({
+            'id': tweet_id,
+            'url': f"https://twitter.com/{username}/status/{tweet_id}",
+            'text': 'x',
+            'created_at': now,
+            'pinned': False
+        })
+    return posts
+
+
+def _as_records(count, usernames, now):
+    posts = []
+    for i in range(count):
+        # Fresh username strings per post, as the HTML parser would hand them over
+        username = ''.join(usernames[i % len(usernames)])
+        posts.append(ScrapedPost(str(1_800_000_000_000_000_000 + i), username, 'x', now))
+    return posts
+
+
+def _measure(build, count, usernames, now):
+    gc.collect()
+    tracemalloc.start()
+    posts = build(count, usernames, now)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del posts
+    return size
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    accounts = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    usernames = [f'account_{n}' for n in range(accounts)]
+    # Text and timestamps are shared so only the per-post overhead is measured
+    now = datetime.now()
+
+    print(f"🧪 Holding {count:,} posts from {accounts} accounts...")
+    before = _measure(_as_dicts, count, usernames, now)
+    after = _measure(_as_records, count, usernames, now)
+
+    print(f"   dict:        {before / 2**20:7.1f} MiB ({before / count:.0f} bytes per post)")
+    print(f"   ScrapedPost: {after / 2**20:7.1f} MiB ({after / count:.0f} bytes per post)")
+    print(f"   Saved {(before - after) / 2**20:.1f} MiB ({(1 - after / before) * 100:.0f}%)")
+
+
+if __name__ == '__main__':
+    main()
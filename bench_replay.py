@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark scan passes against a recorded cassette
+Replays a cassette recorded with HTTP_CASSETTE_MODE=record into an in-memory
+app, so parser and persistence changes can be compared on real pages offline
+Usage: python bench_replay.py cassette.ndjson.gz [passes] [speed]
+"""
+
+import os
+import re
+import sys
+import time
+from unittest import mock
+
+PROFILE_URL_RE = re.compile(r'^https://(?:twitter|x)\.com/(\w{1,15})$')
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    path = sys.argv[1]
+    passes = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    speed = sys.argv[3] if len(sys.argv) > 3 else '0'
+
+    os.environ.update({'HTTP_CASSETTE_MODE': 'replay', 'HTTP_CASSETTE_PATH': path,
+                       'HTTP_CASSETTE_SPEED': speed, 'SCRAPER_RATE_LIMIT': '0'})
+    os.environ.setdefault('TELEGRAM_BOT_TOKEN', 'replay')
+    os.environ.setdefault('TELEGRAM_CHAT_ID', '0')
+
+    from twitter_scanner import create_app, db, MonitoredAccount
+    from twitter_scanner.cassette import read_cassette
+
+    usernames = sorted({match.group(1) for match in
+                        (PROFILE_URL_RE.match(entry['url']) for entry in read_cassette(path)) if match})
+    if not usernames:
+        print(f"❌ No profile pages in {path}")
+        sys.exit(1)
+
+    with mock.patch('twitter_scanner.notifier.TelegramBot.test_connection', return_value=False):
+        app = create_app('default', STORE='memory', SCHEDULER=False, SCAN_DELAY_SECONDS=0)
+    services = app.extensions['twitter_scanner']
+    with app.app_context():
+        db.session.add_all(MonitoredAccount(username=name, display_name=name) for name in usernames)
+        db.session.commit()
+
+    print(f"📼 Replaying {path}: {len(usernames)} accounts, {passes} passes, speed {speed}")
+    for i in range(passes):
+        start = time.perf_counter()
+        record = services.coordinator.run_pass()
+        elapsed = time.perf_counter() - start
+        print(f"   pass {i + 1}: {elapsed:.3f}s, {record['new_posts']} new posts")
+    services.scanner.router.drain(5)
+
+    status = services.cassette.status()
+    print(f"📊 Served {status['served']} responses, {status['missed']} missing from the cassette")
+
+
+if __name__ == '__main__':
+    main()
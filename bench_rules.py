@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark for alert rule matching
+Compiles thousands of keyword and regex rules and pushes 100k posts through them
+Usage: python bench_rules.py [keywords] [regexes] [posts]
+"""
+
+import random
+import string
+import sys
+import time
+
+from twitter_scanner.rules import RuleSet
+
+WORDS = ["launch", "update", "market", "token", "release", "event", "today", "new", "price", "team",
+         "crypto", "stock", "earnings", "breaking", "thread", "video", "live", "vote", "deal", "sale"]
+
+
+def _word(rng, length=7):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(length))
+
+
+def main():
+    keywords = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    regexes = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    count = int(sys.argv[3]) if len(sys.argv) > 3 else 100_000
+    accounts = 500
+    rng = random.Random(42)
+
+    # A tenth of the rules are global, the rest belong to individual accounts
+    rows = []
+    for i in range(keywords):
+        rows.append((i + 1, None if i % 10 == 0 else rng.randrange(accounts), 'keyword', _word(rng)))
+    for i in range(regexes):
+        pattern = rf"\b{_word(rng, 5)}\d{{2,4}}\b"
+        rows.append((keywords + i + 1, None if i % 10 == 0 else rng.randrange(accounts), 'regex', pattern))
+
+    print(f"🧪 Compiling {keywords:,} keyword and {regexes:,} regex rules...")
+    rules = RuleSet()
+    start = time.perf_counter()
+    rules.load(rows)
+    rules.match(0, "warm up")
+    print(f"   Build: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # Incremental change: one new rule, then the first match pays for relinking
+    start = time.perf_counter()
+    rules.add(len(rows) + 1, 1, 'keyword', 'justadded')
+    rules.match(1, "warm up")
+    print(f"   Add one keyword: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    posts = []
+    for _ in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(10, 40))]
+        if rng.random() < 0.05:
+            words.append(rows[rng.randrange(len(rows))][3].replace(r'\b', '').replace(r'\d{2,4}', '123'))
+        posts.append((rng.randrange(accounts), ' '.join(words)))
+
+    start = time.perf_counter()
+    notified = sum(1 for account_id, text in posts if rules.should_notify(account_id, text))
+    elapsed = time.perf_counter() - start
+
+    print(f"   Matched {count:,} posts in {elapsed:.2f}s ({elapsed / count * 1e6:.1f} µs per post, "
+          f"{count / elapsed * 60:,.0f} posts/min), {notified:,} notified")
+
+
+if __name__ == '__main__':
+    main()
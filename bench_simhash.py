@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the SimHash dedup index
+Builds an index of 1M random fingerprints and measures lookup cost
+Usage: python bench_simhash.py [count] [threshold]
+"""
+
+import random
+import sys
+import time
+
+from twitter_scanner.dedup import SimHashIndex
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    threshold = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    rng = random.Random(42)
+
+    print(f"🧪 Building index of {count:,} fingerprints (threshold {threshold} bits)...")
+    index = SimHashIndex(threshold=threshold)
+    fingerprints = [rng.getrandbits(64) for _ in range(count)]
+
+    start = time.perf_counter()
+    for i, fingerprint in enumerate(fingerprints):
+        index.add(i, fingerprint, timestamp=0)
+    build_time = time.perf_counter() - start
+    print(f"   Build: {build_time:.1f}s ({build_time / count * 1e6:.2f} µs per insert)")
+
+    lookups = 10_000
+
+    # Misses: fresh random fingerprints, the common case for new posts
+    queries = [rng.getrandbits(64) for _ in range(lookups)]
+    start = time.perf_counter()
+    for fingerprint in queries:
+        index.find_duplicate(fingerprint)
+    miss_time = time.perf_counter() - start
+
+    # Hits: stored fingerprints with a few bits flipped, like an edited repost
+    queries = []
+    for _ in range(lookups):
+        fingerprint = fingerprints[rng.randrange(count)]
+        for bit in rng.sample(range(64), threshold):
+            fingerprint ^= 1 << bit
+        queries.append(fingerprint)
+    start = time.perf_counter()
+    found = sum(1 for fingerprint in queries if index.find_duplicate(fingerprint))
+    hit_time = time.perf_counter() - start
+
+    print(f"   Miss lookup: {miss_time / lookups * 1e6:.1f} µs")
+    print(f"   Hit lookup:  {hit_time / lookups * 1e6:.1f} µs ({found}/{lookups} found)")
+
+
+if __name__ == '__main__':
+    main()
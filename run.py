@@ -45,7 +45,7 @@ def main():
     print("=" * 50)
     
     # Start the Flask app
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    app.run(debug=True, host='0.0.0.0', port=5000, use_reloader=False)
 
 if __name__ == '__main__':
     main()
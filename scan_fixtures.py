@@ -0,0 +1,32 @@
+"""
+Shared setup for the test scripts that scan against a stub session
+Each script keeps its own session with the pages it needs; scanner_app()
+builds an in-memory app whose scraper reads them instead of twitter.com
+"""
+
+from unittest import mock
+
+from twitter_scanner import create_app, db, MonitoredAccount
+from twitter_scanner.notifier import TelegramBot
+
+
+class StubResponse:
+    def __init__(self, text, status_code=200):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode()
+
+
+def scanner_app(session, usernames, **overrides):
+    """(app, services) scanning `usernames` through `session`, with no delays, scheduler or notifier"""
+    with mock.patch.object(TelegramBot, 'test_connection', return_value=False):
+        app = create_app('default', STORE='memory', SCHEDULER=False, NOTIFIER='none', SCAN_DELAY_SECONDS=0,
+                         **overrides)
+    services = app.extensions['twitter_scanner']
+    services.scraper._session = session
+    services.scraper.rate_limiter.rate = 0
+    with app.app_context():
+        for username in usernames:
+            db.session.add(MonitoredAccount(username=username, display_name=username))
+        db.session.commit()
+    return app, services
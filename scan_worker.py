@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Scan worker
+Pulls account checks from the durable scan queue (twitter_scanner/work_queue.py)
+and runs them. Start as many as you like against the same DATABASE_URL, and
+set SCAN_QUEUE=true on the web app so its scheduler and /api/trigger-scan
+queue work instead of scanning in-process.
+
+    python scan_worker.py                   # work until stopped (Ctrl+C or SIGTERM)
+    python scan_worker.py --enqueue --once  # queue a pass, work through it, exit
+    python scan_worker.py --requeue-dead    # give dead-lettered tasks another go
+"""
+
+import argparse
+import signal
+
+from twitter_scanner import PROFILES, create_app
+from twitter_scanner.work_queue import ScanWorker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process queued Twitter Scanner account checks")
+    parser.add_argument('--profile', default='default', choices=sorted(PROFILES),
+                        help="deployment profile for the scraper and notifier (default: default)")
+    parser.add_argument('--worker-id', help="lease owner name (default: hostname-pid)")
+    parser.add_argument('--batch-size', type=int, default=5, help="tasks claimed at a time")
+    parser.add_argument('--poll-interval', type=float, default=2, help="seconds between polls of an empty queue")
+    parser.add_argument('--enqueue', action='store_true', help="queue a check for every active account first")
+    parser.add_argument('--requeue-dead', action='store_true', help="requeue dead-lettered tasks first")
+    parser.add_argument('--once', action='store_true', help="exit once nothing is due")
+    args = parser.parse_args()
+
+    # The worker is the scan loop here; a scheduler thread would scan a second time
+    app = create_app(args.profile, SCHEDULER=False)
+    services = app.extensions['twitter_scanner']
+
+    with app.app_context():
+        if args.requeue_dead:
+            print(f"♻️  Requeued {services.scan_queue.requeue_dead()} dead-lettered tasks")
+        if args.enqueue:
+            print(f"📥 Queued {services.scan_queue.enqueue_pass()} account checks")
+
+    worker = ScanWorker(app, worker_id=args.worker_id, batch_size=args.batch_size,
+                        poll_interval=args.poll_interval)
+    # Finish the task in hand and hand back the rest instead of waiting for leases to expire
+    signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: worker.stop())
+    worker.run(once=args.once)
+
+
+if __name__ == '__main__':
+    main()
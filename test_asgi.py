@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test script for the ASGI entry point
+Drives the app with plain ASGI messages, so no server is needed
+"""
+
+import asyncio
+import json
+from unittest import mock
+
+from twitter_scanner import PostHistory
+from twitter_scanner.asgi import EventHub, create_asgi_app
+from twitter_scanner.notifier import TelegramBot
+
+
+def _asgi_app(**overrides):
+    overrides.setdefault('STORE', 'memory')
+    overrides.setdefault('SCAN_DELAY_SECONDS', 0)
+    with mock.patch.object(TelegramBot, 'test_connection', return_value=False):
+        return create_asgi_app('serverless', **overrides)
+
+
+async def _request(app, method, path, query=b'', body=b'', headers=()):
+    """(status, headers, body) for one request"""
+    sent = []
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'http_version': '1.1', 'method': method, 'path': path, 'root_path': '',
+             'query_string': query, 'headers': list(headers), 'scheme': 'http', 'server': ('test', 80)}
+    await app(scope, receive, send)
+    start = sent[0]
+    return start['status'], dict(start['headers']), b''.join(m.get('body', b'') for m in sent[1:])
+
+
+def test_api_runs_through_the_bridge():
+    """JSON endpoints behave as they do under WSGI"""
+    app = _asgi_app()
+
+    async def run():
+        body = json.dumps({'username': 'bridged'}).encode()
+        status, _, _ = await _request(app, 'POST', '/api/accounts', body=body,
+                                      headers=[(b'content-type', b'application/json')])
+        assert status == 201
+
+        status, headers, body = await _request(app, 'GET', '/api/accounts')
+        assert status == 200 and headers[b'content-type'] == b'application/json'
+        assert [a['username'] for a in json.loads(body)] == ['bridged']
+
+        status, _, _ = await _request(app, 'GET', '/api/posts/999', query=b'x=1')
+        assert status == 200
+        status, _, _ = await _request(app, 'GET', '/no-such-page')
+        assert status == 404
+
+        # Bodies past the buffer size are passed on chunk by chunk
+        app.bridge.buffer_size = 16
+        status, _, body = await _request(app, 'GET', '/api/accounts/export', query=b'format=csv')
+        assert status == 200 and b'bridged' in body
+
+    asyncio.run(run())
+
+
+def test_event_hub_backlog():
+    """Clients get what they missed, and skip ahead once it falls out of the backlog"""
+    async def run():
+        hub = EventHub(backlog=3)
+        for i in range(5):
+            hub.publish('scan', {'n': i})
+        assert [seq for seq, _, _ in hub.since(3)] == [4, 5]
+        assert [seq for seq, _, _ in hub.since(0)] == [3, 4, 5]
+        assert hub.since(5) == []
+
+        # A waiting client wakes up on the next publish
+        waiter = asyncio.ensure_future(hub.wait(5, timeout=5))
+        await asyncio.sleep(0)
+        hub.publish('posts', {'new_posts': 1})
+        assert [kind for _, kind, _ in await waiter] == ['posts']
+        assert await hub.wait(6, timeout=0.01) == []
+
+    asyncio.run(run())
+
+
+def test_long_poll_and_sse():
+    """Scan events reach long-poll and SSE clients"""
+    app = _asgi_app()
+
+    async def run():
+        _, _, body = await _request(app, 'GET', '/api/events/poll')
+        since = json.loads(body)['last_id']
+
+        poll = asyncio.ensure_future(_request(app, 'GET', '/api/events/poll', query=f'since={since}'.encode()))
+        await asyncio.sleep(0.05)
+        app.events.publish('scan', {'new_posts': 2})
+        status, _, body = await poll
+        events = json.loads(body)['events']
+        assert status == 200 and events[0]['type'] == 'scan' and events[0]['data']['new_posts'] == 2
+
+        # SSE replays from Last-Event-ID, then ends when the client disconnects
+        sent = []
+        disconnect = asyncio.Event()
+
+        async def receive():
+            await disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'method': 'GET', 'path': '/api/events', 'query_string': b'',
+                 'headers': [(b'last-event-id', str(since).encode())]}
+        stream = asyncio.ensure_future(app(scope, receive, send))
+        await asyncio.sleep(0.05)
+        app.events.publish('posts', {'username': 'someone'})
+        await asyncio.sleep(0.05)
+        disconnect.set()
+        await asyncio.wait_for(stream, 5)
+
+        assert dict(sent[0]['headers'])[b'content-type'] == b'text/event-stream'
+        text = b''.join(m.get('body', b'') for m in sent[1:]).decode()
+        assert f'id: {since + 1}\nevent: scan\n' in text
+        assert 'event: posts\ndata: {"username": "someone"}' in text
+
+    asyncio.run(run())
+
+
+def test_async_pass_is_coordinated():
+    """Async passes store posts, publish events and share the coordinator's lock"""
+    app = _asgi_app()
+    flask_app = app.app
+    client = flask_app.test_client()
+    for username in ('one', 'two', 'three'):
+        client.post('/api/accounts', json={'username': username})
+    coordinator = flask_app.extensions['twitter_scanner'].coordinator
+
+    async def run():
+        record = await app.scanner.run_pass(trigger='manual')
+        assert record['checked'] == 3 and record['new_posts'] >= 1
+        assert [kind for _, kind, _ in app.events.since(0)][-1] == 'scan'
+
+        # While an async pass holds the slot, the WSGI trigger gets a 409
+        held = coordinator.begin('schedule')
+        try:
+            status, _, _ = await _request(app, 'POST', '/api/trigger-scan')
+            assert status == 409
+            assert await app.scanner.run_pass() is None
+        finally:
+            coordinator.finish(held)
+        await app.scanner.stop()
+
+        return record
+
+    record = asyncio.run(run())
+    with flask_app.app_context():
+        # Offline post ids repeat within a second, so some accounts may have had nothing new
+        assert PostHistory.query.count() == record['new_posts']
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All ASGI tests passed!")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-account circuit breaker
+"""
+
+from datetime import datetime, timedelta
+
+from twitter_scanner.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from twitter_scanner.scraper import ScrapeError
+
+
+class _Account:
+    username = 'someone'
+    breaker_state = None
+    breaker_failures = None
+    breaker_status_code = None
+    breaker_error = None
+    breaker_until = None
+
+
+def test_opens_after_threshold_and_backs_off():
+    """Repeated failures quarantine the account for longer each time"""
+    breaker = CircuitBreaker(threshold=3, base_delay=60, max_delay=3600)
+    account = _Account()
+    now = datetime(2025, 1, 1)
+
+    for _ in range(2):
+        breaker.record_failure(account, ScrapeError('HTTP 500', 500), now=now)
+        assert breaker.allow(account, now)
+    breaker.record_failure(account, ScrapeError('HTTP 500', 500), now=now)
+    assert account.breaker_state == OPEN
+    assert account.breaker_until == now + timedelta(seconds=60)
+    assert not breaker.allow(account, now)
+
+    # The probe after the quarantine fails, so the next quarantine is twice as long
+    later = account.breaker_until
+    assert breaker.allow(account, later)
+    assert account.breaker_state == HALF_OPEN
+    breaker.record_failure(account, ScrapeError('HTTP 500', 500), now=later)
+    assert account.breaker_until == later + timedelta(seconds=120)
+
+
+def test_fatal_status_and_recovery():
+    """A 404 trips immediately, a successful probe closes the breaker"""
+    breaker = CircuitBreaker(threshold=3, base_delay=60)
+    account = _Account()
+    breaker.record_failure(account, ScrapeError('HTTP 404', 404))
+    assert account.breaker_state == OPEN
+    assert account.breaker_status_code == 404
+
+    breaker.record_success(account)
+    assert account.breaker_state == CLOSED
+    assert account.breaker_failures == 0
+    assert account.breaker_until is None
+
+
+def test_rate_limits_do_not_count():
+    """429s are our problem, not the account's"""
+    breaker = CircuitBreaker(threshold=1)
+    account = _Account()
+    breaker.record_failure(account, ScrapeError('HTTP 429', 429))
+    assert account.breaker_state is None
+    assert breaker.allow(account)
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All circuit breaker tests passed!")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk account import parsing and rate limiting
+"""
+
+import time
+from unittest import mock
+
+from twitter_scanner import create_app
+from twitter_scanner.bulk_accounts import import_accounts, parse_usernames, validate_profiles
+from twitter_scanner.ratelimit import RateLimiter
+
+
+def test_parse_csv_with_header():
+    """The username column is picked out of a CSV with a header"""
+    body = "display_name,username\nAlice,@alice\nBob,bob\nAgain,Alice\n"
+    assert parse_usernames(body, 'text/csv') == ['alice', 'bob']
+
+
+def test_parse_plain_list():
+    """A bare list of names, one per line, also works"""
+    assert parse_usernames("@one\ntwo\n\nthree") == ['one', 'two', 'three']
+
+
+def test_parse_json_variants():
+    """Lists, objects and {"usernames": [...]} are all accepted"""
+    assert parse_usernames('["a", "@b"]', 'application/json') == ['a', 'b']
+    assert parse_usernames('[{"username": "a"}, {"username": "b"}]') == ['a', 'b']
+    assert parse_usernames('{"usernames": ["a", "a", "c"]}') == ['a', 'c']
+
+
+def test_validate_profiles_keeps_order():
+    """Concurrent validation maps every username to its profile"""
+    profiles = validate_profiles(['x', 'y', 'z'], lambda name: {'exists': name != 'y'}, workers=3)
+    assert [profiles[name]['exists'] for name in 'xyz'] == [True, False, True]
+
+
+def test_existing_accounts_match_any_case():
+    """Importing Foo when foo is monitored reports it as existing instead of adding it again"""
+    with mock.patch('twitter_scanner.notifier.TelegramBot.test_connection', return_value=False):
+        app = create_app('serverless', STORE='memory', SCAN_DELAY_SECONDS=0)
+    scraper = app.extensions['twitter_scanner'].scraper
+    with app.app_context(), mock.patch.object(scraper, 'get_user_profile', return_value={'exists': True}):
+        import_accounts(scraper, ['foo'])
+        results = import_accounts(scraper, ['Foo', 'bar'])
+    assert [(r['username'], r['status']) for r in results] == [('Foo', 'exists'), ('bar', 'added')]
+    assert results[0]['id'] == 1
+
+
+def test_rate_limiter_spaces_calls():
+    """After the burst is used up calls are spaced by 1/rate"""
+    limiter = RateLimiter(rate=50, burst=2)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    elapsed = time.monotonic() - start
+    assert elapsed >= 4 / 50 * 0.9
+    assert not limiter.try_acquire()
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All bulk import tests passed!")
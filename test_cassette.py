@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script for HTTP record and replay
+Records canned exchanges, then replays them into a full scan pass offline
+"""
+
+import os
+import tempfile
+import time
+from unittest import mock
+
+import requests
+from requests.adapters import BaseAdapter
+
+from twitter_scanner import create_app, db, MonitoredAccount, PostHistory
+from twitter_scanner.cassette import CassetteMiss, HttpCassette, read_cassette
+from twitter_scanner.notifier import TelegramBot
+
+
+def _article(tweet_id, text):
+    return (f'<article data-testid="tweet" data-tweet-id="{tweet_id}">'
+            f'<time datetime="2024-05-0{tweet_id[-1]}T10:00:00.000Z"></time>'
+            f'<div data-testid="tweetText">{text}</div></article>')
+
+
+PAGES = {
+    'https://twitter.com/recorded': '<html><body>' + _article('1790000000000000002', 'Second ✨') +
+                                    _article('1790000000000000001', 'First') + '</body></html>',
+    'https://twitter.com/recorded/status/1790000000000000002': '<div data-testid="tweetText">Second ✨ in full</div>',
+    'https://twitter.com/recorded/status/1790000000000000001': '<div data-testid="tweetText">First in full</div>',
+    'https://api.telegram.org/botSECRET/sendMessage': '{"ok":true}',
+}
+
+
+class _CannedAdapter(BaseAdapter):
+    """Stands in for the network while recording"""
+
+    def send(self, request, **kwargs):
+        time.sleep(0.01)
+        response = requests.Response()
+        response.status_code = 200
+        response.headers['Content-Type'] = 'text/html; charset=utf-8'
+        response._content = PAGES[request.url].encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def _record(path):
+    cassette = HttpCassette('record', path)
+    cassette.adapter.inner = _CannedAdapter()
+    session = cassette.attach(requests.Session())
+    for url in list(PAGES)[:3]:
+        assert session.get(url).text == PAGES[url]
+    session.post('https://api.telegram.org/botSECRET/sendMessage', data={'text': 'hi'})
+    cassette.close()
+    return cassette
+
+
+def test_record_masks_tokens_and_keeps_timing():
+    """Exchanges land in the cassette in order, with latency and without the bot token"""
+    path = os.path.join(tempfile.mkdtemp(), 'rec.ndjson.gz')
+    assert _record(path).recorded == 4
+    entries = list(read_cassette(path))
+    assert [e['method'] for e in entries] == ['GET', 'GET', 'GET', 'POST']
+    assert entries[-1]['url'] == 'https://api.telegram.org/bot<token>/sendMessage'
+    assert 'SECRET' not in open(path, 'rb').read().decode('latin1')
+    assert all(e['elapsed'] >= 0.01 for e in entries)
+    assert entries[0]['body'] == PAGES['https://twitter.com/recorded']
+
+
+def test_replay_speed_and_misses():
+    """Replays wait the recorded latency divided by the speed, and unknown URLs fail loudly"""
+    path = os.path.join(tempfile.mkdtemp(), 'rec.ndjson.gz')
+    _record(path)
+
+    fast = HttpCassette('replay', path, speed=0)
+    session = fast.attach(requests.Session())
+    start = time.monotonic()
+    for _ in range(20):
+        assert session.get('https://twitter.com/recorded').text == PAGES['https://twitter.com/recorded']
+    assert time.monotonic() - start < 0.1
+
+    try:
+        session.get('https://twitter.com/somebody_else')
+        assert False, "expected a cassette miss"
+    except CassetteMiss:
+        pass
+    assert fast.status()['served'] == 20 and fast.status()['missed'] == 1
+
+    slow = HttpCassette('replay', path, speed=0.5)
+    session = slow.attach(requests.Session())
+    start = time.monotonic()
+    session.get('https://twitter.com/recorded')
+    assert time.monotonic() - start >= 0.02
+
+
+def test_scan_pass_from_cassette():
+    """A whole scan runs offline from a recording, notifications included"""
+    path = os.path.join(tempfile.mkdtemp(), 'rec.ndjson.gz')
+    _record(path)
+
+    env = {'HTTP_CASSETTE_MODE': 'replay', 'HTTP_CASSETTE_PATH': path, 'HTTP_CASSETTE_SPEED': '0',
+           'TELEGRAM_BOT_TOKEN': 'other-token', 'TELEGRAM_CHAT_ID': '1', 'SCRAPER_RATE_LIMIT': '0'}
+    with mock.patch.dict(os.environ, env), \
+            mock.patch.object(TelegramBot, 'test_connection', return_value=False):
+        app = create_app('default', STORE='memory', SCHEDULER=False, SCAN_DELAY_SECONDS=0)
+    services = app.extensions['twitter_scanner']
+    with app.app_context():
+        db.session.add(MonitoredAccount(username='recorded', display_name='recorded'))
+        db.session.commit()
+
+    record = services.coordinator.run_pass()
+    assert record['new_posts'] == 2
+    assert services.scanner.router.drain(5)
+    with app.app_context():
+        assert {p.text for p in PostHistory.query} == {'Second ✨ in full', 'First in full'}
+    assert services.cassette.missed == 0
+    assert services.scanner.router.status()['default']['sent'] == 2
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All cassette tests passed!")
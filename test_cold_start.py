@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script for cold start cost
+Imports the serverless entry point under python -X importtime and fails if
+optional integrations load eagerly or the import blows its time budget.
+Set IMPORT_BUDGET_MS to tighten or relax the budget on slow machines.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Only needed once a request actually scrapes, notifies or schedules
+LAZY_MODULES = {'requests', 'bs4', 'schedule', 'tweepy', 'twilio'}
+
+
+def _import_times(module):
+    """Return {module: cumulative microseconds} for a fresh interpreter importing module"""
+    with tempfile.TemporaryDirectory() as store_dir:
+        env = dict(os.environ, PYTHONPATH=ROOT, STORE_PATH=os.path.join(store_dir, 'scanner.db'))
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=ROOT, env=env, capture_output=True, text=True, timeout=60
+        )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_optional_integrations_are_lazy():
+    """Importing the package or an entry point must not pull in network libraries"""
+    for module in ('twitter_scanner', 'app_serverless'):
+        loaded = {name.split('.')[0] for name in _import_times(module)}
+        assert not loaded & LAZY_MODULES, f"{module} imported {sorted(loaded & LAZY_MODULES)}"
+
+
+def test_serverless_import_budget():
+    """A serverless cold start should stay well under the budget"""
+    budget_ms = int(os.getenv('IMPORT_BUDGET_MS', '1500'))
+    times = _import_times('app_serverless')
+    took_ms = times['app_serverless'] / 1000
+    assert took_ms < budget_ms, f"app_serverless took {took_ms:.0f}ms to import (budget {budget_ms}ms)"
+
+
+if __name__ == '__main__':
+    test_optional_integrations_are_lazy()
+    print("✅ Optional integrations are imported lazily")
+    test_serverless_import_budget()
+    print("✅ Serverless import within budget")
+    print("\n🎉 All cold start tests passed!")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for scan pass coordination
+Checks overlap prevention, deadlines and carry-over order offline
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+from twitter_scanner import create_app, db
+from twitter_scanner.coordinator import ScanCoordinator
+from twitter_scanner.scheduler import Cadence, run_scan_loop
+
+
+class _SlowScanner:
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def monitor_accounts(self, deadline=None):
+        self.started.set()
+        self.release.wait(5)
+        return {'new_posts': 0, 'checked': 0, 'quarantined': 0, 'carried_over': 0}
+
+
+def test_one_pass_at_a_time():
+    """A second pass while one is running is skipped, not run concurrently"""
+    scanner = _SlowScanner()
+    coordinator = ScanCoordinator(scanner)
+    thread = threading.Thread(target=coordinator.run_pass, kwargs={'trigger': 'schedule'})
+    thread.start()
+    scanner.started.wait(5)
+
+    assert coordinator.in_flight
+    assert coordinator.run_pass(trigger='manual') is None
+
+    # The moment between finish() clearing the pass and releasing the lock
+    coordinator._current = None
+    assert coordinator.run_pass(trigger='manual') is None
+
+    scanner.release.set()
+    thread.join(5)
+    assert not coordinator.in_flight
+    assert coordinator.status()['last_pass']['trigger'] == 'schedule'
+
+
+def test_lag_is_recorded():
+    """Planned versus actual start ends up in the pass record"""
+    scanner = _SlowScanner()
+    scanner.release.set()
+    coordinator = ScanCoordinator(scanner)
+    record = coordinator.run_pass(trigger='schedule', planned_at=datetime(2000, 1, 1))
+    assert record['lag_seconds'] > 0
+    assert coordinator.status()['lag_seconds']['max'] == record['lag_seconds']
+
+
+def test_overrun_shows_as_lag():
+    """Slots stay on a fixed cadence, so a pass longer than the interval makes the next one late"""
+    start = datetime(2024, 5, 1, 12)
+    cadence = Cadence(300, anchor=start)
+    assert cadence.next_slot(start) == start + timedelta(minutes=5)
+    # The 12:05 pass ran until 12:12: 12:10 is already past and is run at once, 2 minutes late
+    assert cadence.next_slot(start + timedelta(minutes=12)) == start + timedelta(minutes=10)
+    # On time again: back to waiting for the next slot
+    assert cadence.next_slot(start + timedelta(minutes=13)) == start + timedelta(minutes=15)
+
+    class _OverrunningScanner:
+        passes = 0
+
+        def monitor_accounts(self, deadline=None):
+            self.passes += 1
+            if self.passes >= 3:
+                stop.set()
+            time.sleep(0.3)
+            return {'new_posts': 0, 'checked': 0, 'quarantined': 0, 'carried_over': 0}
+
+    stop = threading.Event()
+    coordinator = ScanCoordinator(_OverrunningScanner())
+    run_scan_loop(coordinator, Cadence(0.2), stop)
+    lags = [p['lag_seconds'] for p in coordinator.history]
+    # The first pass ends 0.1 s after the second one's slot
+    assert len(lags) == 3 and lags[0] < 0.05 and 0.05 < lags[1] < 0.2, lags
+    assert coordinator.status()['lag_seconds']['max'] > 0.05
+
+
+def test_deadline_carries_accounts_over():
+    """Accounts past the deadline lead the next pass"""
+    with mock.patch('twitter_scanner.notifier.TelegramBot.test_connection', return_value=False):
+        app = create_app('serverless', STORE='memory', SCAN_DELAY_SECONDS=0)
+    client = app.test_client()
+    for username in ('first', 'second', 'third'):
+        client.post('/api/accounts', json={'username': username})
+    scanner = app.extensions['twitter_scanner'].scanner
+
+    seen = []
+
+    def check(account):
+        seen.append(account.username)
+        account.last_checked = datetime.utcnow()
+        db.session.commit()
+        return 0
+
+    # The clock runs out once two accounts have been checked
+    clock = lambda: 100 if len(seen) >= 2 else 0
+    with mock.patch.object(scanner, 'check_account', side_effect=check), \
+            mock.patch('twitter_scanner.monitor.time.monotonic', side_effect=clock):
+        stats = scanner.monitor_accounts(deadline=50)
+        assert stats['checked'] == 2 and stats['carried_over'] == 1
+
+        carried = [u for u in ('first', 'second', 'third') if u not in seen]
+        seen.clear()
+        scanner.monitor_accounts(deadline=50)
+        assert seen[0] == carried[0]
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All coordinator tests passed!")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script for near-duplicate post detection
+Run this to check SimHash fingerprints and the banded index
+"""
+
+from twitter_scanner.dedup import SimHashIndex, simhash, normalize_text, hamming_distance, to_signed, from_signed
+
+
+def test_normalize_text():
+    """Links, emoji and punctuation should not change the normalized text"""
+    original = "Big news today! https://t.co/abc123"
+    repost = "Big news today!! https://t.co/xyz789 🚀"
+    assert normalize_text(original) == normalize_text(repost) == "big news today"
+
+
+def test_reposts_are_near_duplicates():
+    """A repost with a new link or trailing emoji should be caught"""
+    index = SimHashIndex(threshold=3)
+    index.add('1', simhash("We are launching the new dashboard next week https://t.co/aaa"))
+
+    match = index.find_duplicate(simhash("We are launching the new dashboard next week https://t.co/bbb 🎉"))
+    assert match is not None
+    assert match[0] == '1'
+
+
+def test_different_posts_are_not_duplicates():
+    """Unrelated posts should stay well apart"""
+    a = simhash("The quarterly report is out now, read the highlights")
+    b = simhash("Heading to the conference in Berlin tomorrow morning")
+    assert hamming_distance(a, b) > 3
+
+    index = SimHashIndex(threshold=3)
+    index.add('1', a)
+    assert index.find_duplicate(b) is None
+
+
+def test_empty_text_has_no_fingerprint():
+    """Posts that are only a link have nothing to fingerprint"""
+    assert simhash("https://t.co/abc 🔥") is None
+
+
+def test_remove_and_prune():
+    """Removed and expired posts should no longer match"""
+    index = SimHashIndex(threshold=3, window_days=1)
+    fingerprint = simhash("Some post that will be deleted later")
+    index.add('old', fingerprint, timestamp=0)
+    index.add('new', simhash("Another post that stays around"), timestamp=10 * 86400)
+
+    assert index.prune(now=10 * 86400) == 1
+    assert index.find_duplicate(fingerprint) is None
+    assert len(index) == 1
+
+    assert index.remove('new')
+    assert len(index) == 0
+
+
+def test_signed_round_trip():
+    """Fingerprints must survive a signed BIGINT column"""
+    for value in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+        assert -(1 << 63) <= to_signed(value) < 1 << 63
+        assert from_signed(to_signed(value)) == value
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All dedup tests passed!")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test script for notification digests
+"""
+
+from twitter_scanner.digest import DigestBuffer
+from twitter_scanner.notifier import TELEGRAM_MAX_LENGTH, format_digest_messages
+
+
+class _Notifier:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, message, destinations=None, username=None, url=None):
+        self.sent.append(message)
+        return 1
+
+
+class _Account:
+    def __init__(self, username, notify_mode=None):
+        self.username = username
+        self.notify_mode = notify_mode
+
+
+def test_digest_messages_respect_telegram_limit():
+    """Long digests split between posts and stay under 4096 characters"""
+    posts = [(f'post number {i} ' * 20, f'https://twitter.com/busy/status/{i}') for i in range(100)]
+    messages = format_digest_messages('busy', posts)
+    assert len(messages) > 1
+    assert all(len(m) <= TELEGRAM_MAX_LENGTH for m in messages)
+    assert sum(m.count('🔗') for m in messages) == 100
+
+    # A single oversized post is trimmed, its link kept
+    [message] = format_digest_messages('busy', [('x' * 10000, 'https://twitter.com/busy/status/1')])
+    assert len(message) <= TELEGRAM_MAX_LENGTH
+    assert 'https://twitter.com/busy/status/1' in message
+
+
+def test_vip_instant_others_digested():
+    """Instant accounts bypass the buffer, digest accounts get one message each"""
+    notifier = _Notifier()
+    digest = DigestBuffer(notifier, default_mode='digest', window_seconds=3600, max_posts=1000)
+    vip = _Account('vip', notify_mode='instant')
+    busy = _Account('busy')
+
+    digest.notify(vip, 'breaking', 'https://twitter.com/vip/status/1')
+    assert len(notifier.sent) == 1
+
+    for i in range(50):
+        digest.notify(busy, f'post {i}', f'https://twitter.com/busy/status/{i}')
+    assert len(notifier.sent) == 1
+    assert len(digest) == 50
+
+    assert digest.flush() == 1
+    assert '50 new posts from @busy' in notifier.sent[-1]
+    assert len(digest) == 0
+
+
+def test_flushes_when_enough_posts_wait():
+    """Reaching max_posts sends the digest without waiting for the window"""
+    notifier = _Notifier()
+    digest = DigestBuffer(notifier, default_mode='digest', window_seconds=3600, max_posts=3)
+    for i in range(3):
+        digest.notify(_Account(f'user{i % 2}'), f'post {i}', f'https://twitter.com/x/status/{i}')
+    assert len(notifier.sent) == 2
+    assert len(digest) == 0
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All digest tests passed!")
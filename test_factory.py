@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the application factory
+Builds every deployment profile and exercises the shared API offline
+"""
+
+import os
+import tempfile
+from unittest import mock
+
+from twitter_scanner import PROFILES, create_app
+from twitter_scanner.notifier import NullNotifier, TelegramBot
+from twitter_scanner.scraper import MinimalTwitterScraper, MockTwitterScraper
+
+
+def _offline_app(profile='serverless', **overrides):
+    overrides.setdefault('SCHEDULER', False)
+    overrides.setdefault('SCAN_DELAY_SECONDS', 0)
+    overrides.setdefault('STORE', 'memory')
+    with mock.patch.object(TelegramBot, 'test_connection', return_value=False):
+        return create_app(profile, **overrides)
+
+
+def test_every_profile_builds():
+    """Each profile wires the components it asks for"""
+    for profile, settings in PROFILES.items():
+        app = _offline_app(profile)
+        services = app.extensions['twitter_scanner']
+
+        if settings.get('SCRAPER', 'twitter') == 'twitter':
+            assert type(services.scraper) is MinimalTwitterScraper
+        else:
+            assert isinstance(services.scraper, MockTwitterScraper)
+
+        expected = NullNotifier if settings.get('NOTIFIER') == 'none' else TelegramBot
+        assert isinstance(services.notifier, expected)
+
+        client = app.test_client()
+        assert client.get('/health').status_code == 200
+        assert client.get('/api/accounts').get_json() == []
+
+
+def test_scan_pipeline_with_offline_scraper():
+    """Adding an account and scanning it stores one post per check"""
+    app = _offline_app()
+    client = app.test_client()
+
+    response = client.post('/api/accounts', json={'username': '@someone'})
+    assert response.status_code == 201
+    account_id = response.get_json()['id']
+
+    response = client.post(f'/api/check/{account_id}')
+    assert response.get_json()['new_posts'] == 1
+    assert len(client.get(f'/api/posts/{account_id}').get_json()) == 1
+
+    status = client.get('/api/scanner-status').get_json()
+    assert status['active_accounts'] == 1
+    assert status['scan_interval'] == 'Manual only (Serverless)'
+
+
+def test_apps_are_isolated():
+    """Two in-memory apps don't share accounts"""
+    first = _offline_app()
+    second = _offline_app()
+    first.test_client().post('/api/accounts', json={'username': 'only_here'})
+    assert second.test_client().get('/api/accounts').get_json() == []
+
+
+def test_file_store_survives_restarts():
+    """A new app on the same store file sees earlier accounts and never reuses a deleted id"""
+    with tempfile.TemporaryDirectory() as store_dir:
+        with mock.patch.dict(os.environ, {'STORE_PATH': os.path.join(store_dir, 'scanner.db')}):
+            client = _offline_app(STORE='file').test_client()
+            client.post('/api/accounts', json={'username': 'first'})
+            removed = client.post('/api/accounts', json={'username': 'second'}).get_json()['id']
+            client.delete(f'/api/accounts/{removed}')
+
+            # The next invocation starts from a fresh app
+            client = _offline_app(STORE='file').test_client()
+            assert [a['username'] for a in client.get('/api/accounts').get_json()] == ['first']
+            added = client.post('/api/accounts', json={'username': 'third'}).get_json()['id']
+            assert added > removed
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All factory tests passed!")
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test script for account groups
+Checks the fair plan across groups, per-group scan settings and the group API
+"""
+
+from datetime import datetime, timedelta
+from unittest import mock
+
+from scan_fixtures import StubResponse, scanner_app
+from twitter_scanner import db, AccountGroup, MonitoredAccount, NotificationDestination
+from twitter_scanner.groups import FairScheduler, GroupPolicy
+from twitter_scanner.records import ScrapedPost, TweetDetails
+
+TEXTS = {'vip': 'Launch window moves to Friday morning after the weather review',
+         'plain': 'Lemon cake recipe with fresh berries and a crunchy almond topping',
+         'bulk': 'Traffic jam on the northern bridge expected until late tonight'}
+
+
+def _scheduler(budget=0, **policies):
+    scheduler = FairScheduler(budget=budget)
+    scheduler.policies = {group_id: GroupPolicy(group_id, f'group {group_id}', priority, weight, min_interval,
+                                                max_interval, None, None, None)
+                          for group_id, (priority, weight, min_interval, max_interval) in policies.items()}
+    scheduler.loaded = True
+    return scheduler
+
+
+def test_fair_plan_never_starves_small_groups():
+    """A thousand low-priority accounts don't push the critical ones out of a small budget"""
+    now = datetime(2024, 5, 1, 12)
+    scheduler = _scheduler(budget=12, critical=('critical', 8, 0, None), bulk=('low', 1, 0, None))
+    # The bulk accounts have all waited longer, so they come first by last_checked
+    rows = [(i, 'bulk', now - timedelta(hours=2)) for i in range(1000)] + \
+        [(2000 + i, 'critical', now - timedelta(minutes=5)) for i in range(4)]
+    planned, counts = scheduler.plan(rows, now)
+    assert len(planned) == 12 and counts['over_budget'] == 992
+    assert {2000, 2001, 2002, 2003} <= set(planned[:5])
+    # Each group keeps its least recently checked accounts first
+    assert [i for i in planned if i < 1000] == list(range(8))
+
+    # Shares follow the weights while both groups have accounts waiting
+    rows = [(i, 'bulk', now) for i in range(100)] + [(1000 + i, 'critical', now) for i in range(100)]
+    planned, _ = _scheduler(critical=('critical', 8, 0, None), bulk=('low', 1, 0, None)).plan(rows, now)
+    assert sum(i >= 1000 for i in planned[:45]) == 40
+
+
+def test_interval_bounds():
+    """Accounts checked within the min interval wait; those past the max are counted overdue and go first"""
+    now = datetime(2024, 5, 1, 12)
+    scheduler = _scheduler(slow=('normal', 2, 60, 180))
+    rows = [(1, 'slow', now - timedelta(minutes=10)), (2, 'slow', now - timedelta(minutes=90)),
+            (3, 'slow', now - timedelta(hours=5)), (4, None, now - timedelta(minutes=1))]
+    planned, counts = scheduler.plan(rows, now)
+    assert planned[0] == 3 and sorted(planned) == [2, 3, 4]
+    assert counts == {'not_due': 1, 'over_budget': 0, 'overdue': 1}
+
+    # An overdue low-priority account gets the one slot ahead of a critical group
+    scheduler = _scheduler(budget=1, critical=('critical', 8, 0, None), bulk=('low', 1, 0, 60))
+    rows = [(1, 'critical', now - timedelta(minutes=5)), (2, 'bulk', now - timedelta(hours=2))]
+    assert scheduler.plan(rows, now) == ([2], {'not_due': 0, 'over_budget': 1, 'overdue': 1})
+
+
+class _Session:
+    """A timeline of `posts` posts, newest first"""
+
+    headers = {}
+    posts = 3
+
+    def get(self, url, timeout=None):
+        if '/status/' in url:
+            return StubResponse(f'<div data-testid="tweetText">{TEXTS["vip"]} {url}</div>')
+        return StubResponse('<html><body>' + ''.join(
+            f'<article data-testid="tweet" data-tweet-id="{1790000000000000000 + i}">'
+            f'<time datetime="2024-05-01T10:{i:02d}:00.000Z"></time>'
+            f'<div data-testid="tweetText">Post {i}</div></article>'
+            for i in range(self.posts, 0, -1)) + '</body></html>')
+
+
+def _app():
+    return scanner_app(_Session(), ('vip', 'plain', 'bulk'))
+
+
+def test_group_policy_applies_to_checks():
+    """max_posts, notify mode and destinations come from the group unless the account sets its own"""
+    app, services = _app()
+    client = app.test_client()
+    with app.app_context():
+        db.session.add(NotificationDestination(name='desk', channel='telegram', target='-100'))
+        db.session.commit()
+    group = client.post('/api/groups', json={'name': 'VIP', 'priority': 'critical', 'max_posts': 12,
+                                             'notify_mode': 'digest', 'destination_ids': [1]}).get_json()
+    assert group['destination_ids'] == [1] and group['weight'] is None
+    assert client.post(f"/api/groups/{group['id']}/accounts", json={'account_ids': [1]}).get_json()['moved'] == 1
+
+    fetched = {}
+    notified = []
+
+    def get_user_posts(username, max_posts=5, since_id=None, since_time=None, cap=None):
+        fetched[username] = max_posts
+        return [ScrapedPost(str(1790000000000000000 + len(fetched)), username, 'Post', datetime(2024, 5, 1))]
+
+    scanner = services.scanner
+    with mock.patch.object(services.scraper, 'get_user_posts', side_effect=get_user_posts), \
+            mock.patch.object(services.scraper, 'get_tweet_details',
+                              side_effect=lambda url: TweetDetails(TEXTS[url.split('/')[3]], url)), \
+            mock.patch.object(scanner.digest, 'notify', side_effect=lambda *a, **kw: notified.append(kw)):
+        record = services.coordinator.run_pass()
+    assert record['checked'] == 3
+    # The critical group goes first even though every account was created at the same time
+    assert list(fetched) == ['vip', 'plain', 'bulk']
+    assert fetched == {'vip': 12, 'plain': scanner.max_posts, 'bulk': scanner.max_posts}
+    assert notified[0] == {'destinations': (('telegram', '-100'),), 'group_mode': 'digest'}
+    assert notified[1] == {'destinations': None, 'group_mode': None}
+
+
+def test_group_max_posts_caps_burst_reads():
+    """Past the high-water mark a check reads up to the group's max_posts, not SCRAPER_MAX_POSTS_CAP"""
+    app, services = _app()
+    client = app.test_client()
+    group = client.post('/api/groups', json={'name': 'Small', 'max_posts': 3}).get_json()
+    client.post(f"/api/groups/{group['id']}/accounts", json={'account_ids': [1]})
+
+    assert services.coordinator.run_pass()['checked'] == 3
+    # A burst of ten posts since the first scan
+    services.scraper._session.posts = 13
+    services.coordinator.run_pass()
+    found = {r['username']: r['posts_found'] for r in client.get('/api/scan-runs/2').get_json()['results']}
+    assert found['vip'] == 3 and found['plain'] == 10
+
+
+def test_budget_is_not_a_deadline():
+    """Accounts left out by the pass budget are counted over_budget, not carried over by the deadline"""
+    app, services = _app()
+    services.scanner.groups.budget = 2
+    with mock.patch.object(services.scraper, 'get_user_posts', return_value=[]):
+        record = services.coordinator.run_pass()
+    assert record['checked'] == 2 and record['over_budget'] == 1 and record['carried_over'] == 0
+    assert services.coordinator.status()['passes_hitting_deadline'] == 0
+
+
+def test_group_api():
+    """Validation, account assignment and deleting a group"""
+    app, services = _app()
+    client = app.test_client()
+    assert client.post('/api/groups', json={}).status_code == 400
+    assert client.post('/api/groups', json={'name': 'Low', 'priority': 'urgent'}).status_code == 400
+    assert client.post('/api/groups', json={'name': 'Low', 'weight': 0}).status_code == 400
+    assert client.post('/api/groups', json={'name': 'Low', 'min_interval_minutes': 30,
+                                            'max_interval_minutes': 10}).status_code == 400
+    group = client.post('/api/groups', json={'name': 'Low', 'priority': 'low', 'min_interval_minutes': 30}).get_json()
+    assert client.post('/api/groups', json={'name': 'Low'}).status_code == 400
+
+    assert client.post('/api/accounts/3/group', json={'group_id': 99}).status_code == 404
+    assert client.post('/api/accounts/99/group', json={'group_id': None}).status_code == 404
+    assert client.post('/api/groups/99', json={'weight': 3}).status_code == 404
+    assert client.delete('/api/groups/99').status_code == 404
+    assert client.post('/api/groups/99/accounts', json={'account_ids': [1]}).status_code == 404
+    assert client.post('/api/accounts/3/group', json={'group_id': group['id']}).get_json()['group_id'] == group['id']
+    assert client.get('/api/groups').get_json()[0]['accounts'] == 1
+    assert client.get('/api/accounts').get_json()[2]['group_id'] == group['id']
+
+    # Checked just now and inside the group's 30 minute interval
+    with mock.patch.object(services.scraper, 'get_user_posts', return_value=[]):
+        record = services.coordinator.run_pass()
+    assert record['checked'] == 2 and record['not_due'] == 1
+
+    updated = client.post(f"/api/groups/{group['id']}", json={'min_interval_minutes': None, 'weight': 3}).get_json()
+    assert updated['min_interval_minutes'] is None and updated['weight'] == 3
+    assert services.scanner.groups.policy_for(group['id']).weight == 3
+    assert client.delete(f"/api/groups/{group['id']}").status_code == 200
+    with app.app_context():
+        assert AccountGroup.query.count() == 0 and db.session.get(MonitoredAccount, 3).group_id is None
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All group tests passed!")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for incremental timeline scraping
+Checks that parsing stops at the account's high-water mark, skips an old
+pinned post, reads past max_posts up to SCRAPER_MAX_POSTS_CAP when the mark
+isn't reached, warns about the gap when the mark is missing, and that the
+mark only moves forward to real posts
+"""
+
+import contextlib
+import io
+from datetime import datetime
+
+from twitter_scanner.monitor import advance_high_water_mark
+from twitter_scanner.records import ScrapedPost
+from twitter_scanner.scraper import MinimalTwitterScraper
+
+BASE_ID = 1790000000000000000
+GAP_WARNING = 'not on the page'
+
+
+def _article(tweet_id, text, pinned=False):
+    context = '<div data-testid="socialContext">Pinned</div>' if pinned else ''
+    return (f'<article data-testid="tweet" data-tweet-id="{tweet_id}">{context}'
+            f'<time datetime="2024-05-01T10:00:00.000Z"></time>'
+            f'<div data-testid="tweetText">{text}</div></article>')
+
+
+# An old pinned post above twelve posts, newest first
+PAGE = '<html><body>' + _article(BASE_ID - 500, 'Pinned announcement', pinned=True) + \
+    ''.join(_article(BASE_ID + 12 - i, f'Post {i}') for i in range(12)) + '</body></html>'
+
+
+def _posts(max_posts=5, since_id=None, cap=40):
+    scraper = MinimalTwitterScraper()
+    scraper.max_posts_cap = cap
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        posts = scraper.parse_user_posts('someone', 200, PAGE, max_posts, since_id)
+    return [int(p.id) - BASE_ID for p in posts if not p.pinned], [p for p in posts if p.pinned], output.getvalue()
+
+
+def test_stops_at_the_mark():
+    """Only posts newer than the mark come back; the old pinned post doesn't stop the walk"""
+    ids, pinned, output = _posts(since_id=str(BASE_ID + 8))
+    assert ids == [12, 11, 10, 9] and not pinned
+    assert GAP_WARNING not in output
+
+
+def test_burst_reads_up_to_the_cap():
+    """With the mark set but not reached, parsing goes past max_posts up to the cap and warns about the gap"""
+    ids, _, output = _posts(max_posts=3, since_id=str(BASE_ID - 100))
+    assert ids == list(range(12, 0, -1))
+    assert GAP_WARNING in output
+
+    ids, _, output = _posts(max_posts=3, since_id=str(BASE_ID - 100), cap=6)
+    assert ids == [12, 11, 10, 9, 8, 7]
+    assert GAP_WARNING in output
+
+    # Without a mark (first scan) max_posts is the limit and there is no gap to report
+    ids, pinned, output = _posts(max_posts=3)
+    assert ids == [12, 11] and len(pinned) == 1
+    assert GAP_WARNING not in output
+
+
+def test_mark_only_moves_forward():
+    """The mark follows the newest numeric, non-pinned post and never goes back"""
+    class _Account:
+        last_seen_post_id = None
+        last_seen_post_at = None
+
+    account = _Account()
+    when = datetime(2024, 5, 1, 10)
+    posts = [ScrapedPost(str(BASE_ID + 99), 'someone', 'Pinned', when, True),
+             ScrapedPost('tweet_1700000000_0', 'someone', 'No id', when),
+             ScrapedPost(str(BASE_ID + 5), 'someone', 'Newer', when),
+             ScrapedPost(str(BASE_ID + 3), 'someone', 'Older', when)]
+    advance_high_water_mark(account, posts)
+    assert account.last_seen_post_id == str(BASE_ID + 5) and account.last_seen_post_at == when
+
+    advance_high_water_mark(account, [ScrapedPost(str(BASE_ID + 1), 'someone', 'Stale', when)])
+    assert account.last_seen_post_id == str(BASE_ID + 5)
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All high-water mark tests passed!")
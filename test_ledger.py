@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test script for the scan ledger
+Checks what a pass records per account, the hourly rollups and retention,
+and the analytics endpoints
+"""
+
+from datetime import datetime, timedelta
+from unittest import mock
+
+from sqlalchemy import false
+
+from scan_fixtures import StubResponse, scanner_app
+from twitter_scanner import ScanAccountResult, ScanHourlyRollup, ScanRun
+from twitter_scanner.ledger import hour_of, totals
+from twitter_scanner.records import PageStats
+from twitter_scanner.work_queue import ScanWorker
+
+
+class _Session:
+    """One post for @alive, 404 for @gone"""
+
+    headers = {}
+
+    def get(self, url, timeout=None):
+        if '/status/' in url:
+            return StubResponse('<div data-testid="tweetText">Launch window moves to Friday</div>')
+        if url.endswith('/gone'):
+            return StubResponse('Not found', 404)
+        return StubResponse('<html><body><article data-testid="tweet" data-tweet-id="1790000000000000001">'
+                         '<time datetime="2024-05-01T10:00:00.000Z"></time>'
+                         '<div data-testid="tweetText">Launch</div></article></body></html>')
+
+
+def _app(**overrides):
+    return scanner_app(_Session(), ('alive', 'gone'), **overrides)
+
+
+def test_pass_writes_its_results():
+    """One run per pass, one result per account check, readable over the API"""
+    app, services = _app()
+    record = services.coordinator.run_pass()
+    assert record['run_id'] == 1
+
+    client = app.test_client()
+    runs = client.get('/api/scan-runs').get_json()
+    assert len(runs) == 1
+    assert {k: runs[0][k] for k in ('trigger', 'checked', 'errors', 'new_posts')} == \
+        {'trigger': 'manual', 'checked': 2, 'errors': 1, 'new_posts': 1}
+
+    results = {r['username']: r for r in client.get('/api/scan-runs/1').get_json()['results']}
+    alive, gone = results['alive'], results['gone']
+    assert alive['status_code'] == 200 and alive['bytes'] > 100 and alive['error'] is None
+    assert alive['posts_found'] == 1 and alive['new_posts'] == 1
+    assert gone['status_code'] == 404 and gone['error'] == 'HTTP 404' and gone['posts_found'] == 0
+    assert runs[0]['bytes'] == alive['bytes'] + gone['bytes']
+    assert client.get('/api/scan-runs/99').status_code == 404
+
+    # Checks outside a pass aren't kept
+    client.post('/api/check/1')
+    with app.app_context():
+        assert ScanAccountResult.query.count() == 2
+
+
+def test_worker_batches_and_switching_off():
+    """Scan workers write one run per batch; SCAN_LEDGER=false writes nothing"""
+    app, services = _app(SCAN_QUEUE=True)
+    with app.app_context():
+        services.scan_queue.enqueue_pass()
+    ScanWorker(app, batch_size=5).run(once=True)
+    with app.app_context():
+        run = ScanRun.query.one()
+        assert run.trigger == 'worker' and run.checked == 2
+
+    with mock.patch.dict('os.environ', {'SCAN_LEDGER': 'false'}):
+        app, services = _app()
+    assert services.coordinator.run_pass()['checked'] == 2
+    with app.app_context():
+        assert ScanRun.query.count() == 0 and services.ledger.maintain()['rolled_up'] == 0
+
+
+def _record_history(services, now):
+    """Two accounts checked every 10 minutes for 3 days, @slow taking 900 ms and failing once an hour"""
+    ledger = services.ledger
+    page = PageStats()
+    page.status_code, page.bytes, page.parse_seconds = 200, 5000, 0.01
+    for run in range(3 * 24 * 6):
+        started_at = now - timedelta(minutes=10 * run + 5)
+        ledger.begin_run('schedule')
+        ledger.record(1, 'alive', started_at, 0.2, page, posts_found=2, new_posts=1)
+        ledger.record(2, 'slow', started_at, 0.9, page, error='HTTP 429' if run % 6 == 0 else None)
+        ledger.finish_run()
+
+
+def test_rollups_retention_and_analytics():
+    """Rolling up and pruning don't change the answers, only where they come from"""
+    app, services = _app()
+    services.ledger.retention_days = 1
+    now = datetime.utcnow().replace(minute=30)
+    _record_history(services, now)
+    client = app.test_client()
+
+    with app.app_context():
+        before = totals('account_id', now - timedelta(days=2))
+        # 48 whole hours from the start of the hour two days ago, plus half of the current one
+        assert before[2]['checks'] == 48 * 6 + 3 and before[2]['errors'] == 48 + 1
+        trend_before = client.get('/api/analytics/throughput?hours=48').get_json()
+
+        stats = services.ledger.maintain(now)
+        # Everything up to the hour before last is rolled up, raw rows only kept for a day
+        assert stats['rolled_up'] == 2 * (3 * 24 - 1) and stats['results'] > 0
+        assert ScanHourlyRollup.query.count() == stats['rolled_up']
+        assert ScanAccountResult.query.filter(ScanAccountResult.started_at < now - timedelta(days=1, hours=1)) \
+            .count() == 0
+        assert totals('account_id', now - timedelta(days=2)) == before
+        # A second run has nothing new to roll up
+        assert services.ledger.maintain(now)['rolled_up'] == 0
+
+    trend = client.get('/api/analytics/throughput?hours=48').get_json()
+    assert trend == trend_before and len(trend) == 49
+    assert trend[-2]['checks'] == 12 and trend[-2]['new_posts'] == 6 and trend[-2]['bytes'] == 60000
+
+    slowest = client.get('/api/analytics/slowest?hours=24&limit=1').get_json()
+    assert [(a['username'], a['avg_duration_ms'], a['max_duration_ms']) for a in slowest] == [('slow', 900, 900)]
+    errors = client.get('/api/analytics/errors').get_json()
+    assert len(errors) == 1 and errors[0]['account_id'] == 2 and errors[0]['errors'] >= 24
+    assert errors[0]['last_error'] == 'HTTP 429'
+
+
+def test_overlapping_jobs_and_late_results():
+    """A second job that missed the first one's rollups adds nothing; late results reopen their hour"""
+    app, services = _app()
+    now = datetime.utcnow().replace(minute=30)
+    _record_history(services, now)
+    ledger = services.ledger
+
+    with app.app_context():
+        before = totals('hour', now - timedelta(days=2))
+        rolled_up = ledger.roll_up(now)
+        # As if another process planned its roll-up before this one committed
+        with mock.patch('twitter_scanner.ledger.rolled_up', return_value=false()):
+            assert ledger.roll_up(now) == 0
+        assert ScanHourlyRollup.query.count() == rolled_up
+        assert totals('hour', now - timedelta(days=2)) == before
+
+    # A worker batch that ran long writes a check from three hours ago
+    late = now - timedelta(hours=3)
+    hour = hour_of(late)
+    ledger.begin_run('worker')
+    ledger.record(1, 'alive', late, 0.2, new_posts=1)
+    ledger.finish_run()
+    with app.app_context():
+        assert ScanHourlyRollup.query.filter_by(hour=hour).count() == 0
+        after = totals('hour', now - timedelta(days=2))
+        assert after[hour]['checks'] == before[hour]['checks'] + 1
+
+        assert ledger.roll_up(now) == 2
+        assert totals('hour', now - timedelta(days=2)) == after
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All ledger tests passed!")
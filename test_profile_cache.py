@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for profile metadata parsing and the TTL cache
+"""
+
+import time
+
+from bs4 import BeautifulSoup
+
+from twitter_scanner.profile_cache import ProfileCache, parse_count, parse_profile
+
+PROFILE_HTML = """
+<html><head>
+<meta property="og:title" content="Alice Smith (@alice) / X">
+<meta property="og:image" content="https://pbs.twimg.com/profile_images/alice.jpg">
+</head><body>
+<a href="/alice/following"><span>1,024</span> Following</a>
+<a href="/alice/verified_followers"><span>3.4M</span> Followers</a>
+</body></html>
+"""
+
+
+def test_parse_count():
+    """Abbreviated counters are expanded"""
+    assert parse_count('1,234 Followers') == 1234
+    assert parse_count('1.2K') == 1200
+    assert parse_count('3M') == 3_000_000
+    assert parse_count('no digits') is None
+
+
+def test_parse_profile():
+    """Name, avatar and counters come out of the page head and links"""
+    profile = parse_profile(BeautifulSoup(PROFILE_HTML, 'html.parser'), 'alice')
+    assert profile['display_name'] == 'Alice Smith'
+    assert profile['profile_image_url'].endswith('alice.jpg')
+    assert profile['following_count'] == 1024
+    assert profile['followers_count'] == 3_400_000
+
+
+def test_parse_profile_falls_back_to_username():
+    """A page without metadata still yields a usable profile"""
+    profile = parse_profile(BeautifulSoup('<html></html>', 'html.parser'), 'bob')
+    assert profile['display_name'] == 'bob'
+    assert profile['profile_image_url'] == ''
+
+
+def test_cache_serves_stale_and_refreshes():
+    """Stale entries are returned immediately and refreshed in the background"""
+    cache = ProfileCache(ttl=0.05)
+    calls = []
+
+    def fetch(username):
+        calls.append(username)
+        return {'exists': True, 'display_name': f'{username}-{len(calls)}'}
+
+    assert cache.get_or_fetch('Alice', fetch)['display_name'] == 'Alice-1'
+    assert cache.get_or_fetch('alice', fetch)['display_name'] == 'Alice-1'
+    assert len(calls) == 1
+
+    time.sleep(0.1)
+    assert cache.get('alice') is None
+    assert cache.get_or_fetch('alice', fetch)['display_name'] == 'Alice-1'
+    for _ in range(50):
+        if cache.get('alice'):
+            break
+        time.sleep(0.01)
+    assert cache.get('alice')['display_name'] == 'alice-2'
+
+
+def test_stale_missing_profiles_are_fetched_again():
+    """An expired "doesn't exist" entry is a miss, not something to serve while refreshing"""
+    cache = ProfileCache(negative_ttl=0.05)
+    profiles = [{'exists': False}, {'exists': True, 'display_name': 'Newcomer'}]
+    fetch = lambda username: profiles.pop(0)
+
+    assert cache.get_or_fetch('newcomer', fetch)['exists'] is False
+    assert cache.get_or_fetch('newcomer', fetch)['exists'] is False
+    time.sleep(0.1)
+    assert cache.get_or_fetch('newcomer', fetch)['display_name'] == 'Newcomer'
+    assert profiles == []
+
+
+def test_cache_is_bounded():
+    """The least recently used entries are evicted"""
+    cache = ProfileCache(max_entries=2)
+    for name in ('a', 'b', 'c'):
+        cache.put(name, {'exists': True})
+    assert len(cache) == 2
+    assert cache.get('a') is None
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All profile cache tests passed!")
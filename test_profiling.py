@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for the scan profiler
+Runs passes against a fake session with one slow account and checks where the time went
+"""
+
+import time
+
+from scan_fixtures import StubResponse, scanner_app
+from twitter_scanner.profiling import ScanProfiler
+
+
+ACCOUNTS = {'slow': 1, 'quick': 2, 'brisk': 3}
+WORDS = ('launch', 'weather', 'football', 'recipe', 'election', 'concert', 'bitcoin', 'garden', 'museum',
+         'traffic', 'festival', 'vaccine', 'satellite', 'novel', 'harbor', 'glacier', 'opera', 'startup')
+
+
+def _page(username):
+    base = 1790000000000000000 + ACCOUNTS[username] * 10
+    articles = "".join(
+        f'<article data-testid="tweet" data-tweet-id="{base + i}">'
+        f'<time datetime="2024-05-0{i + 1}T10:00:00.000Z"></time>'
+        f'<div data-testid="tweetText">Post {i}</div></article>'
+        for i in range(3)
+    )
+    return f"<html><body>{articles}</body></html>"
+
+
+def _tweet_text(url):
+    """Unrelated words per tweet so near-duplicate detection keeps them all"""
+    n = int(url.rsplit('/', 1)[1]) % 100
+    return ' '.join(WORDS[(n * k + k * k) % len(WORDS)] + str(n * k) for k in range(1, 9))
+
+
+class _Session:
+    """Profile pages and tweet pages; everything from @slow takes 30 ms to arrive"""
+
+    headers = {}
+
+    def get(self, url, timeout=None):
+        username = url.split('/')[3]
+        if username == 'slow':
+            time.sleep(0.03)
+        if '/status/' in url:
+            return StubResponse(f'<div data-testid="tweetText">{_tweet_text(url)}</div>')
+        return StubResponse(_page(username))
+
+
+def _app():
+    return scanner_app(_Session(), ACCOUNTS)
+
+
+def test_disabled_profiler_records_nothing():
+    """Off by default: passes leave no trace"""
+    app, services = _app()
+    assert not services.profiler.enabled
+    assert services.coordinator.run_pass()['checked'] == 3
+    assert services.profiler.report()['passes'] == []
+
+
+def test_stage_times_and_account_costs():
+    """Every stage is timed, and the slow account gets the blame for the fetch time"""
+    app, services = _app()
+    services.profiler.enabled = True
+    record = services.coordinator.run_pass()
+    assert record['new_posts'] == 9
+
+    report = services.profiler.report()
+    assert len(report['passes']) == 1
+    assert {'fetch', 'parse', 'dedup', 'persist', 'notify'} <= set(report['stages'])
+    # 4 pages at 30 ms each
+    assert report['stages']['fetch'] >= 0.12
+    assert sum(report['stages'].values()) <= report['passes'][0]['duration_seconds']
+    slowest = report['costliest_accounts']['fetch'][0]
+    assert slowest['username'] == 'slow' and slowest['share'] > 0.9
+    assert {a['username'] for a in report['costliest_accounts']['parse']} == {'slow', 'quick', 'brisk'}
+
+
+def test_nested_stages_are_exclusive():
+    """A stage inside another is only counted once"""
+    profiler = ScanProfiler(enabled=True)
+    profiler.begin_pass()
+    with profiler.attribute('someone'):
+        with profiler.stage('fetch'):
+            time.sleep(0.02)
+            with profiler.stage('parse'):
+                time.sleep(0.02)
+    profiler.end_pass()
+    report = profiler.report()
+    stages = report['stages']
+    assert 0.02 <= stages['fetch'] < 0.035 and 0.02 <= stages['parse'] < 0.035
+    assert report['costliest_accounts']['parse'] == [{'username': 'someone', 'seconds': stages['parse'], 'share': 1.0}]
+
+
+def test_sampled_stacks_over_endpoints():
+    """Sampling is switched on over HTTP and yields collapsed stacks rooted at stage names"""
+    app, services = _app()
+    client = app.test_client()
+    assert client.post('/api/profiler', json={'sampling': 'yes'}).status_code == 400
+    assert client.post('/api/profiler', json={'enabled': True, 'sampling': True, 'interval_ms': 2}).get_json() == \
+        {'enabled': True, 'sampling': True, 'sample_interval_ms': 2.0}
+    try:
+        services.coordinator.run_pass()
+        services.coordinator.run_pass()
+    finally:
+        client.post('/api/profiler', json={'enabled': False})
+    assert not services.profiler.sampling
+
+    response = client.get('/api/profiler/stacks?passes=1')
+    assert response.mimetype == 'text/plain'
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines and all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    assert any(line.startswith('fetch;') and 'test_profiling.py:get' in line for line in lines)
+    assert len(client.get('/api/profiler').get_json()['passes']) == 2
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All profiler tests passed!")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test script for scraped post records
+Checks the compact record layout and the high-water mark logic that reads it
+"""
+
+from datetime import datetime
+
+from twitter_scanner.monitor import advance_high_water_mark
+from twitter_scanner.records import ScrapedPost, TweetDetails
+
+
+class _Account:
+    last_seen_post_id = None
+    last_seen_post_at = None
+
+
+def test_records_are_compact():
+    """No per-post __dict__, shared usernames and URLs built on demand"""
+    first = ScrapedPost('1', ''.join(['some', 'one']), 'hello', datetime.now())
+    second = ScrapedPost('2', ''.join(['some', 'one']), 'again', datetime.now())
+
+    assert not hasattr(first, '__dict__')
+    assert first.username is second.username
+    assert first.url == 'https://twitter.com/someone/status/1'
+
+    details = TweetDetails('hello', first.url)
+    assert details.text == 'hello'
+
+
+def test_high_water_mark_skips_pinned_records():
+    """The mark moves to the newest real post, never to a pinned one"""
+    now = datetime.now()
+    account = _Account()
+    posts = [
+        ScrapedPost('900', 'someone', 'pinned', now, pinned=True),
+        ScrapedPost('120', 'someone', 'newest', now),
+        ScrapedPost('110', 'someone', 'older', now),
+    ]
+    advance_high_water_mark(account, posts)
+    assert account.last_seen_post_id == '120'
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All record tests passed!")
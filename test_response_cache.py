@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for dashboard response caching
+"""
+
+import gzip
+from unittest import mock
+
+from twitter_scanner import create_app
+
+
+def _app():
+    with mock.patch('twitter_scanner.notifier.TelegramBot.test_connection', return_value=False):
+        return create_app('serverless', STORE='memory', SCAN_DELAY_SECONDS=0)
+
+
+def test_etag_and_not_modified():
+    """A repeated read is a cache hit and a conditional read is a 304"""
+    app = _app()
+    client = app.test_client()
+    client.post('/api/accounts', json={'username': 'someone'})
+    cache = app.extensions['twitter_scanner'].response_cache
+
+    first = client.get('/api/accounts')
+    etag = first.headers['ETag']
+    assert first.get_json()[0]['username'] == 'someone'
+
+    second = client.get('/api/accounts')
+    assert second.headers['ETag'] == etag
+    assert cache.hits == 1
+
+    not_modified = client.get('/api/accounts', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b''
+
+
+def test_writes_invalidate():
+    """Adding an account or scanning changes the cached body"""
+    app = _app()
+    client = app.test_client()
+    account_id = client.post('/api/accounts', json={'username': 'someone'}).get_json()['id']
+    etag = client.get(f'/api/posts/{account_id}').headers['ETag']
+
+    client.post(f'/api/check/{account_id}')
+    response = client.get(f'/api/posts/{account_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert len(response.get_json()) == 1
+
+    before = client.get('/api/accounts/search', query_string={'q': 'new'}).get_json()
+    client.post('/api/accounts', json={'username': 'newcomer'})
+    after = client.get('/api/accounts/search', query_string={'q': 'new'}).get_json()
+    assert before == [] and [a['username'] for a in after] == ['newcomer']
+
+
+def test_versions_are_per_app_and_skip_scan_bookkeeping():
+    """Another app's writes and quiet scan passes leave the cache alone; stored posts don't"""
+    app, other = _app(), _app()
+    client = app.test_client()
+    account_id = client.post('/api/accounts', json={'username': 'someone'}).get_json()['id']
+    cache = app.extensions['twitter_scanner'].response_cache
+    version = cache.version
+
+    other.test_client().post('/api/accounts', json={'username': 'elsewhere'})
+    assert cache.version == version
+
+    services = app.extensions['twitter_scanner']
+    with mock.patch.object(services.scraper, 'get_user_posts', return_value=[]):
+        # The first check closes the new account's breaker, which is a real change
+        services.coordinator.run_pass()
+        version = cache.version
+        record = services.coordinator.run_pass()
+    # Only last_checked and the scan ledger were written, neither is on the cached pages
+    assert record['checked'] == 1 and cache.version == version
+
+    client.post(f'/api/check/{account_id}')
+    assert cache.version > version
+
+
+def test_index_fallback_is_not_cached():
+    """The health-check body served when the dashboard fails isn't kept in place of the page"""
+    app = _app()
+    client = app.test_client()
+    with mock.patch('twitter_scanner.routes.render_template', side_effect=RuntimeError('database is locked')):
+        fallback = client.get('/')
+    assert fallback.status_code == 200 and fallback.get_json()['status'] == 'running'
+    assert 'no-store' in fallback.headers['Cache-Control']
+    assert len(app.extensions['twitter_scanner'].response_cache) == 0
+
+    with mock.patch('twitter_scanner.routes.render_template', return_value='<html>dashboard</html>'):
+        assert client.get('/').data == b'<html>dashboard</html>'
+
+
+def test_large_responses_are_compressed():
+    """Clients that accept gzip get a compressed body with its own ETag"""
+    app = _app()
+    client = app.test_client()
+    for i in range(20):
+        client.post('/api/accounts', json={'username': f'account_{i}'})
+
+    plain = client.get('/api/accounts')
+    compressed = client.get('/api/accounts', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.data) == plain.data
+    assert compressed.headers['ETag'] != plain.headers['ETag']
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All response cache tests passed!")
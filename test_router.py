@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test script for notification fan-out
+Uses in-process channels so nothing leaves the machine
+"""
+
+import threading
+import time
+from unittest import mock
+
+from twitter_scanner import create_app
+from twitter_scanner.channels import DefaultChannel, Message, SmsChannel, WebhookChannel
+from twitter_scanner.notifier import TelegramBot
+from twitter_scanner.router import NotificationRouter
+
+
+class _SlowChannel:
+    def __init__(self, delay=0.05, failures=0):
+        self.delay = delay
+        self.failures = failures
+        self.received = []
+        self._lock = threading.Lock()
+
+    def send(self, target, message):
+        time.sleep(self.delay)
+        with self._lock:
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("temporary outage")
+            self.received.append((target, message))
+        return True
+
+
+def test_fan_out_does_not_block_the_caller():
+    """50 slow destinations are queued instantly and all delivered after a drain"""
+    webhook = _SlowChannel()
+    router = NotificationRouter({'webhook': webhook}, workers=8, rates={'webhook': 1000}, backoff=0)
+    destinations = tuple(('webhook', f'https://example.com/hook/{i}') for i in range(50))
+
+    started = time.perf_counter()
+    assert router.send_message('<b>hi</b>', destinations=destinations, username='someone') == 50
+    assert time.perf_counter() - started < 0.05
+
+    assert router.drain(timeout=5)
+    assert len(webhook.received) == 50
+    # Rendered once, shared by every destination
+    assert len({id(message) for _, message in webhook.received}) == 1
+    assert webhook.received[0][1].plain == 'hi'
+
+
+def test_failed_sends_are_retried():
+    """A flaky channel is retried until it succeeds"""
+    sms = _SlowChannel(delay=0, failures=2)
+    router = NotificationRouter({'sms': sms}, workers=1, rates={'sms': 1000}, retries=3, backoff=0)
+    router.send_message(Message('<b>hi</b>'), destinations=(('sms', '+15550100'),))
+    assert router.drain(timeout=5)
+    assert router.status()['sms']['sent'] == 1
+    assert router.status()['sms']['retried'] == 2
+
+
+def test_permanent_failures_are_not_retried():
+    """An unconfigured channel or a rejected webhook fails at once; 429 and 5xx are retried"""
+    with mock.patch.dict('os.environ', {'TWILIO_ACCOUNT_SID': '', 'TWILIO_AUTH_TOKEN': ''}):
+        sms = SmsChannel()
+    router = NotificationRouter({'sms': sms, 'webhook': WebhookChannel()}, workers=1,
+                                rates={'sms': 1000, 'webhook': 1000}, retries=3, backoff=1)
+    statuses = iter([400, 429, 503, 200])
+    with mock.patch('requests.post', side_effect=lambda *a, **kw: mock.Mock(status_code=next(statuses))):
+        started = time.perf_counter()
+        router.send_message('<b>hi</b>', destinations=(('sms', '+15550100'), ('webhook', 'https://example.com/bad')))
+        assert router.drain(timeout=5)
+        # No backoff sleeps for either
+        assert time.perf_counter() - started < 0.5
+        assert router.status()['sms'] == dict(router.status()['sms'], sent=0, failed=1, retried=0)
+        assert router.status()['webhook'] == dict(router.status()['webhook'], sent=0, failed=1, retried=0)
+
+        router.channels['webhook'].backoff = 0
+        router.send_message('<b>hi</b>', destinations=(('webhook', 'https://example.com/busy'),))
+        assert router.drain(timeout=5)
+    assert router.status()['webhook'] == dict(router.status()['webhook'], sent=1, failed=1, retried=2)
+
+
+def test_default_channel_gives_up_on_rejected_chats():
+    """TELEGRAM_CHAT_ID going through the default channel fails at once on a 4xx and retries a 5xx"""
+    with mock.patch.dict('os.environ', {'TELEGRAM_BOT_TOKEN': 'token', 'TELEGRAM_CHAT_ID': '-100'}):
+        bot = TelegramBot()
+    statuses = iter([400, 502, 200])
+    bot._session = mock.Mock()
+    bot._session.post.side_effect = lambda *a, **kw: mock.Mock(status_code=next(statuses), text='chat not found')
+    router = NotificationRouter({'default': DefaultChannel(bot)}, workers=1, rates={'default': 1000},
+                                retries=3, backoff=1)
+
+    started = time.perf_counter()
+    router.send_message('<b>hi</b>')
+    assert router.drain(timeout=5)
+    assert time.perf_counter() - started < 0.5
+    assert router.status()['default'] == dict(router.status()['default'], sent=0, failed=1, retried=0)
+
+    router.channels['default'].backoff = 0
+    router.send_message('<b>hi</b>')
+    assert router.drain(timeout=5)
+    assert router.status()['default'] == dict(router.status()['default'], sent=1, failed=1, retried=1)
+
+
+def test_accounts_map_to_destinations():
+    """Destinations are created and attached to accounts through the API"""
+    with mock.patch('twitter_scanner.notifier.TelegramBot.test_connection', return_value=False):
+        app = create_app('serverless', STORE='memory', SCAN_DELAY_SECONDS=0)
+    client = app.test_client()
+    account_id = client.post('/api/accounts', json={'username': 'someone'}).get_json()['id']
+    hook = client.post('/api/destinations', json={'channel': 'webhook', 'target': 'https://example.com/hook'})
+    assert hook.status_code == 201
+    assert client.post('/api/destinations', json={'channel': 'fax', 'target': '1'}).status_code == 400
+
+    response = client.post(f'/api/accounts/{account_id}/destinations',
+                           json={'destination_ids': [hook.get_json()['id']]})
+    assert [d['channel'] for d in response.get_json()] == ['webhook']
+
+    scanner = app.extensions['twitter_scanner'].scanner
+    with app.app_context():
+        from twitter_scanner import MonitoredAccount
+        account = MonitoredAccount.query.get(account_id)
+        assert scanner.destinations_for(account) == (('webhook', 'https://example.com/hook'),)
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All router tests passed!")
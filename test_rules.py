@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for keyword and regex alert rules
+"""
+
+import random
+from unittest import mock
+
+from twitter_scanner import create_app
+from twitter_scanner.rules import KeywordAutomaton, RuleSet
+
+
+def test_automaton_matches_like_substring_search():
+    """Aho-Corasick finds exactly the keywords a naive search finds, after adds and removes"""
+    rng = random.Random(7)
+    keywords = {i: ''.join(rng.choice('abc') for _ in range(rng.randint(1, 4))) for i in range(60)}
+    automaton = KeywordAutomaton()
+    for value, keyword in keywords.items():
+        automaton.add(keyword, value)
+    for value in range(0, 60, 3):
+        automaton.remove(value)
+        del keywords[value]
+    automaton.add('ABCA', 100)
+    keywords[100] = 'abca'
+
+    for _ in range(200):
+        text = ''.join(rng.choice('abcd') for _ in range(rng.randint(0, 30)))
+        expected = {value for value, keyword in keywords.items() if keyword in text}
+        assert set(automaton.iter_matches(text.upper())) == expected
+
+
+def test_rule_scopes():
+    """Global rules filter every account, account rules only their own"""
+    rules = RuleSet()
+    assert rules.should_notify(1, 'anything')
+
+    rules.add(1, 7, 'keyword', 'Launch')
+    assert rules.should_notify(1, 'anything')
+    assert not rules.should_notify(7, 'nothing here')
+    assert rules.match(7, 'big LAUNCH today') == 1
+
+    rules.add(2, None, 'regex', r'\bv\d+\.\d+\b')
+    assert not rules.should_notify(1, 'anything')
+    assert rules.match(1, 'shipping v2.1 now') == 2
+    assert rules.match(7, 'shipping v2.1 now') == 2
+
+    rules.remove(2)
+    assert rules.should_notify(1, 'anything')
+
+
+def test_scan_only_notifies_matching_posts():
+    """Posts are still stored, but only matching ones are notified"""
+    with mock.patch('twitter_scanner.notifier.TelegramBot.test_connection', return_value=False):
+        app = create_app('serverless', STORE='memory', SCAN_DELAY_SECONDS=0)
+    client = app.test_client()
+    account_id = client.post('/api/accounts', json={'username': 'someone'}).get_json()['id']
+
+    assert client.post('/api/rules', json={'kind': 'regex', 'pattern': '('}).status_code == 400
+    rule = client.post('/api/rules', json={'kind': 'keyword', 'pattern': 'never mentioned',
+                                           'account_id': account_id})
+    assert rule.status_code == 201
+
+    client.post(f'/api/check/{account_id}')
+    [post] = client.get(f'/api/posts/{account_id}').get_json()
+    assert not post['is_notified']
+
+    client.delete(f"/api/rules/{rule.get_json()['id']}")
+    scanner = app.extensions['twitter_scanner'].scanner
+    assert len(scanner.rules) == 0
+    with app.app_context():
+        scanner.refresh_rules()
+    assert len(scanner.rules) == 0
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All alert rule tests passed!")
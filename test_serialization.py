@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Test script for the fast JSON path
+The column-only dicts must serialize exactly like to_dict()
+"""
+
+import json
+from unittest import mock
+
+from twitter_scanner import create_app, MonitoredAccount, PostHistory
+from twitter_scanner.serialization import account_dicts, dumps, post_dicts
+
+
+def test_fast_path_matches_to_dict():
+    """Same JSON as to_dict() for accounts and posts"""
+    with mock.patch('twitter_scanner.notifier.TelegramBot.test_connection', return_value=False):
+        app = create_app('serverless', STORE='memory', SCAN_DELAY_SECONDS=0)
+    client = app.test_client()
+    account_id = client.post('/api/accounts', json={'username': 'someone'}).get_json()['id']
+    client.post(f'/api/check/{account_id}')
+
+    with app.app_context():
+        accounts = [account.to_dict() for account in MonitoredAccount.query.all()]
+        posts = [post.to_dict() for post in PostHistory.query.all()]
+        assert json.loads(dumps(account_dicts(MonitoredAccount.query))) == accounts
+        assert json.loads(dumps(post_dicts(PostHistory.query))) == posts
+
+    assert client.get('/api/accounts').get_json() == accounts
+    exported = client.get('/api/accounts/export?format=json').get_json()
+    assert [row['username'] for row in exported] == ['someone']
+
+
+if __name__ == '__main__':
+    test_fast_path_matches_to_dict()
+    print("✅ Fast path matches to_dict")
+    print("\n🎉 All serialization tests passed!")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test script for streamed profile page downloads
+Checks that a page cut short parses to the same posts as the whole page,
+that oversized pages are abandoned, and that passes report the bytes saved
+"""
+
+import asyncio
+from datetime import datetime
+from unittest import mock
+
+from twitter_scanner import create_app, db, MonitoredAccount
+from twitter_scanner.async_scan import AsyncScraper
+from twitter_scanner.notifier import TelegramBot
+from twitter_scanner.scraper import MinimalTwitterScraper, ScrapeError
+from twitter_scanner.streaming import CHUNK_SIZE
+
+BASE_ID = 1790000000000000000
+PADDING = 'x' * 4000
+
+
+def _page(posts=40, pinned=False):
+    """Newest first, each article about 4 KB so the page spans a few dozen chunks"""
+    articles = []
+    if pinned:
+        articles.append(f'<article data-testid="tweet" data-tweet-id="{BASE_ID}">'
+                        f'<div data-testid="socialContext"><span>Pinned</span></div>'
+                        f'<time datetime="2024-01-01T00:00:00.000Z"></time>'
+                        f'<div data-testid="tweetText">Old pinned post</div></article>')
+    for i in range(posts):
+        articles.append(f'<article data-testid="tweet" data-tweet-id="{BASE_ID + 1000 - i}">'
+                        f'<time datetime="2024-05-{28 - i % 28:02d}T{23 - i // 28:02d}:00:00.000Z"></time>'
+                        f'<div data-testid="tweetText">Post {i} café</div><p>{PADDING}</p></article>')
+    return f'<html><body><main>{"".join(articles)}</main></body></html>'.encode('utf-8')
+
+
+class _Response:
+    """A stream=True response that counts how much of the body was taken"""
+
+    def __init__(self, body, status_code=200):
+        self.status_code = status_code
+        self.body = body
+        self.headers = {'Content-Length': str(len(body))}
+        self.encoding = 'utf-8'
+        self.raw = None
+        self.chunks = 0
+        self.closed = False
+
+    @property
+    def text(self):
+        return self.body.decode(self.encoding)
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            self.chunks += 1
+            yield self.body[start:start + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+class _Session:
+    headers = {}
+
+    def __init__(self, body):
+        self.body = body
+        self.responses = []
+
+    def get(self, url, timeout=None, stream=False):
+        self.responses.append(_Response(self.body))
+        return self.responses[-1]
+
+
+def _scraper(body, streaming=True):
+    scraper = MinimalTwitterScraper()
+    scraper._session = _Session(body)
+    scraper.rate_limiter.rate = 0
+    scraper.streaming = streaming
+    return scraper
+
+
+def test_streamed_posts_match_whole_page():
+    """Same posts as parsing the full page, from a fraction of it"""
+    since_time = datetime(2024, 5, 20, 12)
+    cases = [
+        {'body': _page(), 'max_posts': 5},
+        {'body': _page(pinned=True), 'max_posts': 5, 'since_id': str(BASE_ID + 1000 - 6)},
+        {'body': _page(pinned=True), 'max_posts': 5, 'since_id': str(BASE_ID + 1000 - 12)},
+        {'body': _page(pinned=True), 'max_posts': 5, 'since_time': since_time},
+    ]
+    for case in cases:
+        body = case.pop('body')
+        buffered = _scraper(body, streaming=False).parse_user_posts('someone', 200, body.decode(), **case)
+        streamed_scraper = _scraper(body)
+        streamed = streamed_scraper.get_user_posts('someone', **case)
+        assert [(p.id, p.text, p.created_at, p.pinned) for p in streamed] == \
+            [(p.id, p.text, p.created_at, p.pinned) for p in buffered], case
+        response = streamed_scraper.session.responses[0]
+        assert response.closed and response.chunks < len(body) / CHUNK_SIZE / 2, (case, response.chunks)
+
+    stats = streamed_scraper.stream_stats.snapshot()
+    assert stats['pages'] == 1 and stats['cut_short'] == 1 and 0 < stats['bytes_saved'] < len(body)
+
+
+def test_oversized_page_is_abandoned():
+    """A page past SCRAPER_MAX_BODY_KB without enough posts is a failed check"""
+    scraper = _scraper(_page(posts=3) + b' ' * 200000)
+    scraper.max_body_bytes = 100000
+    try:
+        scraper.get_user_posts('someone', max_posts=5)
+    except ScrapeError as e:
+        assert 'larger than' in str(e)
+    else:
+        raise AssertionError('oversized page was parsed')
+    assert scraper.session.responses[0].closed
+    # Small pages that simply run out of posts are read to the end
+    scraper = _scraper(_page(posts=3))
+    assert len(scraper.get_user_posts('someone', max_posts=5)) == 3
+    assert scraper.stream_stats.snapshot() == {'pages': 1, 'cut_short': 0, 'bytes_read': len(_page(posts=3)),
+                                               'bytes_saved': 0}
+
+
+def test_pass_reports_bytes_saved():
+    """Pass records carry the bytes read and saved while streaming"""
+    with mock.patch.object(TelegramBot, 'test_connection', return_value=False):
+        app = create_app('default', STORE='memory', SCHEDULER=False, NOTIFIER='none', SCAN_DELAY_SECONDS=0)
+    services = app.extensions['twitter_scanner']
+    services.scraper._session = _Session(_page())
+    services.scraper.rate_limiter.rate = 0
+    services.scraper.streaming = True
+    with app.app_context():
+        db.session.add(MonitoredAccount(username='someone', display_name='someone'))
+        db.session.commit()
+    record = services.coordinator.run_pass()
+    assert record['checked'] == 1 and record['pages_cut_short'] == 1
+    assert 0 < record['bytes_read'] < record['bytes_saved']
+
+
+def test_async_streaming_over_httpx():
+    """AsyncScraper streams through httpx and stops at the same place"""
+    import httpx
+    body = _page(pinned=True)
+    since_id = str(BASE_ID + 1000 - 3)
+    scraper = _scraper(body)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body)))
+    # No executor: parsing goes to the loop's default thread pool
+    async_scraper = AsyncScraper(scraper, None, client=client)
+
+    async def fetch():
+        try:
+            return await async_scraper.get_user_posts('someone', max_posts=5, since_id=since_id)
+        finally:
+            await async_scraper.aclose()
+
+    posts = asyncio.run(fetch())
+    assert [p.id for p in posts] == [str(BASE_ID + 1000 - i) for i in range(3)]
+    stats = scraper.stream_stats.snapshot()
+    assert stats['cut_short'] == 1 and stats['bytes_read'] < len(body) / 2
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All streaming tests passed!")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test script for timeline parsing
+Feeds a canned profile page to the scraper and checks post times and early stops
+"""
+
+from datetime import datetime
+
+from twitter_scanner.scraper import MinimalTwitterScraper, parse_post_time
+
+
+def _article(tweet_id, when, text, pinned=False):
+    context = '<div data-testid="socialContext">Pinned</div>' if pinned else ''
+    return f"""
+<article data-testid="tweet" data-tweet-id="{tweet_id}">
+  {context}
+  <time datetime="{when}">{when}</time>
+  <div data-testid="tweetText">{text}</div>
+</article>"""
+
+
+TIMELINE_HTML = "<html><body>" + "".join([
+    _article('100', '2023-01-01T08:00:00.000Z', 'Old pinned post', pinned=True),
+    _article('503', '2024-05-03T10:00:00.000Z', 'Newest post'),
+    _article('502', '2024-05-02T10:00:00.000Z', 'Middle post'),
+    _article('501', '2024-05-01T10:00:00.000Z', 'Oldest post'),
+]) + "</body></html>"
+
+
+class _Response:
+    status_code = 200
+    text = TIMELINE_HTML
+
+
+class _Session:
+    def get(self, url, timeout=None):
+        return _Response()
+
+
+def _scraper():
+    scraper = MinimalTwitterScraper()
+    scraper._session = _Session()
+    return scraper
+
+
+def test_parse_post_time():
+    """Z, offsets and junk all normalize to naive UTC or None"""
+    assert parse_post_time('2024-05-01T12:34:56.000Z') == datetime(2024, 5, 1, 12, 34, 56)
+    assert parse_post_time('2024-05-01T14:34:56+02:00') == datetime(2024, 5, 1, 12, 34, 56)
+    assert parse_post_time('2024-05-01T12:34:56') == datetime(2024, 5, 1, 12, 34, 56)
+    assert parse_post_time('yesterday') is None
+    assert parse_post_time(None) is None
+
+
+def test_posts_carry_real_times():
+    """created_at comes from the <time> element"""
+    posts = _scraper().get_user_posts('someone', max_posts=5)
+    assert [p.id for p in posts] == ['100', '503', '502', '501']
+    assert posts[1].created_at == datetime(2024, 5, 3, 10, 0)
+
+
+def test_parsing_stops_at_last_seen_time():
+    """Old pinned posts are dropped and the walk ends at the first seen post"""
+    posts = _scraper().get_user_posts('someone', since_id='not-a-snowflake',
+                                      since_time=datetime(2024, 5, 2, 10, 0))
+    assert [p.id for p in posts] == ['503']
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All timeline tests passed!")
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Test script for the durable scan queue
+Checks leasing, visibility timeouts, retries, dead letters and workers offline
+"""
+
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from unittest import mock
+
+from twitter_scanner import create_app, db, MonitoredAccount, PostHistory, ScanTask
+from twitter_scanner.notifier import TelegramBot
+from twitter_scanner.records import ScrapedPost, TweetDetails
+from twitter_scanner.work_queue import DEAD, DONE, LEASED, QUEUED, ScanQueue, ScanWorker
+
+
+def _app(**overrides):
+    overrides.setdefault('STORE', 'memory')
+    overrides.setdefault('SCAN_DELAY_SECONDS', 0)
+    with mock.patch.object(TelegramBot, 'test_connection', return_value=False):
+        app = create_app('serverless', **overrides)
+    with app.app_context():
+        for username in ('alpha', 'beta', 'gamma'):
+            db.session.add(MonitoredAccount(username=username, display_name=username))
+        db.session.commit()
+    return app
+
+
+def test_enqueue_skips_pending_accounts():
+    """A second pass doesn't queue accounts that still have a task waiting"""
+    app = _app()
+    queue = ScanQueue()
+    with app.app_context():
+        assert queue.enqueue_pass() == 3
+        assert queue.enqueue_pass() == 0
+        MonitoredAccount.query.filter_by(username='gamma').update({'is_active': False})
+        ScanTask.query.update({'state': DONE, 'finished_at': datetime.utcnow()})
+        db.session.commit()
+        assert queue.enqueue_pass() == 2
+
+
+def test_lease_expiry_and_ownership():
+    """An expired lease is claimable again, and its old owner can no longer finish it"""
+    app = _app()
+    queue = ScanQueue(visibility_timeout=60)
+    now = datetime.utcnow()
+    with app.app_context():
+        queue.enqueue_pass(now=now)
+        first = queue.claim('worker-a', limit=5, now=now)
+        assert len(first) == 3 and all(t.state == LEASED and t.attempts == 1 for t in first)
+        assert queue.claim('worker-b', now=now) == []
+
+        later = now + timedelta(seconds=61)
+        taken = queue.claim('worker-b', limit=1, now=later)
+        assert len(taken) == 1 and taken[0].attempts == 2
+        assert not queue.complete(taken[0], 'worker-a')
+        assert queue.complete(taken[0], 'worker-b')
+        assert db.session.get(ScanTask, taken[0].id).state == DONE
+
+
+def test_retries_then_dead_letter():
+    """Failures back off exponentially and end up dead-lettered, then can be requeued"""
+    app = _app()
+    queue = ScanQueue(max_attempts=2, retry_backoff=10)
+    now = datetime.utcnow()
+    with app.app_context():
+        queue.enqueue_pass(now=now)
+        task = queue.claim('w', now=now)[0]
+        queue.fail(task, 'w', RuntimeError('boom'), now=now)
+        task = db.session.get(ScanTask, task.id)
+        assert task.state == QUEUED and task.available_at == now + timedelta(seconds=10)
+
+        # Not due yet, so the other accounts come first
+        assert [t.id for t in queue.claim('w', limit=5, now=now)] != [task.id]
+        retried = queue.claim('w', limit=5, now=now + timedelta(seconds=11))
+        assert [t.id for t in retried] == [task.id]
+        queue.fail(retried[0], 'w', RuntimeError('boom again'), now=now)
+        task = db.session.get(ScanTask, task.id)
+        assert task.state == DEAD and task.last_error == 'boom again'
+        assert queue.stats()['dead_letters'][0]['id'] == task.id
+
+        assert queue.requeue_dead() == 1
+        assert db.session.get(ScanTask, task.id).state == QUEUED
+
+
+def test_worker_drains_queue():
+    """A worker checks every queued account, and a failing task is retried, not lost"""
+    app = _app()
+    services = app.extensions['twitter_scanner']
+    services.scan_queue.retry_backoff = 0
+    with app.app_context():
+        services.scan_queue.enqueue_pass()
+
+    scanner = services.scanner
+    real_check = scanner.check_account
+    failures = []
+
+    def flaky_check(account):
+        if account.username == 'beta' and not failures:
+            failures.append(account.username)
+            raise RuntimeError('database went away')
+        return real_check(account)
+
+    with mock.patch.object(scanner, 'check_account', side_effect=flaky_check):
+        stats = ScanWorker(app, worker_id='test', batch_size=2, poll_interval=0).run(once=True)
+
+    assert stats['completed'] == 3 and stats['failed'] == 1
+    with app.app_context():
+        assert ScanTask.query.filter_by(state=DONE).count() == 3
+        assert MonitoredAccount.query.filter(MonitoredAccount.last_checked.isnot(None)).count() == 3
+
+
+def test_workers_see_each_others_posts_for_dedup():
+    """A near-duplicate of a post another worker stored after this one started is still caught"""
+    path = os.path.join(tempfile.mkdtemp(), 'dedup.db')
+    first = _app(STORE='file', SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}', SCAN_QUEUE=True)
+    # The second app seeds no accounts of its own; it shares the first one's database
+    with mock.patch.object(TelegramBot, 'test_connection', return_value=False):
+        second = create_app('serverless', STORE='file', SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}',
+                            SCAN_DELAY_SECONDS=0, SCAN_QUEUE=True)
+    worker = ScanWorker(second, worker_id='second', poll_interval=0)
+    with second.app_context():
+        worker.scanner.ensure_dedup_index()
+        assert len(worker.scanner.dedup_index) == 0
+
+    text = 'Northern bridge closed after the storm, expect delays on the ring road tonight'
+    with first.app_context():
+        alpha = MonitoredAccount.query.filter_by(username='alpha').one()
+        post = ScrapedPost('1790000000000000001', 'alpha', text, datetime.utcnow())
+        details = {post.url: TweetDetails(text, post.url)}
+        first.extensions['twitter_scanner'].scanner.record_posts(alpha, [post], details)
+        db.session.commit()
+        ScanQueue().enqueue_pass()
+
+    repost = ScrapedPost('1790000000000000002', 'beta', text + ' https://t.co/abc', datetime.utcnow())
+    scanner = worker.scanner
+    with mock.patch.object(scanner.scraper, 'get_user_posts', side_effect=lambda username, **kw:
+                           [repost] if username == 'beta' else []), \
+            mock.patch.object(scanner.scraper, 'get_tweet_details', return_value=TweetDetails(repost.text, repost.url)):
+        worker.run(once=True)
+    with second.app_context():
+        assert [p.post_id for p in PostHistory.query] == ['1790000000000000001']
+
+
+def test_concurrent_claims_never_overlap():
+    """Workers claiming from one SQLite file at once never get the same task"""
+    path = os.path.join(tempfile.mkdtemp(), 'queue.db')
+    app = _app(STORE='file', SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}')
+    queue = ScanQueue()
+    with app.app_context():
+        db.session.bulk_insert_mappings(MonitoredAccount, [
+            {'username': f'bulk_{i}', 'display_name': f'bulk_{i}'} for i in range(200)
+        ])
+        db.session.commit()
+        total = queue.enqueue_pass()
+
+    claimed = []
+
+    def work(owner):
+        with app.app_context():
+            while True:
+                tasks = queue.claim(owner, limit=3)
+                if not tasks:
+                    break
+                claimed.extend(task.id for task in tasks)
+
+    threads = [threading.Thread(target=work, args=(f'w{i}',)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    assert len(claimed) == total == len(set(claimed))
+
+
+def test_trigger_scan_queues_when_enabled():
+    """With SCAN_QUEUE the manual trigger hands the pass to the workers"""
+    app = _app(SCAN_QUEUE=True)
+    client = app.test_client()
+    response = client.post('/api/trigger-scan')
+    assert response.status_code == 202 and response.get_json()['queued'] == 3
+    assert client.get('/api/scan-queue').get_json()['counts'][QUEUED] == 3
+    assert client.post('/api/scan-queue/requeue', json={'task_ids': 'all'}).status_code == 400
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
+    print("\n🎉 All work queue tests passed!")
@@ -0,0 +1,13 @@
+"""
+Twitter Scanner
+Monitors Twitter accounts and sends new posts to Telegram. Every deployment
+entry point builds its app with create_app(profile).
+"""
+
+from .config import PROFILES
+from .factory import create_app
+from .models import (db, AccountGroup, AlertRule, MonitoredAccount, NotificationDestination, PostHistory,
+                     ScanAccountResult, ScanHourlyRollup, ScanRun, ScanTask)
+
+__all__ = ['create_app', 'PROFILES', 'db', 'AccountGroup', 'AlertRule', 'MonitoredAccount', 'NotificationDestination',
+           'PostHistory', 'ScanAccountResult', 'ScanHourlyRollup', 'ScanRun', 'ScanTask']
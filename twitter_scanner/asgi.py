@@ -0,0 +1,338 @@
+"""
+ASGI entry point
+create_asgi_app(profile) serves the same Flask app under an ASGI server such
+as uvicorn. The JSON API runs on a thread pool behind a small WSGI bridge,
+scan passes run as tasks on the server's event loop (see async_scan), and
+dashboards can follow scans over Server-Sent Events or long polling. Those
+waiting clients are coroutines, so thousands of them cost little more than
+their sockets.
+"""
+
+import asyncio
+import io
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import parse_qs
+
+from .async_scan import AsyncScanner
+from .config import load_config
+from .factory import create_app
+
+# Comment lines keep idle SSE connections open through proxies
+SSE_HEARTBEAT_SECONDS = 15
+LONG_POLL_MAX_SECONDS = 60
+
+
+class EventHub:
+    """Numbered scan events with a backlog, for SSE and long-poll clients
+
+    Every waiting client shares one asyncio.Event that is swapped on each
+    publish, so a publish costs the same however many clients are waiting.
+    Clients more than `backlog` events behind skip ahead.
+    """
+
+    def __init__(self, backlog=1000):
+        self.seq = 0
+        self.backlog = deque(maxlen=backlog)
+        self._wakeup = None
+
+    def _event(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        return self._wakeup
+
+    def publish(self, kind, data):
+        """Record an event and wake every waiting client; call from the event loop"""
+        self.seq += 1
+        self.backlog.append((self.seq, kind, data))
+        wakeup, self._wakeup = self._wakeup, None
+        if wakeup is not None:
+            wakeup.set()
+
+    def since(self, seq):
+        """Events numbered above seq that are still in the backlog"""
+        if not self.backlog or seq >= self.seq:
+            return []
+        first = self.backlog[0][0]
+        return list(islice(self.backlog, max(0, seq + 1 - first), None))
+
+    async def wait(self, seq, timeout):
+        """Events after seq, waiting up to timeout seconds for the first one"""
+        events = self.since(seq)
+        if events or timeout <= 0:
+            return events
+        try:
+            await asyncio.wait_for(self._event().wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.since(seq)
+
+    async def watch_data_version(self, cache, interval=1.0):
+        """Publish 'data' whenever a commit changed the accounts or posts behind the app's ResponseCache"""
+        version = cache.version
+        while True:
+            await asyncio.sleep(interval)
+            if cache.version != version:
+                version = cache.version
+                self.publish('data', {'version': version})
+
+
+def wsgi_environ(scope, body):
+    """WSGI environ for an ASGI HTTP scope and its complete request body"""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf8').decode('latin1'),
+        'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('latin1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = scope['client'][0], str(scope['client'][1])
+
+    for name, value in scope['headers']:
+        name = name.decode('latin1')
+        if name == 'content-type':
+            key = 'CONTENT_TYPE'
+        elif name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        value = value.decode('latin1')
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    # The body is already complete, whatever the client said about chunking
+    environ['CONTENT_LENGTH'] = str(len(body))
+    environ.pop('HTTP_TRANSFER_ENCODING', None)
+    return environ
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+class WsgiBridge:
+    """Runs a WSGI app on a thread pool, one thread per request from start to close
+
+    Keeping a request on one thread matters for Flask's context locals and
+    stream_with_context. Bodies up to buffer_size come back in one piece;
+    longer ones (streamed exports) are handed to the loop chunk by chunk.
+    """
+
+    def __init__(self, wsgi_app, workers=32, buffer_size=65536):
+        self.wsgi_app = wsgi_app
+        self.buffer_size = buffer_size
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix='TwitterScannerWSGI')
+
+    def _run(self, environ, loop, head, chunks):
+        """Sets head to (status, headers, body, more); with more, the rest goes through chunks"""
+        response = []
+
+        def start_response(status, headers, exc_info=None):
+            response[:] = [int(status.split(' ', 1)[0]), headers]
+
+        def put(item):
+            # Waits while the client is slower than the app
+            asyncio.run_coroutine_threadsafe(chunks.put(item), loop).result()
+
+        streaming = False
+        try:
+            result = self.wsgi_app(environ, start_response)
+            try:
+                body, size = [], 0
+                for chunk in result:
+                    if streaming:
+                        if chunk:
+                            put(chunk)
+                        continue
+                    body.append(chunk)
+                    size += len(chunk)
+                    if size >= self.buffer_size:
+                        streaming = True
+                        loop.call_soon_threadsafe(head.set_result, (*response, b''.join(body), True))
+                if not streaming:
+                    loop.call_soon_threadsafe(head.set_result, (*response, b''.join(body), False))
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+        except Exception as e:
+            print(f"❌ Error in request {environ['REQUEST_METHOD']} {environ['PATH_INFO']}: {e}")
+            if not streaming:
+                loop.call_soon_threadsafe(head.set_result, (500, [('Content-Type', 'text/plain')],
+                                                            b'Internal Server Error', False))
+        if streaming:
+            put(None)
+
+    async def __call__(self, scope, receive, send):
+        environ = wsgi_environ(scope, await read_body(receive))
+        loop = asyncio.get_running_loop()
+        head = loop.create_future()
+        chunks = asyncio.Queue(maxsize=8)
+        done = loop.run_in_executor(self.executor, self._run, environ, loop, head, chunks)
+
+        status, headers, body, more = await head
+        try:
+            await send({'type': 'http.response.start', 'status': status,
+                        'headers': [(k.lower().encode('latin1'), v.encode('latin1')) for k, v in headers]})
+            await send({'type': 'http.response.body', 'body': body, 'more_body': more})
+            while more:
+                chunk = await chunks.get()
+                await send({'type': 'http.response.body', 'body': chunk or b'', 'more_body': chunk is not None})
+                more = chunk is not None
+        finally:
+            # A client that went away mid-stream still has to be drained so the thread can finish
+            while more:
+                more = await chunks.get() is not None
+            await done
+
+
+class AsgiApp:
+    """ASGI callable: event endpoints on the loop, everything else through the bridge"""
+
+    def __init__(self, app, scan=True):
+        self.app = app
+        self.scan = scan
+        self.events = EventHub(backlog=int(os.getenv('EVENT_BACKLOG', '1000')))
+        self.bridge = WsgiBridge(app.wsgi_app, workers=int(os.getenv('ASGI_WORKER_THREADS', '32')))
+        self.scanner = AsyncScanner.from_env(app, on_event=self.events.publish)
+        self._tasks = []
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            # No websockets; the server closes the connection
+            return
+
+        if scope['method'] == 'GET' and scope['path'] == '/api/events':
+            return await self.stream_events(scope, receive, send)
+        if scope['method'] == 'GET' and scope['path'] == '/api/events/poll':
+            return await self.poll_events(scope, send)
+        return await self.bridge(scope, receive, send)
+
+    async def startup(self):
+        loop = asyncio.get_running_loop()
+        cache = self.app.extensions['twitter_scanner'].response_cache
+        self._tasks = [loop.create_task(self.events.watch_data_version(cache))]
+        if self.scan:
+            self.scanner.start()
+
+    async def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.scanner.stop()
+        # Let notifications queued by the last pass go out
+        router = self.app.extensions['twitter_scanner'].scanner.router
+        await asyncio.get_running_loop().run_in_executor(None, router.drain,
+                                                         self.app.config['NOTIFY_DRAIN_SECONDS'])
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await self.startup()
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    def _last_seq(scope, name='since'):
+        """The client's last seen event number, from ?since= or Last-Event-ID"""
+        args = parse_qs(scope['query_string'].decode('latin1'))
+        value = args.get(name, [None])[0]
+        if value is None:
+            value = dict(scope['headers']).get(b'last-event-id', b'').decode('latin1') or None
+        try:
+            return int(value) if value is not None else None
+        except ValueError:
+            return None
+
+    async def poll_events(self, scope, send):
+        """Events after ?since=N, held open up to ?timeout= seconds until one arrives"""
+        args = parse_qs(scope['query_string'].decode('latin1'))
+        since = self._last_seq(scope)
+        try:
+            timeout = min(float(args.get('timeout', ['25'])[0]), LONG_POLL_MAX_SECONDS)
+        except ValueError:
+            timeout = 25
+
+        # Without since, a client only wants to learn the current position
+        events = await self.events.wait(since, timeout) if since is not None else []
+        body = json.dumps({
+            'last_id': events[-1][0] if events else (since if since is not None else self.events.seq),
+            'events': [{'id': seq, 'type': kind, 'data': data} for seq, kind, data in events],
+        }).encode()
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'content-type', b'application/json'), (b'cache-control', b'no-store')]})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def stream_events(self, scope, receive, send):
+        """Server-Sent Events: every event from now on, or since Last-Event-ID on reconnect"""
+        seq = self._last_seq(scope)
+        if seq is None:
+            seq = self.events.seq
+
+        disconnected = asyncio.get_running_loop().create_task(self._wait_disconnect(receive))
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-store'),
+            (b'x-accel-buffering', b'no'),
+        ]})
+        try:
+            await send({'type': 'http.response.body', 'body': b'retry: 5000\n\n', 'more_body': True})
+            while not disconnected.done():
+                waiter = asyncio.ensure_future(self.events.wait(seq, SSE_HEARTBEAT_SECONDS))
+                await asyncio.wait({waiter, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                if not waiter.done():
+                    waiter.cancel()
+                    break
+                events = waiter.result()
+                if events:
+                    seq = events[-1][0]
+                    body = ''.join(f"id: {n}\nevent: {kind}\ndata: {json.dumps(data)}\n\n"
+                                   for n, kind, data in events)
+                else:
+                    body = ': keep-alive\n\n'
+                await send({'type': 'http.response.body', 'body': body.encode(), 'more_body': True})
+        finally:
+            disconnected.cancel()
+        await send({'type': 'http.response.body', 'body': b''})
+
+    @staticmethod
+    async def _wait_disconnect(receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+
+def create_asgi_app(profile='default', **overrides):
+    """ASGI app for a deployment profile; the profile's scheduler becomes the async scan loop"""
+    scan = load_config(profile, **overrides)['SCHEDULER']
+    # No scheduler thread: scans run on the server's event loop instead
+    app = create_app(profile, **dict(overrides, SCHEDULER=False))
+    # Status responses and the manual digest flush go by this
+    app.config['SCHEDULER'] = scan
+    return AsgiApp(app, scan=scan)
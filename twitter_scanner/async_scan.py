@@ -0,0 +1,366 @@
+"""
+Scan passes on an event loop
+AsyncScanner runs the same pipeline as Scanner.monitor_accounts, but pages
+are fetched with httpx (when installed) many accounts at a time, while
+parsing and database work go to worker threads. The loop that serves the
+ASGI app is never blocked by a slow profile page. Passes still go through
+the app's ScanCoordinator, so they never overlap with /api/trigger-scan.
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from .models import db, MonitoredAccount, PostHistory
+from .records import PageStats, TweetDetails, response_size
+from .scheduler import Cadence, enqueue_scan, run_retention
+from .scraper import MockTwitterScraper, ScrapeError
+from .streaming import CHUNK_SIZE, content_length
+
+
+class AsyncScraper:
+    """Async front for a MinimalTwitterScraper: same parsing, non-blocking downloads"""
+
+    def __init__(self, scraper, parse_executor, max_connections=16, client=None):
+        self.scraper = scraper
+        self.parse_executor = parse_executor
+        self.max_connections = max_connections
+        self._client = client
+
+    @property
+    def offline(self):
+        # Mock scrapers make up their posts, there is nothing to download
+        return isinstance(self.scraper, MockTwitterScraper)
+
+    def _make_client(self):
+        if self.scraper.cassette is not None:
+            # Recording and replaying happen in the requests session
+            return None
+        try:
+            import httpx
+        except ImportError:
+            return None
+        return httpx.AsyncClient(
+            headers=dict(self.scraper.session.headers),
+            timeout=10,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.max_connections)
+        )
+
+    async def _in_thread(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.parse_executor, func, *args)
+
+    async def _parse(self, username, func, *args):
+        """Run a parser on a worker thread, its time charged to username"""
+        def parse():
+            with self.scraper.profiler.attribute(username):
+                return func(*args)
+        return await self._in_thread(parse)
+
+    async def fetch(self, url, username=None, page=None):
+        """(status_code, text) for a rate-limited GET; the body size goes to page if given"""
+        profiler = self.scraper.profiler
+        started = time.perf_counter()
+        await self.scraper.rate_limiter.acquire_async()
+        acquired = time.perf_counter()
+        if self._client is None:
+            self._client = self._make_client() or False
+        if self._client is False:
+            # Without httpx the blocking session runs on a worker thread
+            response = await self._in_thread(lambda: self.scraper.session.get(url, timeout=10))
+        else:
+            response = await self._client.get(url)
+        if profiler.enabled:
+            # Downloads overlap here, so fetch time can add up to more than the pass took
+            profiler.add('throttle', acquired - started, username)
+            profiler.add('fetch', time.perf_counter() - acquired, username)
+        if page is not None:
+            page.bytes = response_size(response, response.text)
+        return response.status_code, response.text
+
+    async def fetch_timeline(self, url, username, limit, since_id=None, since_time=None, page=None):
+        """MinimalTwitterScraper.fetch_timeline without blocking the loop"""
+        scraper = self.scraper
+        started = time.perf_counter()
+        await scraper.rate_limiter.acquire_async()
+        acquired = time.perf_counter()
+        if self._client is None:
+            self._client = self._make_client() or False
+        page = page or PageStats()
+        if self._client is False:
+            def read():
+                result = scraper.read_timeline(scraper.session.get(url, timeout=10, stream=True),
+                                               limit, since_id, since_time)
+                # Set on the worker thread's own PageStats
+                page.bytes = scraper.page_stats.bytes
+                return result
+            result = await self._in_thread(read)
+        else:
+            async with self._client.stream('GET', url) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    page.bytes = len(response.content)
+                    result = response.status_code, response.text
+                else:
+                    reader = scraper.timeline_reader(limit, since_id, since_time, response.encoding)
+                    # Watching the chunks go by is cheap next to parsing, so it stays on the loop
+                    async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                        if reader.feed(chunk):
+                            break
+                    scraper.stream_stats.record(response.num_bytes_downloaded,
+                                                content_length(response.headers), reader.done)
+                    page.bytes = response.num_bytes_downloaded
+                    result = response.status_code, reader.text()
+        if scraper.profiler.enabled:
+            scraper.profiler.add('throttle', acquired - started, username)
+            scraper.profiler.add('fetch', time.perf_counter() - acquired, username)
+        return result
+
+    async def get_user_posts(self, username, max_posts=5, since_id=None, since_time=None, cap=None, page=None):
+        """Posts as MinimalTwitterScraper.get_user_posts returns them; page gets the PageStats"""
+        if self.offline:
+            return await self._in_thread(self.scraper.get_user_posts, username, max_posts, since_id, since_time, cap)
+        page = page or PageStats()
+        url = f"https://twitter.com/{username}"
+        try:
+            if self.scraper.streaming:
+                limit = self.scraper.read_limit(max_posts, since_id, cap)
+                status_code, html = await self.fetch_timeline(url, username, limit, since_id, since_time, page)
+            else:
+                status_code, html = await self.fetch(url, username, page)
+        except Exception as e:
+            raise ScrapeError(str(e)) from e
+        page.status_code = status_code
+
+        def parse():
+            try:
+                return self.scraper.parse_user_posts(username, status_code, html, max_posts, since_id, since_time,
+                                                     cap)
+            finally:
+                page.parse_seconds = self.scraper.page_stats.parse_seconds
+        return await self._in_thread(parse)
+
+    async def get_tweet_details(self, tweet_url, username=None):
+        if self.offline:
+            return self.scraper.get_tweet_details(tweet_url)
+        try:
+            status_code, html = await self.fetch(tweet_url, username)
+            return await self._parse(username, self.scraper.parse_tweet_details, tweet_url, status_code, html)
+        except Exception as e:
+            print(f"Error getting tweet details for {tweet_url}: {e}")
+            return TweetDetails(f'Tweet from {tweet_url}', tweet_url)
+
+    async def aclose(self):
+        if self._client:
+            await self._client.aclose()
+        self._client = None
+
+
+class AsyncScanner:
+    """Runs scan passes, digest flushes and retention as tasks on the running loop"""
+
+    def __init__(self, app, concurrency=8, parse_workers=4, on_event=None):
+        self.app = app
+        services = app.extensions['twitter_scanner']
+        self.scanner = services.scanner
+        self.coordinator = services.coordinator
+        self.concurrency = max(1, concurrency)
+        self.on_event = on_event
+        # Sessions stay on one thread, and SQLite takes one writer at a time anyway
+        self.db_executor = ThreadPoolExecutor(1, thread_name_prefix='TwitterScannerDB')
+        self.parse_executor = ThreadPoolExecutor(parse_workers, thread_name_prefix='TwitterScannerParse')
+        # Posts pages plus the detail pages of their new posts
+        self.scraper = AsyncScraper(self.scanner.scraper, self.parse_executor, max_connections=self.concurrency * 2)
+        self._tasks = []
+
+    @classmethod
+    def from_env(cls, app, on_event=None):
+        return cls(
+            app,
+            concurrency=int(os.getenv('ASYNC_SCAN_CONCURRENCY', '8')),
+            parse_workers=int(os.getenv('ASYNC_PARSE_WORKERS', '4')),
+            on_event=on_event
+        )
+
+    def publish(self, kind, data):
+        if self.on_event:
+            self.on_event(kind, data)
+
+    async def db_call(self, func, *args):
+        """Run func(*args) in an app context on the database thread"""
+        def call():
+            with self.app.app_context():
+                try:
+                    return func(*args)
+                except Exception:
+                    db.session.rollback()
+                    raise
+        return await asyncio.get_running_loop().run_in_executor(self.db_executor, call)
+
+    def _due_accounts(self, stats):
+        """(id, username, since_id, since_time, max_posts, cap) for every account this pass should fetch"""
+        self.scanner.dedup_index.prune()
+        self.scanner.sync_dedup_index()
+        self.scanner.refresh_rules()
+
+        due = []
+        account_ids = self.scanner.plan_pass(stats)
+        # Only the planned accounts, a session batch at a time; half-open quarantines are committed per batch
+        for account in self.scanner.iter_accounts(account_ids):
+            if not self.scanner.breaker.allow(account):
+                print(f"⏸️  Skipping @{account.username}, quarantined until "
+                      f"{account.breaker_until:%Y-%m-%d %H:%M} UTC")
+                stats['quarantined'] += 1
+                continue
+            due.append((account.id, account.username, account.last_seen_post_id, account.last_seen_post_at,
+                        self.scanner.max_posts_for(account.group_id), self.scanner.post_cap_for(account.group_id)))
+        return due
+
+    def _record_failure(self, account_id, error):
+        self.scanner.record_failure(db.session.get(MonitoredAccount, account_id), error)
+
+    def _known_post_ids(self, username, post_ids):
+        with self.scanner.profiler.stage('dedup', username):
+            rows = db.session.query(PostHistory.post_id).filter(PostHistory.post_id.in_(post_ids))
+            return {post_id for post_id, in rows}
+
+    def _record_posts(self, account_id, posts, details):
+        return self.scanner.record_posts(db.session.get(MonitoredAccount, account_id), posts, details)
+
+    async def check_account(self, account_id, username, since_id=None, since_time=None, max_posts=None, cap=None):
+        """Async Scanner.check_account; returns how many posts were new"""
+        ledger = self.scanner.ledger
+        started_at, started = datetime.utcnow(), time.perf_counter()
+        page = PageStats()
+        try:
+            posts = await self.scraper.get_user_posts(username, max_posts=max_posts or self.scanner.max_posts,
+                                                      since_id=since_id, since_time=since_time, cap=cap, page=page)
+        except ScrapeError as e:
+            await self.db_call(self._record_failure, account_id, e)
+            ledger.record(account_id, username, started_at, time.perf_counter() - started, page, error=e)
+            return 0
+        try:
+            new_posts = await self._record_new_posts(account_id, username, posts)
+        except Exception as e:
+            ledger.record(account_id, username, started_at, time.perf_counter() - started, page,
+                          posts_found=len(posts), error=e)
+            raise
+        ledger.record(account_id, username, started_at, time.perf_counter() - started, page,
+                      posts_found=len(posts), new_posts=new_posts)
+        return new_posts
+
+    async def _record_new_posts(self, account_id, username, posts):
+        """Fetch details for the unseen posts, then store and notify them"""
+        # Only new posts are worth a detail page, and those downloads can overlap too
+        known = await self.db_call(self._known_post_ids, username, [post.id for post in posts]) if posts else set()
+        details = await asyncio.gather(*(self.scraper.get_tweet_details(post.url, username)
+                                         for post in posts if post.id not in known))
+
+        new_posts = await self.db_call(self._record_posts, account_id, posts,
+                                       {detail.url: detail for detail in details})
+        if new_posts:
+            self.publish('posts', {'account_id': account_id, 'username': username, 'new_posts': new_posts})
+        self.scanner.digest.flush_if_due()
+        return new_posts
+
+    async def monitor_accounts(self, deadline=None):
+        """Scanner.monitor_accounts with up to `concurrency` accounts in flight"""
+        print("🔍 Checking for new posts...")
+        stats = {'new_posts': 0, 'checked': 0, 'quarantined': 0, 'carried_over': 0, 'over_budget': 0,
+                 'not_due': 0, 'overdue': 0}
+        streamed = self.scanner.stream_snapshot()
+        try:
+            due = await self.db_call(self._due_accounts, stats)
+        except Exception as e:
+            print(f"❌ Error in monitor_accounts: {e}")
+            return stats
+
+        # A fixed set of workers takes accounts in the plan's order, so each group's
+        # share of the accounts in flight follows its weight
+        pending = iter(due)
+
+        async def worker():
+            for account_id, username, since_id, since_time, max_posts, cap in pending:
+                if deadline is not None and time.monotonic() >= deadline:
+                    stats['carried_over'] += 1
+                    continue
+                try:
+                    print(f"📱 Checking @{username}...")
+                    # Await first: `stats[...] += await` would add to a value read before the await
+                    new_posts = await self.check_account(account_id, username, since_id, since_time, max_posts, cap)
+                    stats['new_posts'] += new_posts
+                    stats['checked'] += 1
+                except Exception as e:
+                    print(f"❌ Error monitoring account {username}: {e}")
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(due)))))
+        if stats['carried_over']:
+            print(f"⌛ Scan deadline reached, {stats['carried_over']} accounts carried over to the next pass")
+        self.scanner.add_stream_stats(stats, streamed)
+        return stats
+
+    async def run_pass(self, trigger='schedule', planned_at=None):
+        """One coordinated pass; returns its record or None if another pass is in flight"""
+        record = self.coordinator.begin(trigger, planned_at)
+        if record is None:
+            return None
+        try:
+            record.update(await self.monitor_accounts(deadline=self.coordinator.deadline))
+        finally:
+            try:
+                # Written on the database thread; finish() then finds no open run
+                run_id = await self.db_call(self.coordinator.ledger.finish_run)
+                if run_id is not None:
+                    record['run_id'] = run_id
+            finally:
+                self.coordinator.finish(record)
+        self.publish('scan', record)
+        return record
+
+    async def _every(self, seconds, job):
+        """Run job on a fixed cadence of `seconds`, passing each run its planned start"""
+        cadence = Cadence(seconds)
+        while True:
+            next_run = cadence.next_slot()
+            await asyncio.sleep(max(0.0, (next_run - datetime.now()).total_seconds()))
+            try:
+                await job(next_run)
+            except Exception as e:
+                print(f"❌ Error in scheduler: {e}")
+
+    def start(self):
+        """Schedule scans, digest flushes and retention on the running loop"""
+        interval = self.app.config['SCAN_INTERVAL_MINUTES']
+        loop = asyncio.get_running_loop()
+
+        async def retention(planned_at):
+            await loop.run_in_executor(self.db_executor, run_retention, self.app)
+
+        async def flush_digest(planned_at):
+            self.scanner.digest.flush_if_due()
+
+        async def scan(planned_at):
+            if self.app.config['SCAN_QUEUE']:
+                # Scan workers do the checks, the loop only hands them out
+                await loop.run_in_executor(self.db_executor, enqueue_scan, self.app)
+            else:
+                await self.run_pass('schedule', planned_at)
+
+        self._tasks = [
+            loop.create_task(self._every(interval * 60, scan)),
+            loop.create_task(self._every(int(os.getenv('RETENTION_INTERVAL_MINUTES', '60')) * 60, retention)),
+            loop.create_task(self._every(10, flush_digest)),
+        ]
+        print(f"⏰ Async scanner started - will check accounts every {interval} minutes, "
+              f"{self.concurrency} at a time")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.scraper.aclose()
+        self.db_executor.shutdown(wait=False)
+        self.parse_executor.shutdown(wait=False)
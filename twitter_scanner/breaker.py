@@ -0,0 +1,80 @@
+"""
+Per-account circuit breaker
+Accounts that keep failing (suspended, renamed, protected) are quarantined
+for progressively longer intervals instead of being fetched every pass.
+After a quarantine one probe fetch is let through: success closes the
+breaker, failure reopens it for twice as long.
+State lives on MonitoredAccount so it survives restarts.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# The account is gone or hidden; one failure is enough to back off
+FATAL_STATUS_CODES = {401, 403, 404, 410}
+# Twitter throttling us, not a problem with the account
+IGNORED_STATUS_CODES = {429}
+
+
+class CircuitBreaker:
+    """Decides which accounts to fetch and updates their breaker columns"""
+
+    def __init__(self, threshold=3, base_delay=900, max_delay=86400):
+        self.threshold = max(1, threshold)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            threshold=int(os.getenv('BREAKER_FAILURE_THRESHOLD', '3')),
+            base_delay=int(os.getenv('BREAKER_BASE_QUARANTINE_MINUTES', '15')) * 60,
+            max_delay=int(os.getenv('BREAKER_MAX_QUARANTINE_MINUTES', '1440')) * 60
+        )
+
+    def allow(self, account, now=None):
+        """True if the account should be fetched this pass; moves expired quarantines to half-open"""
+        if account.breaker_state in (None, CLOSED, HALF_OPEN):
+            return True
+        now = now or datetime.utcnow()
+        if account.breaker_until is None or now >= account.breaker_until:
+            account.breaker_state = HALF_OPEN
+            return True
+        return False
+
+    def record_success(self, account):
+        if account.breaker_state == HALF_OPEN:
+            print(f"✅ @{account.username} recovered, resuming normal checks")
+        self.reset(account)
+
+    def record_failure(self, account, error, now=None):
+        """Count a failed fetch and open the breaker once the account looks dead"""
+        status_code = getattr(error, 'status_code', None)
+        account.breaker_status_code = status_code
+        account.breaker_error = str(error)[:200]
+        if status_code in IGNORED_STATUS_CODES:
+            return
+
+        account.breaker_failures = (account.breaker_failures or 0) + 1
+        if account.breaker_state != HALF_OPEN and status_code not in FATAL_STATUS_CODES \
+                and account.breaker_failures < self.threshold:
+            return
+
+        # Double the quarantine for every failure past the threshold
+        excess = max(0, account.breaker_failures - self.threshold)
+        delay = min(self.base_delay * 2 ** min(excess, 16), self.max_delay)
+        account.breaker_state = OPEN
+        account.breaker_until = (now or datetime.utcnow()) + timedelta(seconds=delay)
+        print(f"⛔ @{account.username} quarantined for {delay // 60} minutes after "
+              f"{account.breaker_failures} failures ({account.breaker_error})")
+
+    def reset(self, account):
+        account.breaker_state = CLOSED
+        account.breaker_failures = 0
+        account.breaker_status_code = None
+        account.breaker_error = None
+        account.breaker_until = None
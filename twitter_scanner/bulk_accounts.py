@@ -0,0 +1,190 @@
+"""
+Bulk account import helpers
+Parses CSV/JSON watchlists, validates profiles concurrently and tracks
+background import jobs.
+"""
+
+import csv
+import io
+import json
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import func
+
+from .models import db, MonitoredAccount
+
+USERNAME_RE = re.compile(r'^[A-Za-z0-9_]{1,15}$')
+
+
+def parse_usernames(body, content_type=''):
+    """Return the usernames in a CSV or JSON payload, de-duplicated in order
+
+    JSON may be a list of usernames, a list of {"username": ...} objects or
+    {"usernames": [...]}. CSV may have a "username" header column, otherwise
+    the first column is used.
+    """
+    body = (body or '').strip()
+    if not body:
+        return []
+
+    if 'json' in (content_type or '') or body[0] in '[{':
+        data = json.loads(body)
+        if isinstance(data, dict):
+            data = data.get('usernames') or data.get('accounts') or []
+        raw = [item.get('username', '') if isinstance(item, dict) else str(item) for item in data]
+    else:
+        rows = list(csv.reader(io.StringIO(body)))
+        column = 0
+        if rows and 'username' in [cell.strip().lower() for cell in rows[0]]:
+            column = [cell.strip().lower() for cell in rows[0]].index('username')
+            rows = rows[1:]
+        raw = [row[column] for row in rows if len(row) > column]
+
+    usernames = []
+    seen = set()
+    for name in raw:
+        name = name.strip().lstrip('@')
+        key = name.lower()
+        if name and key not in seen:
+            seen.add(key)
+            usernames.append(name)
+    return usernames
+
+
+def validate_profiles(usernames, fetch_profile, workers=8):
+    """Fetch profiles concurrently; returns {username: profile dict}"""
+    if not usernames:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(usernames))) as pool:
+        return dict(zip(usernames, pool.map(fetch_profile, usernames)))
+
+
+class BulkJob:
+    """Progress and per-username results of a background import"""
+
+    def __init__(self, total):
+        self.id = uuid.uuid4().hex[:12]
+        self.total = total
+        self.status = 'queued'
+        self.results = []
+        self.error = None
+        self.created_at = datetime.utcnow()
+        self.finished_at = None
+
+    def to_dict(self, include_results=True):
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'total': self.total,
+            'processed': len(self.results),
+            'created_at': self.created_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'error': self.error
+        }
+        if include_results:
+            data['results'] = self.results
+        return data
+
+
+class BulkJobRegistry:
+    """Keeps the most recent jobs in memory"""
+
+    def __init__(self, max_jobs=50):
+        self.max_jobs = max_jobs
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def start(self, total, target):
+        """Run target(job) on a daemon thread and return the job"""
+        job = BulkJob(total)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.pop(next(iter(self._jobs)))
+
+        def run():
+            job.status = 'running'
+            try:
+                target(job)
+                job.status = 'finished'
+            except Exception as e:
+                job.status = 'failed'
+                job.error = str(e)
+            job.finished_at = datetime.utcnow()
+
+        threading.Thread(target=run, daemon=True, name=f"BulkImport-{job.id}").start()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+def import_accounts(scraper, usernames, job=None, workers=8):
+    """Validate and add many accounts in one transaction; returns per-username results"""
+    results = {}
+
+    for username in usernames:
+        if not USERNAME_RE.match(username):
+            results[username] = {'username': username, 'status': 'invalid'}
+
+    # Look up existing accounts in chunks to keep the IN clause small; Twitter usernames ignore case
+    candidates = [username for username in usernames if username not in results]
+    for start in range(0, len(candidates), 500):
+        chunk = {username.lower(): username for username in candidates[start:start + 500]}
+        for account_id, existing in db.session.query(MonitoredAccount.id, MonitoredAccount.username) \
+                .filter(func.lower(MonitoredAccount.username).in_(list(chunk))):
+            username = chunk[existing.lower()]
+            results[username] = {'username': username, 'status': 'exists', 'id': account_id}
+
+    to_check = [username for username in candidates if username not in results]
+
+    def check(username):
+        profile = scraper.get_user_profile(username)
+        if job:
+            job.results.append({'username': username, 'status': 'checked'})
+        return profile
+
+    profiles = validate_profiles(to_check, check, workers=workers)
+
+    new_accounts = []
+    for username in to_check:
+        profile = profiles[username]
+        if not profile.get('exists'):
+            results[username] = {'username': username, 'status': 'not_found'}
+            continue
+        account = MonitoredAccount(
+            username=username,
+            display_name=profile.get('display_name', username),
+            profile_image_url=profile.get('profile_image_url', '')
+        )
+        new_accounts.append(account)
+
+    try:
+        db.session.add_all(new_accounts)
+        db.session.commit()
+        for account in new_accounts:
+            results[account.username] = {'username': account.username, 'status': 'added', 'id': account.id}
+    except Exception as e:
+        db.session.rollback()
+        for account in new_accounts:
+            results[account.username] = {'username': account.username, 'status': 'error', 'error': str(e)}
+
+    ordered = [results[username] for username in usernames]
+    if job:
+        job.results = ordered
+    return ordered
+
+
+def summarize_import(results):
+    summary = {}
+    for result in results:
+        summary[result['status']] = summary.get(result['status'], 0) + 1
+    return summary
@@ -0,0 +1,177 @@
+"""
+HTTP record and replay for offline scans
+With HTTP_CASSETTE_MODE=record, every exchange made through the scraper's and
+the Telegram bot's requests sessions is appended to a gzipped NDJSON cassette
+together with its latency. Telegram bot tokens are masked. With
+HTTP_CASSETTE_MODE=replay the same sessions are answered from the cassette
+instead of the network, in recorded order, after the recorded latency divided
+by HTTP_CASSETTE_SPEED (0 answers at once). A production scan can then be
+rerun offline, e.g. to benchmark parser or persistence changes in CI.
+"""
+
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict, deque
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+RECORD = 'record'
+REPLAY = 'replay'
+CASSETTE_MODES = (RECORD, REPLAY)
+
+TELEGRAM_TOKEN_RE = re.compile(r'(api\.telegram\.org/bot)[^/]+')
+# Headers worth keeping; the rest is noise that would bloat the cassette
+KEPT_HEADERS = ('content-type', 'location', 'retry-after')
+
+
+def mask_url(url):
+    return TELEGRAM_TOKEN_RE.sub(r'\1<token>', url)
+
+
+class CassetteMiss(requests.ConnectionError):
+    """A replayed request the cassette has no response for"""
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Sends for real and appends each exchange to the cassette"""
+
+    def __init__(self, cassette, inner=None):
+        super().__init__()
+        self.cassette = cassette
+        self.inner = inner
+
+    def send(self, request, **kwargs):
+        started = time.monotonic()
+        send = self.inner.send if self.inner is not None else super().send
+        response = send(request, **kwargs)
+        # Reading the body here is part of the latency; requests keeps it for the caller
+        body = response.content
+        self.cassette.write({
+            'at': round(started - self.cassette.started, 4),
+            'elapsed': round(time.monotonic() - started, 4),
+            'method': request.method,
+            'url': mask_url(request.url),
+            'status': response.status_code,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() in KEPT_HEADERS},
+            # surrogateescape lets arbitrary bytes survive the round trip through JSON
+            'body': body.decode('utf-8', 'surrogateescape'),
+        })
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Answers requests from the cassette; never touches the network"""
+
+    def __init__(self, cassette):
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        entry = self.cassette.next_response(request.method, mask_url(request.url))
+        if entry is None:
+            raise CassetteMiss(f"No recorded response for {request.method} {mask_url(request.url)}",
+                               request=request)
+        if self.cassette.speed:
+            time.sleep(entry['elapsed'] / self.cassette.speed)
+
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = entry['body'].encode('utf-8', 'surrogateescape')
+        # Lets iter_content hand out the body to streaming callers
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.reason = 'Replayed'
+        return response
+
+    def close(self):
+        pass
+
+
+class HttpCassette:
+    """One cassette file, recording or replaying for any number of sessions"""
+
+    def __init__(self, mode, path, speed=1.0):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}', expected one of: {', '.join(CASSETTE_MODES)}")
+        self.mode = mode
+        self.path = path
+        self.speed = speed
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.served = 0
+        self.missed = 0
+
+        if mode == RECORD:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = gzip.open(path, 'wt', encoding='utf-8')
+            self.adapter = RecordingAdapter(self)
+        else:
+            self._file = None
+            self._responses = defaultdict(deque)
+            for entry in read_cassette(path):
+                self._responses[(entry['method'], entry['url'])].append(entry)
+            self.adapter = ReplayAdapter(self)
+
+    @classmethod
+    def from_env(cls):
+        """Cassette from HTTP_CASSETTE_MODE/PATH/SPEED, or None when the mode isn't set"""
+        mode = os.getenv('HTTP_CASSETTE_MODE')
+        if not mode:
+            return None
+        return cls(mode, os.getenv('HTTP_CASSETTE_PATH', 'cassettes/scan.ndjson.gz'),
+                   speed=float(os.getenv('HTTP_CASSETTE_SPEED', '1')))
+
+    def attach(self, session):
+        """Route a requests.Session through this cassette"""
+        session.mount('https://', self.adapter)
+        session.mount('http://', self.adapter)
+        return session
+
+    def write(self, entry):
+        # ASCII escapes keep surrogate-escaped bytes valid in the UTF-8 file
+        line = json.dumps(entry, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line)
+            self._file.write('\n')
+            self.recorded += 1
+
+    def next_response(self, method, url):
+        """The next recorded response for a request; the last one repeats for later passes"""
+        with self._lock:
+            responses = self._responses.get((method, url))
+            if not responses:
+                self.missed += 1
+                return None
+            self.served += 1
+            return responses.popleft() if len(responses) > 1 else responses[0]
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def status(self):
+        return {'mode': self.mode, 'path': self.path, 'speed': self.speed, 'recorded': self.recorded,
+                'served': self.served, 'missed': self.missed}
+
+
+def read_cassette(path):
+    """Yield a cassette's exchanges in recorded order"""
+    with gzip.open(path, 'rt', encoding='utf-8') as cassette:
+        for line in cassette:
+            if line.strip():
+                yield json.loads(line)
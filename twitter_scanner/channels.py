@@ -0,0 +1,176 @@
+"""
+Notification channels for the router
+Each channel delivers an already rendered message to one target (a chat id,
+a phone number, a webhook URL...). Client libraries are imported on first
+send so deployments only need the ones they use.
+
+send returns True once delivered and False (or raises) for failures worth
+retrying: timeouts, connection errors, 429 and 5xx. Failures that would
+fail again, like missing credentials or a rejected target, raise
+PermanentDeliveryError so the router gives up at once.
+"""
+
+import html
+import os
+import re
+
+from .notifier import TelegramBot
+
+TAG_RE = re.compile(r'<[^>]+>')
+
+# 4xx statuses that are still worth retrying: request timeout and rate limited
+TRANSIENT_STATUSES = (408, 429)
+
+
+class PermanentDeliveryError(Exception):
+    """A send that can't succeed however often it is retried"""
+
+
+def delivered(status_code, detail=''):
+    """True for 2xx, False for statuses worth retrying; PermanentDeliveryError for the rest"""
+    if 200 <= status_code < 300:
+        return True
+    if status_code >= 500 or status_code in TRANSIENT_STATUSES:
+        return False
+    raise PermanentDeliveryError(f"HTTP {status_code} {detail}".strip())
+
+
+def client_error(e):
+    """PermanentDeliveryError for a client library error carrying a non-retryable HTTP status"""
+    status = getattr(e, 'status', None)
+    if isinstance(status, int) and 400 <= status < 500 and status not in TRANSIENT_STATUSES:
+        return PermanentDeliveryError(f"HTTP {status} {e}")
+    return e
+
+
+class Message:
+    """A post notification rendered once and shared by every channel"""
+
+    __slots__ = ('html', 'username', 'url', '_plain')
+
+    def __init__(self, html_text, username=None, url=None):
+        self.html = html_text
+        self.username = username
+        self.url = url
+        self._plain = None
+
+    @property
+    def plain(self):
+        """Text without Telegram HTML, for SMS and push notifications"""
+        if self._plain is None:
+            self._plain = html.unescape(TAG_RE.sub('', self.html))
+        return self._plain
+
+
+class DefaultChannel:
+    """The app's own notifier (TELEGRAM_CHAT_ID or nothing); the target is ignored"""
+
+    def __init__(self, notifier):
+        self.notifier = notifier
+
+    @property
+    def enabled(self):
+        # The router skips a switched-off or unconfigured notifier instead of retrying it
+        return self.notifier.configured
+
+    def send(self, target, message):
+        if not self.notifier.configured:
+            raise PermanentDeliveryError("Notifier not configured")
+        if not isinstance(self.notifier, TelegramBot):
+            return self.notifier.send_message(message.html)
+        # A wrong TELEGRAM_CHAT_ID or a blocked bot is a 400/403 that retrying won't fix
+        response = self.notifier.post_message(message.html)
+        return delivered(response.status_code, response.text[:200])
+
+
+class TelegramChannel:
+    """Telegram chats other than TELEGRAM_CHAT_ID; the target is a chat id"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    def send(self, target, message):
+        if not self.bot.bot_token:
+            raise PermanentDeliveryError("Telegram not configured")
+        response = self.bot.post_message(message.html, chat_id=target)
+        # Unknown chats and bots blocked by the user come back as 400/403
+        return delivered(response.status_code, response.text[:200])
+
+
+class SmsChannel:
+    """Twilio SMS; the target is a phone number"""
+
+    # Keep notifications to a few SMS segments
+    MAX_LENGTH = 480
+
+    def __init__(self):
+        self.account_sid = os.getenv('TWILIO_ACCOUNT_SID')
+        self.auth_token = os.getenv('TWILIO_AUTH_TOKEN')
+        self.from_number = os.getenv('TWILIO_PHONE_NUMBER')
+        self._client = None
+
+    def send(self, target, message):
+        if not (self.account_sid and self.auth_token and self.from_number):
+            raise PermanentDeliveryError("Twilio not configured")
+        if self._client is None:
+            try:
+                from twilio.rest import Client
+            except ImportError as e:
+                raise PermanentDeliveryError("twilio is not installed") from e
+            self._client = Client(self.account_sid, self.auth_token)
+        try:
+            self._client.messages.create(body=message.plain[:self.MAX_LENGTH], from_=self.from_number, to=target)
+        except Exception as e:
+            # TwilioRestException carries the HTTP status, e.g. 400 for an invalid number
+            raise client_error(e) from e
+        return True
+
+
+class PushbulletChannel:
+    """Pushbullet notes; the target is an email address, or empty for your own devices"""
+
+    def __init__(self):
+        self.api_key = os.getenv('PUSHBULLET_ACCESS_TOKEN')
+        self._client = None
+
+    def send(self, target, message):
+        if not self.api_key:
+            raise PermanentDeliveryError("Pushbullet not configured")
+        if self._client is None:
+            try:
+                from pushbullet import InvalidKeyError, Pushbullet
+            except ImportError as e:
+                raise PermanentDeliveryError("pushbullet.py is not installed") from e
+            try:
+                self._client = Pushbullet(self.api_key)
+            except InvalidKeyError as e:
+                raise PermanentDeliveryError("Pushbullet access token rejected") from e
+        title = f"New post from @{message.username}" if message.username else "Twitter Scanner"
+        self._client.push_note(title, message.plain, email=target or None)
+        return True
+
+
+class WebhookChannel:
+    """JSON POST to a URL"""
+
+    def send(self, target, message):
+        import requests
+        response = requests.post(target, json={
+            'username': message.username,
+            'url': message.url,
+            'text': message.plain,
+            'html': message.html
+        }, timeout=10)
+        return delivered(response.status_code)
+
+
+def create_channels(notifier):
+    """All channels, keyed by the name stored on NotificationDestination.channel"""
+    bot = notifier if isinstance(notifier, TelegramBot) else TelegramBot()
+    return {
+        'default': DefaultChannel(notifier),
+        'telegram': TelegramChannel(bot),
+        'sms': SmsChannel(),
+        'pushbullet': PushbulletChannel(),
+        'webhook': WebhookChannel(),
+    }
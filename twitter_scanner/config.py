@@ -0,0 +1,91 @@
+"""
+Deployment profiles for create_app
+Each app_*.py entry point picks one of these; everything else is shared.
+"""
+
+import os
+import tempfile
+
+DEFAULTS = {
+    # Shown in status responses and test messages, e.g. "Railway"
+    'PLATFORM': None,
+    # twitter: scrape twitter.com, mock: real profile check with fake posts,
+    # offline: no network at all
+    'SCRAPER': 'twitter',
+    # telegram or none
+    'NOTIFIER': 'telegram',
+    # sql: DATABASE_URL or a local SQLite file, memory: in-process SQLite,
+    # file: SQLite at STORE_PATH, which outlives a serverless invocation
+    'STORE': 'sql',
+    # Run the background scan loop in this process
+    'SCHEDULER': False,
+    'SCAN_INTERVAL_MINUTES': 5,
+    'SCAN_DELAY_SECONDS': 2,
+    # Longest a pass may run before the rest is carried over; None means one interval
+    'SCAN_DEADLINE_SECONDS': None,
+    # How long manual scans wait for queued notifications when there is no scheduler
+    'NOTIFY_DRAIN_SECONDS': 10,
+    # Dashboard reads are cached until the next database write, or this many seconds
+    # for writes made by other processes
+    'RESPONSE_CACHE_TTL': 60,
+    # gzip (and brotli when installed) for cached responses over 1 KB
+    'RESPONSE_COMPRESSION': True,
+    'MAX_POSTS': 5,
+    'INDEX_TEMPLATE': 'index_telegram.html',
+}
+
+PROFILES = {
+    'default': {'SCHEDULER': True},
+    'telegram': {'SCHEDULER': True},
+    'simple_telegram': {'SCRAPER': 'mock'},
+    'simple': {'SCRAPER': 'mock', 'NOTIFIER': 'none', 'INDEX_TEMPLATE': 'index.html'},
+    'minimal': {'SCRAPER': 'mock', 'NOTIFIER': 'none', 'INDEX_TEMPLATE': 'index.html'},
+    'railway': {'PLATFORM': 'Railway', 'SCRAPER': 'mock'},
+    'render': {'PLATFORM': 'Render', 'SCRAPER': 'mock'},
+    'serverless': {'PLATFORM': 'Serverless', 'SCRAPER': 'offline', 'NOTIFIER': 'none', 'STORE': 'file'},
+}
+
+
+def database_url(store):
+    """SQLAlchemy URL for a store setting"""
+    if store == 'memory':
+        return 'sqlite://'
+    if store == 'file':
+        # /tmp is the only writable directory on most serverless platforms
+        return 'sqlite:///' + os.getenv('STORE_PATH', os.path.join(tempfile.gettempdir(), 'twitter_scanner.db'))
+
+    url = os.getenv('DATABASE_URL', 'sqlite:///twitter_scanner.db')
+    # Heroku-style URLs use a scheme SQLAlchemy no longer accepts
+    if url.startswith('postgres://'):
+        url = url.replace('postgres://', 'postgresql://', 1)
+    return url
+
+
+def load_config(profile='default', **overrides):
+    """Merge a named profile and any overrides over the defaults"""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile '{profile}', expected one of: {', '.join(PROFILES)}")
+
+    config = dict(DEFAULTS)
+    config.update(PROFILES[profile])
+    config.update(overrides)
+    config['PROFILE'] = profile
+
+    config.setdefault('SECRET_KEY', os.getenv('SECRET_KEY', 'your-secret-key-here'))
+    # Scheduled and manual scans only queue ScanTasks; scan_worker.py processes do the checks
+    config.setdefault('SCAN_QUEUE', os.getenv('SCAN_QUEUE', '').lower() in ('1', 'true', 'yes'))
+    config.setdefault('SQLALCHEMY_DATABASE_URI', database_url(config['STORE']))
+    config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    if config['STORE'] == 'memory':
+        # One shared connection, otherwise every thread gets its own empty database
+        from sqlalchemy.pool import StaticPool
+        config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {
+            'poolclass': StaticPool,
+            'connect_args': {'check_same_thread': False}
+        })
+    elif config['STORE'] == 'file':
+        # Overlapping invocations wait for the write lock instead of failing
+        config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {
+            'connect_args': {'check_same_thread': False, 'timeout': 15}
+        })
+    return config
@@ -0,0 +1,110 @@
+"""
+Scan pass coordination
+One ScanCoordinator per app makes sure only one pass runs at a time, whether
+it was started by the scheduler or by /api/trigger-scan, gives every pass a
+deadline and keeps timing history for sizing the deployment.
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from .ledger import ScanLedger
+from .profiling import ScanProfiler
+
+
+class ScanCoordinator:
+    """Runs Scanner passes one at a time and records how late and long they were"""
+
+    def __init__(self, scanner, deadline_seconds=None, history=100, profiler=None, ledger=None):
+        self.scanner = scanner
+        self.profiler = profiler or ScanProfiler()
+        self.ledger = ledger or ScanLedger()
+        self.deadline_seconds = deadline_seconds
+        self._lock = threading.Lock()
+        self._current = None
+        self._started = None
+        self.deadline = None
+        self.history = deque(maxlen=history)
+
+    @property
+    def in_flight(self):
+        return self._current is not None
+
+    def run_pass(self, trigger='manual', planned_at=None):
+        """Run one pass unless another is in flight; returns its record or None if skipped"""
+        record = self.begin(trigger, planned_at)
+        if record is None:
+            return None
+        try:
+            record.update(self.scanner.monitor_accounts(deadline=self.deadline))
+        finally:
+            self.finish(record)
+        return record
+
+    def begin(self, trigger='manual', planned_at=None):
+        """Claim the pass slot; returns the new pass record, or None if one is in flight
+
+        The pass must stop at self.deadline (a time.monotonic() value, or
+        None). Every begin() that returns a record needs a finish().
+        """
+        if not self._lock.acquire(blocking=False):
+            # finish() clears _current before releasing the lock, so it may already be gone
+            current = self._current
+            since = f" since {current['started_at']}" if current else ''
+            print(f"⏭️  Scan already in progress{since}, skipping {trigger} pass")
+            return None
+
+        now = datetime.now()
+        started = time.monotonic()
+        record = {
+            'trigger': trigger,
+            'started_at': now.isoformat(),
+            # How long the pass waited past its planned start, e.g. behind a slow previous pass
+            'lag_seconds': round(max(0.0, (now - planned_at).total_seconds()), 3) if planned_at else None,
+        }
+        self._started = started
+        self.deadline = started + self.deadline_seconds if self.deadline_seconds else None
+        self._current = record
+        self.profiler.begin_pass(trigger)
+        self.ledger.begin_run(trigger)
+        if record['lag_seconds']:
+            print(f"⏱️  Scan pass started {record['lag_seconds']:.1f}s late")
+        return record
+
+    def finish(self, record):
+        """Record a pass's duration and free the slot for the next one"""
+        try:
+            self.profiler.end_pass()
+            run_id = self.ledger.finish_run()
+            if run_id is not None:
+                record['run_id'] = run_id
+            record['duration_seconds'] = round(time.monotonic() - self._started, 3)
+            # A pass that raised has no stats and stays out of the history
+            if 'new_posts' in record:
+                self.history.append(record)
+        finally:
+            self._current = None
+            self._lock.release()
+
+    def status(self):
+        """Current pass, the last finished pass and lag/duration summaries"""
+        passes = list(self.history)
+        lags = [p['lag_seconds'] for p in passes if p['lag_seconds'] is not None]
+        durations = [p['duration_seconds'] for p in passes]
+        return {
+            'in_flight': self._current,
+            'deadline_seconds': self.deadline_seconds,
+            'last_pass': passes[-1] if passes else None,
+            'recent_passes': len(passes),
+            'lag_seconds': {
+                'avg': round(sum(lags) / len(lags), 3) if lags else None,
+                'max': max(lags) if lags else None,
+            },
+            'duration_seconds': {
+                'avg': round(sum(durations) / len(durations), 3) if durations else None,
+                'max': max(durations) if durations else None,
+            },
+            'passes_hitting_deadline': sum(1 for p in passes if p.get('carried_over')),
+        }
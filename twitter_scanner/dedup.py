@@ -0,0 +1,192 @@
+"""
+Near-duplicate detection for scraped posts
+Posts are fingerprinted with a 64-bit SimHash of their normalized text and
+kept in a banded index so reposts with a new t.co link or a trailing emoji
+are caught without scanning the whole post history.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from array import array
+
+FINGERPRINT_BITS = 64
+
+_URL_RE = re.compile(r'https?://\S+|www\.\S+|\bt\.co/\S+')
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def normalize_text(text):
+    """Lowercase, drop links, emoji and punctuation, collapse whitespace"""
+    text = _URL_RE.sub(' ', (text or '').lower())
+    return ' '.join(_TOKEN_RE.findall(text))
+
+
+def _feature_hash(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), 'big')
+
+
+def simhash(text):
+    """Return the 64-bit SimHash of a post, or None if nothing is left after normalizing"""
+    tokens = normalize_text(text).split()
+    if not tokens:
+        return None
+
+    # Single words plus word bigrams so reordering still moves the fingerprint
+    features = tokens + [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]
+
+    weights = [0] * FINGERPRINT_BITS
+    for feature in features:
+        h = _feature_hash(feature)
+        for bit in range(FINGERPRINT_BITS):
+            if h >> bit & 1:
+                weights[bit] += 1
+            else:
+                weights[bit] -= 1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a, b):
+    return (a ^ b).bit_count()
+
+
+def to_signed(fingerprint):
+    """Map an unsigned fingerprint onto a signed 64-bit column value"""
+    if fingerprint is None:
+        return None
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def from_signed(value):
+    if value is None:
+        return None
+    return value + (1 << 64) if value < 0 else value
+
+
+class SimHashIndex:
+    """In-memory banded index of recent fingerprints
+
+    With a threshold of k bits the fingerprint is split into k + 1 bands. Any
+    two fingerprints within k bits of each other must agree exactly on at
+    least one band, so a lookup only has to compare against the few entries
+    sharing a band value instead of every stored fingerprint. Past max_entries
+    the oldest entries are dropped, whatever the window.
+    """
+
+    def __init__(self, threshold=3, window_days=7, max_entries=None):
+        if not 0 <= threshold < FINGERPRINT_BITS:
+            raise ValueError('threshold must be between 0 and 63 bits')
+        self.threshold = threshold
+        self.window_days = window_days
+        self.max_entries = max_entries
+        self.bands = threshold + 1
+        self._band_bits = FINGERPRINT_BITS // self.bands
+        self._band_mask = (1 << self._band_bits) - 1
+        self._lock = threading.RLock()
+        self.loaded = False
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._fingerprints = array('Q')
+            self._timestamps = array('d')
+            self._post_ids = []
+            self._slots = {}
+            self._buckets = [{} for _ in range(self.bands)]
+            self._dead = 0
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _band_keys(self, fingerprint):
+        # The last band absorbs the leftover bits when 64 isn't evenly divisible
+        keys = []
+        for band in range(self.bands):
+            shifted = fingerprint >> (band * self._band_bits)
+            keys.append(shifted if band == self.bands - 1 else shifted & self._band_mask)
+        return keys
+
+    def add(self, post_id, fingerprint, timestamp=None):
+        """Index a fingerprint; re-adding a known post_id replaces it"""
+        if fingerprint is None:
+            return
+        with self._lock:
+            if post_id in self._slots:
+                self.remove(post_id)
+            slot = len(self._post_ids)
+            self._fingerprints.append(fingerprint)
+            self._timestamps.append(timestamp if timestamp is not None else time.time())
+            self._post_ids.append(post_id)
+            self._slots[post_id] = slot
+            for band, key in enumerate(self._band_keys(fingerprint)):
+                self._buckets[band].setdefault(key, []).append(slot)
+            if self.max_entries and len(self._slots) > self.max_entries:
+                # _slots keeps insertion order, so the first key is the oldest entry
+                self.remove(next(iter(self._slots)))
+
+    def remove(self, post_id):
+        """Forget a post; its slot is reclaimed on the next compaction"""
+        with self._lock:
+            slot = self._slots.pop(post_id, None)
+            if slot is None:
+                return False
+            self._post_ids[slot] = None
+            self._dead += 1
+            if self._dead > 1024 and self._dead > len(self._slots):
+                self._compact()
+            return True
+
+    def find_duplicate(self, fingerprint, exclude_post_id=None):
+        """Return (post_id, distance) of the closest indexed match within the threshold"""
+        if fingerprint is None:
+            return None
+        with self._lock:
+            best = None
+            seen = set()
+            for band, key in enumerate(self._band_keys(fingerprint)):
+                for slot in self._buckets[band].get(key, ()):
+                    if slot in seen:
+                        continue
+                    seen.add(slot)
+                    post_id = self._post_ids[slot]
+                    if post_id is None or post_id == exclude_post_id:
+                        continue
+                    distance = (self._fingerprints[slot] ^ fingerprint).bit_count()
+                    if distance <= self.threshold and (best is None or distance < best[1]):
+                        best = (post_id, distance)
+                        if distance == 0:
+                            return best
+            return best
+
+    def prune(self, now=None):
+        """Drop entries that fell out of the lookback window"""
+        cutoff = (now if now is not None else time.time()) - self.window_days * 86400
+        with self._lock:
+            expired = [post_id for post_id, slot in self._slots.items()
+                       if self._timestamps[slot] < cutoff]
+            for post_id in expired:
+                del self._slots[post_id]
+            if expired:
+                self._compact()
+            return len(expired)
+
+    def _compact(self):
+        live = [(post_id, self._fingerprints[slot], self._timestamps[slot])
+                for post_id, slot in self._slots.items()]
+        self.clear()
+        for post_id, fingerprint, timestamp in live:
+            self.add(post_id, fingerprint, timestamp)
+
+    def load(self, rows):
+        """Rebuild from an iterable of (post_id, fingerprint, timestamp) rows"""
+        with self._lock:
+            self.clear()
+            for post_id, fingerprint, timestamp in rows:
+                self.add(post_id, fingerprint, timestamp)
+            self.loaded = True
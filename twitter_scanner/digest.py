@@ -0,0 +1,96 @@
+"""
+Digest mode for notifications
+Accounts in digest mode have their new posts buffered and sent as one
+message per account (split at Telegram's length limit) once the window has
+passed or enough posts are waiting. The scheduler checks the window every
+few seconds; apps without a scheduler flush at the end of each manual scan.
+"""
+
+import os
+import threading
+import time
+
+from .notifier import format_digest_messages, format_post_message
+
+INSTANT = 'instant'
+DIGEST = 'digest'
+NOTIFY_MODES = (INSTANT, DIGEST)
+
+
+class DigestBuffer:
+    """Passes post notifications to the router either straight away or as a digest"""
+
+    def __init__(self, notifier, default_mode=INSTANT, window_seconds=60, max_posts=20):
+        if default_mode not in NOTIFY_MODES:
+            raise ValueError(f"Unknown notify mode '{default_mode}', expected one of: {', '.join(NOTIFY_MODES)}")
+        self.notifier = notifier
+        self.default_mode = default_mode
+        self.window_seconds = window_seconds
+        self.max_posts = max(1, max_posts)
+        self._pending = {}
+        self._count = 0
+        self._opened = None
+        self._lock = threading.Lock()
+        self.messages_sent = 0
+        self.posts_digested = 0
+
+    @classmethod
+    def from_env(cls, notifier):
+        return cls(
+            notifier,
+            default_mode=os.getenv('NOTIFY_MODE', INSTANT),
+            window_seconds=int(os.getenv('DIGEST_WINDOW_SECONDS', '60')),
+            max_posts=int(os.getenv('DIGEST_MAX_POSTS', '20'))
+        )
+
+    def mode_for(self, account, group_mode=None):
+        return account.notify_mode or group_mode or self.default_mode
+
+    def notify(self, account, text, url, destinations=None, group_mode=None):
+        """Send or buffer one new post for the given (channel, target) destinations"""
+        if self.mode_for(account, group_mode) == INSTANT:
+            self.notifier.send_message(format_post_message(account.username, text, url),
+                                       destinations=destinations, username=account.username, url=url)
+            return True
+
+        with self._lock:
+            if self._opened is None:
+                self._opened = time.monotonic()
+            self._pending.setdefault((account.username, destinations), []).append((text, url))
+            self._count += 1
+        self.flush_if_due()
+        return True
+
+    def __len__(self):
+        return self._count
+
+    def flush_if_due(self):
+        """Flush when the window has passed or enough posts are waiting"""
+        with self._lock:
+            due = self._count >= self.max_posts or \
+                (self._opened is not None and time.monotonic() - self._opened >= self.window_seconds)
+        if due:
+            return self.flush()
+        return 0
+
+    def flush(self):
+        """Send everything buffered, one digest per account; returns messages sent"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self.posts_digested += self._count
+            self._count = 0
+            self._opened = None
+
+        sent = 0
+        for (username, destinations), posts in pending.items():
+            if len(posts) == 1:
+                messages = [format_post_message(username, *posts[0])]
+            else:
+                messages = format_digest_messages(username, posts)
+            for message in messages:
+                self.notifier.send_message(message, destinations=destinations, username=username)
+                sent += 1
+        if sent:
+            print(f"📬 Sent {sent} digest messages for {len(pending)} accounts")
+        self.messages_sent += sent
+        return sent
@@ -0,0 +1,171 @@
+"""
+Application factory
+create_app(profile) wires the shared models, routes and scan pipeline to
+the components a deployment profile asks for.
+"""
+
+import atexit
+import os
+import threading
+
+from dotenv import load_dotenv
+from flask import Flask
+from flask_cors import CORS
+from sqlalchemy import text
+
+from .bulk_accounts import BulkJobRegistry
+from .config import load_config
+from .coordinator import ScanCoordinator
+from .ledger import ScanLedger
+from .memory import MemoryMonitor
+from .migrations import add_missing_columns
+from .models import db, MonitoredAccount, PostHistory
+from .monitor import Scanner
+from .notifier import create_notifier
+from .profiling import ScanProfiler
+from .response_cache import ResponseCache
+from .retention import RetentionJob, RetentionPolicy
+from .routes import bp
+from .scheduler import start_background_tasks
+from .scraper import create_scraper
+from .work_queue import ScanQueue
+
+# Templates live at the repository root, next to the entry points
+TEMPLATE_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+
+class Services:
+    """Per-app components, reachable as app.extensions['twitter_scanner']"""
+
+    def __init__(self, app, config):
+        self.scraper = create_scraper(config['SCRAPER'], config['PLATFORM'])
+        self.notifier = create_notifier(config['NOTIFIER'])
+        # One profiler for the scraper, the scan loop and the notification router
+        self.profiler = ScanProfiler.from_env()
+        self.scraper.profiler = self.profiler
+        # What every account check of a pass did, written at the end of the pass
+        self.ledger = ScanLedger.from_env(app)
+        self.scanner = Scanner(app, self.scraper, self.notifier,
+                               max_posts=config['MAX_POSTS'],
+                               scan_delay=config['SCAN_DELAY_SECONDS'],
+                               profiler=self.profiler,
+                               ledger=self.ledger)
+        # One pass at a time; by default a pass may use up to one scan interval
+        self.coordinator = ScanCoordinator(
+            self.scanner,
+            deadline_seconds=config['SCAN_DEADLINE_SECONDS'] or config['SCAN_INTERVAL_MINUTES'] * 60,
+            profiler=self.profiler,
+            ledger=self.ledger
+        )
+
+        # History retention: archive then delete expired posts in small batches
+        self.retention_job = RetentionJob(
+            db, MonitoredAccount, PostHistory,
+            policy=RetentionPolicy.from_env(),
+            archive_dir=os.getenv('ARCHIVE_DIR', 'archive'),
+            batch_size=int(os.getenv('RETENTION_BATCH_SIZE', '500')),
+            on_delete=self.scanner.forget_deleted_posts
+        )
+        # Durable per-account scan tasks for scan_worker.py, used when SCAN_QUEUE is on
+        self.scan_queue = ScanQueue.from_env(groups=self.scanner.groups)
+        self.bulk_jobs = BulkJobRegistry()
+        self.cassette = attach_cassette(self)
+        # RSS, cache sizes and tracemalloc diffs for /debug/memory
+        self.memory = MemoryMonitor.from_env()
+        self.response_cache = ResponseCache(max_entries=int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '256')),
+                                            max_bytes=int(os.getenv('RESPONSE_CACHE_MAX_MB', '32')) * 1024 * 1024,
+                                            ttl=config['RESPONSE_CACHE_TTL'],
+                                            compress=config['RESPONSE_COMPRESSION'])
+
+
+def attach_cassette(services):
+    """Record or replay scraper and Telegram HTTP traffic when HTTP_CASSETTE_MODE is set"""
+    if not os.getenv('HTTP_CASSETTE_MODE'):
+        return None
+    from .cassette import HttpCassette
+    cassette = HttpCassette.from_env()
+
+    bots = {services.notifier, services.scanner.router.channels['telegram'].channel.bot}
+    for client in [services.scraper, *bots]:
+        if hasattr(client, 'session'):
+            cassette.attach(client.session)
+    # The async scraper would go around the session with httpx
+    services.scraper.cassette = cassette
+    # A recording is only readable once its gzip stream is closed
+    atexit.register(cassette.close)
+    print(f"📼 HTTP cassette {cassette.mode} mode: {cassette.path}")
+    return cassette
+
+
+def create_app(profile='default', **overrides):
+    """Build a Flask app for a deployment profile (see config.PROFILES)"""
+    load_dotenv()
+
+    config = load_config(profile, **overrides)
+    config.setdefault('BULK_SYNC_LIMIT', int(os.getenv('BULK_SYNC_LIMIT', '50')))
+    config.setdefault('BULK_WORKERS', int(os.getenv('BULK_WORKERS', '8')))
+
+    app = Flask(__name__, template_folder=TEMPLATE_FOLDER)
+    app.config.update(config)
+
+    db.init_app(app)
+    CORS(app)
+    app.register_blueprint(bp)
+
+    services = Services(app, config)
+    app.extensions['twitter_scanner'] = services
+
+    initialize_app(app)
+
+    if config['SCHEDULER']:
+        start_background_tasks(app)
+    return app
+
+
+def initialize_app(app):
+    """Create tables and upgrade the schema, then warm up in the background"""
+    services = app.extensions['twitter_scanner']
+    platform = app.config['PLATFORM']
+    try:
+        print(f"🐦 Starting Twitter Scanner{' on ' + platform if platform else ''}...")
+
+        # Create database tables
+        with app.app_context():
+            if app.config['STORE'] == 'file':
+                # WAL lets readers carry on while a scan writes; the setting sticks to the file
+                db.session.execute(text('PRAGMA journal_mode=WAL'))
+            db.create_all()
+            add_missing_columns(db)
+            if app.config['STORE'] == 'memory':
+                # One shared connection: a warm-up thread would roll back request transactions
+                services.scanner.ensure_dedup_index()
+            print("✅ Database initialized")
+
+        # Network checks and the dedup index load must not hold up cold start
+        threading.Thread(target=warm_up, args=(app,), daemon=True,
+                         name="TwitterScannerWarmUp").start()
+
+    except Exception as e:
+        print(f"❌ Error initializing application: {e}")
+        print("\nTroubleshooting tips:")
+        print("1. Check your environment variables")
+        print("2. Ensure all dependencies are installed")
+        print("3. Check the platform logs for more details")
+        # Don't raise the exception to allow the app to start
+
+
+def warm_up(app):
+    """Load the dedup index and test the notifier off the startup path"""
+    services = app.extensions['twitter_scanner']
+    try:
+        with app.app_context():
+            services.scanner.ensure_dedup_index()
+    except Exception as e:
+        print(f"❌ Error loading dedup index: {e}")
+
+    # Test Telegram connection
+    if app.config['NOTIFIER'] == 'telegram':
+        if services.notifier.test_connection():
+            print("✅ Telegram bot connected successfully")
+        else:
+            print("⚠️  Telegram bot not configured - notifications will be disabled")
@@ -0,0 +1,142 @@
+"""
+Account groups and fair scheduling across them
+Each account belongs to at most one AccountGroup, whose policy says how
+often its accounts may be checked, how many posts a check reads, where its
+notifications go and what share of a pass's fetch budget it gets. Accounts
+without a group follow the app-wide settings.
+
+A pass is planned with weighted fair queuing: every group queues its due
+accounts, least recently checked first, and the plan keeps taking the next
+account of the group with the smallest virtual finish time (checks planned
+so far divided by the group's weight). While both have accounts waiting, a
+weight 8 group gets eight checks for every one of a weight 1 group, so a
+large low-priority group can't starve a small critical one however many
+accounts it holds. Accounts waiting longer than their group's max interval
+are planned ahead of the rest, in the same fair order among themselves.
+Whatever the budget or the pass deadline doesn't reach keeps its
+last_checked and leads its group next pass.
+"""
+
+import heapq
+import os
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import selectinload
+
+from .models import AccountGroup
+
+PRIORITY_CLASSES = ('critical', 'high', 'normal', 'low')
+# Share of the fetch budget for a group that doesn't set its own weight
+PRIORITY_WEIGHTS = {'critical': 8, 'high': 4, 'normal': 2, 'low': 1}
+DEFAULT_PRIORITY = 'normal'
+
+
+class GroupPolicy(NamedTuple):
+    """Scan settings shared by a group's accounts; None fields fall back to the app-wide ones"""
+    group_id: Optional[int]
+    name: str
+    priority: str
+    weight: float
+    min_interval_minutes: int
+    max_interval_minutes: Optional[int]
+    max_posts: Optional[int]
+    notify_mode: Optional[str]
+    # (channel, target) pairs for accounts without destinations of their own
+    destinations: Optional[Tuple]
+
+
+def policy_from_group(group):
+    priority = group.priority or DEFAULT_PRIORITY
+    return GroupPolicy(
+        group_id=group.id,
+        name=group.name,
+        priority=priority,
+        weight=group.weight or PRIORITY_WEIGHTS[priority],
+        min_interval_minutes=group.min_interval_minutes or 0,
+        max_interval_minutes=group.max_interval_minutes,
+        max_posts=group.max_posts,
+        notify_mode=group.notify_mode,
+        destinations=tuple((d.channel, d.target) for d in group.destinations if d.is_active) or None
+    )
+
+
+UNGROUPED = GroupPolicy(None, 'ungrouped', DEFAULT_PRIORITY, PRIORITY_WEIGHTS[DEFAULT_PRIORITY],
+                        0, None, None, None, None)
+
+
+class FairScheduler:
+    """Group policies for the scan loop, and the fair order a pass visits accounts in"""
+
+    def __init__(self, budget=0):
+        # Most account checks one pass may plan; 0 leaves only the deadline
+        self.budget = budget
+        self.policies = {}
+        self.loaded = False
+
+    @classmethod
+    def from_env(cls):
+        return cls(budget=int(os.getenv('SCAN_PASS_BUDGET', '0')))
+
+    def load(self):
+        """Reload every group's policy; call inside an app context"""
+        groups = AccountGroup.query.options(selectinload(AccountGroup.destinations))
+        self.policies = {group.id: policy_from_group(group) for group in groups}
+        self.loaded = True
+
+    def policy_for(self, group_id):
+        if not self.loaded:
+            self.load()
+        # Groups deleted since the last load leave their accounts ungrouped
+        return self.policies.get(group_id, UNGROUPED) if group_id is not None else UNGROUPED
+
+    def plan(self, rows, now=None):
+        """Order (account_id, group_id, last_checked) rows for one pass
+
+        Rows should come least recently checked first. Returns the account ids
+        to check, in order, and counts of the accounts left out because they
+        were checked within their group's min interval (not_due) or didn't fit
+        the budget (over_budget), and of those waiting longer than their
+        group's max interval (overdue). Overdue accounts are planned first.
+        """
+        now = now or datetime.utcnow()
+        overdue, queues = {}, {}
+        counts = {'not_due': 0, 'over_budget': 0, 'overdue': 0}
+        for account_id, group_id, last_checked in rows:
+            policy = self.policy_for(group_id)
+            waited = now - last_checked if last_checked else None
+            if waited is not None and waited < timedelta(minutes=policy.min_interval_minutes):
+                counts['not_due'] += 1
+                continue
+            if policy.max_interval_minutes and (waited is None or
+                                                waited > timedelta(minutes=policy.max_interval_minutes)):
+                counts['overdue'] += 1
+                overdue.setdefault(policy.group_id, []).append(account_id)
+            else:
+                queues.setdefault(policy.group_id, []).append(account_id)
+
+        total = len(rows) - counts['not_due']
+        limit = min(total, self.budget) if self.budget else total
+        planned = self._fair_order(overdue, limit)
+        planned += self._fair_order(queues, limit - len(planned))
+        counts['over_budget'] = total - len(planned)
+        return planned, counts
+
+    def _fair_order(self, queues, limit):
+        """Up to `limit` account ids from {group id: queue} in weighted fair order"""
+        # (virtual finish time, priority rank, tie-break, group id, position in the group's queue)
+        heap = []
+        for seq, group_id in enumerate(queues):
+            policy = self.policy_for(group_id)
+            heap.append((1 / policy.weight, PRIORITY_CLASSES.index(policy.priority), seq, group_id, 0))
+        heapq.heapify(heap)
+
+        planned = []
+        while heap and len(planned) < limit:
+            finish, rank, seq, group_id, position = heapq.heappop(heap)
+            queue = queues[group_id]
+            planned.append(queue[position])
+            if position + 1 < len(queue):
+                heapq.heappush(heap, (finish + 1 / self.policy_for(group_id).weight, rank, seq,
+                                      group_id, position + 1))
+        return planned
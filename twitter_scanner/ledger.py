@@ -0,0 +1,269 @@
+"""
+Scan ledger and the analytics built on it
+Every account check is kept as a ScanAccountResult: when it started, how
+long it took, the profile page's HTTP status and size, time spent parsing,
+posts found and new, and the error if it failed. Results are buffered in
+memory during a pass and written in one go with their ScanRun at the end,
+so the scan loop pays for one insert per pass, not one per account.
+
+The hourly maintenance job (next to post retention) folds every settled
+hour of results into ScanHourlyRollup rows, one per account and hour, then
+drops raw results and runs older than LEDGER_RETENTION_DAYS and rollups
+older than LEDGER_ROLLUP_DAYS. Every hour is counted either from its
+rollups or, while it has none, from its raw results. The analytics queries
+follow the same rule, so months of history cost the same to query as a day.
+
+A (hour, account_id) unique index and ON CONFLICT DO NOTHING keep two
+processes running the job at once from counting an hour twice. Results
+that arrive for an hour already rolled up, from a pass or worker batch that
+ran past the settle window, drop that hour's rollups in the same
+transaction. The hour then counts from its raw results again and is rolled
+up afresh on the next run.
+"""
+
+import os
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import exists, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .models import db, ScanAccountResult, ScanHourlyRollup, ScanRun
+
+# Summed per hour/account in the rollups; max_duration_ms is kept alongside
+TOTALS = ('checks', 'errors', 'posts_found', 'new_posts', 'bytes', 'duration_ms', 'parse_ms')
+
+
+def hour_of(value):
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def rolled_up(hour_column):
+    """Condition: the hour in hour_column already has rollups"""
+    return exists().where(ScanHourlyRollup.hour == hour_column)
+
+
+def insert_rollups():
+    """INSERT into the rollups that skips (hour, account_id) rows another process already added"""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert(ScanHourlyRollup).on_conflict_do_nothing()
+    if dialect == 'sqlite':
+        return sqlite.insert(ScanHourlyRollup).on_conflict_do_nothing()
+    # Elsewhere the unique index turns a duplicate roll-up into an IntegrityError
+    return insert(ScanHourlyRollup)
+
+
+class ScanLedger:
+    """Buffers the open run's account checks and writes them when it ends"""
+
+    def __init__(self, app=None, enabled=True, retention_days=7, rollup_days=365, settle_minutes=60):
+        self.app = app
+        # Without an app there is nowhere to write, which makes this a stand-in
+        self.enabled = enabled and app is not None
+        self.retention_days = retention_days
+        self.rollup_days = rollup_days
+        # Passes write at their end, so an hour is only rolled up once late results are in
+        self.settle_minutes = settle_minutes
+        self._lock = threading.Lock()
+        self._run = None
+        self._results = None
+
+    @classmethod
+    def from_env(cls, app):
+        return cls(
+            app,
+            enabled=os.getenv('SCAN_LEDGER', 'true').lower() in ('1', 'true', 'yes'),
+            retention_days=int(os.getenv('LEDGER_RETENTION_DAYS', '7')),
+            rollup_days=int(os.getenv('LEDGER_ROLLUP_DAYS', '365'))
+        )
+
+    def begin_run(self, trigger):
+        """Start buffering results for a new run"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._run = (trigger, datetime.utcnow())
+            self._results = []
+
+    def record(self, account_id, username, started_at, duration, page=None, posts_found=0, new_posts=0,
+               error=None):
+        """Buffer one account check; checks outside a run (e.g. /api/check) aren't kept"""
+        if self._results is None:
+            return
+        result = {
+            'account_id': account_id,
+            'username': username,
+            'hour': hour_of(started_at),
+            'started_at': started_at,
+            'duration_ms': int(duration * 1000),
+            'status_code': page.status_code if page else None,
+            'bytes': page.bytes if page else 0,
+            'parse_ms': int(page.parse_seconds * 1000) if page else 0,
+            'posts_found': posts_found,
+            'new_posts': new_posts,
+            'error': str(error)[:200] if error is not None else None,
+        }
+        with self._lock:
+            if self._results is not None:
+                self._results.append(result)
+
+    def finish_run(self):
+        """Write the open run and its results; returns the ScanRun id, or None if no run was open"""
+        with self._lock:
+            run, results = self._run, self._results
+            self._run = self._results = None
+        if run is None:
+            return None
+
+        trigger, started_at = run
+        with self.app.app_context():
+            try:
+                scan_run = ScanRun(
+                    trigger=trigger,
+                    started_at=started_at,
+                    finished_at=datetime.utcnow(),
+                    checked=len(results),
+                    errors=sum(1 for result in results if result['error'] is not None),
+                    new_posts=sum(result['new_posts'] for result in results),
+                    bytes=sum(result['bytes'] for result in results)
+                )
+                db.session.add(scan_run)
+                db.session.flush()
+                for result in results:
+                    result['run_id'] = scan_run.id
+                db.session.bulk_insert_mappings(ScanAccountResult, results)
+                # Late results reopen their hour: it counts from raw results until rolled up again
+                # Hours past retention have lost their raw results and keep their rollups
+                kept_from = hour_of(datetime.utcnow() - timedelta(days=self.retention_days))
+                hours = {result['hour'] for result in results if result['hour'] >= kept_from}
+                if hours:
+                    reopened = ScanHourlyRollup.query.filter(ScanHourlyRollup.hour.in_(hours)) \
+                        .delete(synchronize_session=False)
+                    if reopened:
+                        print(f"📒 Late scan results reopened {reopened} hourly totals")
+                db.session.commit()
+                return scan_run.id
+            except Exception as e:
+                print(f"❌ Error writing scan ledger: {e}")
+                db.session.rollback()
+                return None
+
+    def roll_up(self, now=None):
+        """Fold settled hours of raw results into the hourly rollups; returns rollup rows added"""
+        now = now or datetime.utcnow()
+        # Hours ending at least settle_minutes ago
+        limit = hour_of(now - timedelta(minutes=self.settle_minutes))
+
+        r = ScanAccountResult
+        rows = select(
+            r.hour, r.account_id, func.max(r.username), func.count(r.id), func.count(r.error),
+            func.sum(r.posts_found), func.sum(r.new_posts), func.sum(r.bytes), func.sum(r.duration_ms),
+            func.max(r.duration_ms), func.sum(r.parse_ms)
+        ).where(r.hour < limit, ~rolled_up(r.hour)).group_by(r.hour, r.account_id)
+
+        result = db.session.execute(insert_rollups().from_select(
+            ['hour', 'account_id', 'username', 'checks', 'errors', 'posts_found', 'new_posts', 'bytes',
+             'duration_ms', 'max_duration_ms', 'parse_ms'], rows))
+        db.session.commit()
+        return max(result.rowcount, 0)
+
+    def prune(self, now=None):
+        """Delete raw results and runs past retention (once rolled up) and rollups past theirs"""
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(days=self.retention_days)
+        pruned = {'results': 0, 'runs': 0, 'rollups': 0}
+        # Never drop results the rollups don't cover yet
+        pruned['results'] = ScanAccountResult.query.filter(
+            ScanAccountResult.hour < hour_of(cutoff), rolled_up(ScanAccountResult.hour)
+        ).delete(synchronize_session=False)
+        with_results = select(ScanAccountResult.run_id)
+        pruned['runs'] = ScanRun.query.filter(ScanRun.started_at < cutoff, ScanRun.id.not_in(with_results)) \
+            .delete(synchronize_session=False)
+        pruned['rollups'] = ScanHourlyRollup.query.filter(
+            ScanHourlyRollup.hour < now - timedelta(days=self.rollup_days)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return pruned
+
+    def maintain(self, now=None):
+        """Roll up then prune; the hourly job. Call inside an app context"""
+        if not self.enabled:
+            return {'rolled_up': 0, 'results': 0, 'runs': 0, 'rollups': 0}
+        rolled_up = self.roll_up(now)
+        return dict(self.prune(now), rolled_up=rolled_up)
+
+
+def totals(key, since):
+    """Sums of checks since a time, keyed by 'hour' or 'account_id'
+
+    Hours with rollups are read from them, the rest from raw results.
+    """
+    rollup, raw = ScanHourlyRollup, ScanAccountResult
+    rolled = db.session.query(
+        getattr(rollup, key), func.max(rollup.username), func.sum(rollup.checks), func.sum(rollup.errors),
+        func.sum(rollup.posts_found), func.sum(rollup.new_posts), func.sum(rollup.bytes),
+        func.sum(rollup.duration_ms), func.sum(rollup.parse_ms), func.max(rollup.max_duration_ms)
+    ).filter(rollup.hour >= hour_of(since)).group_by(getattr(rollup, key))
+    recent = db.session.query(
+        getattr(raw, key), func.max(raw.username), func.count(raw.id), func.count(raw.error),
+        func.sum(raw.posts_found), func.sum(raw.new_posts), func.sum(raw.bytes),
+        func.sum(raw.duration_ms), func.sum(raw.parse_ms), func.max(raw.duration_ms)
+    ).filter(raw.hour >= hour_of(since), ~rolled_up(raw.hour)).group_by(getattr(raw, key))
+
+    merged = {}
+    for query in (rolled, recent):
+        for value, username, *sums, max_duration in query:
+            entry = merged.setdefault(value, dict({name: 0 for name in TOTALS}, username=username,
+                                                  max_duration_ms=0))
+            for name, amount in zip(TOTALS, sums):
+                entry[name] += amount or 0
+            entry['max_duration_ms'] = max(entry['max_duration_ms'], max_duration or 0)
+    return merged
+
+
+def summarize(entry):
+    """Averages and rates for one totals() entry"""
+    checks = entry['checks'] or 1
+    return dict(entry,
+                avg_duration_ms=round(entry['duration_ms'] / checks, 1),
+                avg_parse_ms=round(entry['parse_ms'] / checks, 1),
+                error_rate=round(entry['errors'] / checks, 4))
+
+
+def throughput(since):
+    """Per-hour totals, oldest first"""
+    hours = totals('hour', since)
+    trend = []
+    for hour in sorted(hours):
+        entry = summarize(hours[hour])
+        # An hour spans every account
+        del entry['username']
+        trend.append(dict(entry, hour=hour.isoformat()))
+    return trend
+
+
+def slowest_accounts(since, limit=10):
+    """Accounts with the highest average check time"""
+    accounts = totals('account_id', since)
+    ranked = sorted(accounts.items(), key=lambda item: item[1]['duration_ms'] / (item[1]['checks'] or 1),
+                    reverse=True)
+    return [dict(summarize(entry), account_id=account_id) for account_id, entry in ranked[:limit]]
+
+
+def error_hotspots(since, limit=10):
+    """Accounts with the most failed checks, with their latest error while raw results still have it"""
+    accounts = totals('account_id', since)
+    ranked = sorted(((account_id, entry) for account_id, entry in accounts.items() if entry['errors']),
+                    key=lambda item: (item[1]['errors'], item[1]['errors'] / (item[1]['checks'] or 1)),
+                    reverse=True)[:limit]
+    hotspots = []
+    for account_id, entry in ranked:
+        latest = ScanAccountResult.query.filter(ScanAccountResult.account_id == account_id,
+                                                ScanAccountResult.error.isnot(None)) \
+            .order_by(ScanAccountResult.id.desc()).first()
+        hotspots.append(dict(summarize(entry), account_id=account_id,
+                             last_error=latest.error if latest else None,
+                             last_status_code=latest.status_code if latest else None,
+                             last_error_at=latest.started_at.isoformat() if latest else None))
+    return hotspots
@@ -0,0 +1,148 @@
+"""
+Memory reporting for long-running scanner processes
+/debug/memory shows the process RSS, the size of every in-process cache
+and, while tracemalloc is on, the source lines whose allocations grew the
+most since the previous report. tracemalloc slows allocation down
+noticeably, so it only runs when MEMORY_TRACE is set or /debug/memory
+switches it on.
+"""
+
+import gc
+import os
+import sys
+import threading
+import tracemalloc
+
+# Allocations made by tracemalloc itself and by imports aren't the app's
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def _memory_info():
+    """psutil's memory info for this process, None without psutil"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info()
+
+
+def _rusage_peak():
+    """Peak RSS from getrusage, None where the resource module doesn't exist (Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def rss_bytes():
+    """Current resident set size from /proc or psutil, else the peak; None if nothing can tell"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    info = _memory_info()
+    return info.rss if info is not None else _rusage_peak()
+
+
+def peak_rss_bytes():
+    peak = _rusage_peak()
+    if peak is None:
+        # Windows reports the peak working set instead
+        peak = getattr(_memory_info(), 'peak_wset', None)
+    return peak
+
+
+class MemoryMonitor:
+    """tracemalloc snapshots, each report diffed against the one before"""
+
+    def __init__(self, frames=1):
+        self.frames = frames
+        self._baseline = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        monitor = cls(frames=int(os.getenv('MEMORY_TRACE_FRAMES', '1')))
+        if os.getenv('MEMORY_TRACE', '').lower() in ('1', 'true', 'yes'):
+            monitor.start()
+        return monitor
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+    def start(self):
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+            self._baseline = self._snapshot()
+
+    def stop(self):
+        with self._lock:
+            self._baseline = None
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+    def top_allocations(self, limit=10, reset=True):
+        """Source lines whose allocations grew most since the last reset; [] when not tracing"""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                return []
+            snapshot = self._snapshot()
+            stats = snapshot.compare_to(self._baseline, 'lineno') if self._baseline else \
+                snapshot.statistics('lineno')
+            if reset:
+                self._baseline = snapshot
+        return [{
+            'site': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            'size_bytes': stat.size,
+            'size_diff_bytes': getattr(stat, 'size_diff', stat.size),
+            'count': stat.count,
+            'count_diff': getattr(stat, 'count_diff', stat.count),
+        } for stat in stats[:limit]]
+
+    def report(self, services, limit=10, reset=True):
+        traced = tracemalloc.get_traced_memory() if self.tracing else None
+        return {
+            'rss_bytes': rss_bytes(),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'gc': {'counts': gc.get_count(), 'objects': len(gc.get_objects()), 'garbage': len(gc.garbage)},
+            'caches': cache_sizes(services),
+            'tracemalloc': {
+                'tracing': self.tracing,
+                'traced_bytes': traced[0] if traced else None,
+                'traced_peak_bytes': traced[1] if traced else None,
+                'top_growth': self.top_allocations(limit, reset),
+            },
+        }
+
+
+def cache_sizes(services):
+    """Entries (and bytes or limits where known) held by each in-process cache"""
+    scanner = services.scanner
+    profile_cache = services.scraper.profile_cache
+    return {
+        'profile_cache': {'entries': len(profile_cache), 'max_entries': profile_cache.max_entries},
+        'response_cache': {'entries': len(services.response_cache), 'bytes': services.response_cache.size,
+                           'max_entries': services.response_cache.max_entries,
+                           'max_bytes': services.response_cache.max_bytes},
+        'dedup_index': {'entries': len(scanner.dedup_index), 'max_entries': scanner.dedup_index.max_entries},
+        'digest_buffer': {'posts': len(scanner.digest), 'max_posts': scanner.digest.max_posts},
+        'notification_queues': {name: workers.queue.qsize() for name, workers in scanner.router.channels.items()},
+        'profiler_passes': {'passes': len(services.profiler.passes), 'max_passes': services.profiler.passes.maxlen},
+        'scan_history': {'passes': len(services.coordinator.history),
+                         'max_passes': services.coordinator.history.maxlen},
+        'bulk_jobs': {'jobs': len(services.bulk_jobs), 'max_jobs': services.bulk_jobs.max_jobs},
+    }
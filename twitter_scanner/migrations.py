@@ -0,0 +1,42 @@
+"""
+Lightweight schema upgrades
+db.create_all() only creates missing tables, so columns added to an existing
+model never reach databases created by an older release. This adds them in
+place without needing a migration framework.
+"""
+
+from sqlalchemy import inspect, text
+
+
+def add_missing_columns(db):
+    """Add nullable columns and indexes that the models declare but the database lacks"""
+    inspector = inspect(db.engine)
+    added = []
+
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable:
+                print(f"⚠️  Cannot add NOT NULL column {table.name}.{column.name} automatically")
+                continue
+
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as conn:
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            added.append(f'{table.name}.{column.name}')
+
+        # Indexes declared on the model after the table was created
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(bind=db.engine, checkfirst=True)
+                added.append(index.name)
+
+    if added:
+        print(f"✅ Added columns/indexes: {', '.join(added)}")
+    return added
@@ -0,0 +1,286 @@
+"""
+Database models shared by every deployment profile
+"""
+
+from datetime import datetime
+
+from flask_sqlalchemy import SQLAlchemy
+
+db = SQLAlchemy()
+
+
+# Which destinations each account notifies; accounts without any use the default notifier
+account_destinations = db.Table(
+    'account_destination',
+    db.Column('account_id', db.Integer, db.ForeignKey('monitored_account.id'), primary_key=True),
+    db.Column('destination_id', db.Integer, db.ForeignKey('notification_destination.id'), primary_key=True)
+)
+
+# Where a group's accounts notify when they have no destinations of their own
+group_destinations = db.Table(
+    'group_destination',
+    db.Column('group_id', db.Integer, db.ForeignKey('account_group.id'), primary_key=True),
+    db.Column('destination_id', db.Integer, db.ForeignKey('notification_destination.id'), primary_key=True)
+)
+
+
+class AccountGroup(db.Model):
+    """Scan policy shared by a set of accounts, see groups.py"""
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+    # critical, high, normal or low; sets the default weight and breaks ties
+    priority = db.Column(db.String(10))
+    # Share of each pass's fetch budget; NULL follows the priority class
+    weight = db.Column(db.Float)
+    # Accounts checked more recently than this are skipped
+    min_interval_minutes = db.Column(db.Integer)
+    # Accounts waiting longer than this are reported overdue
+    max_interval_minutes = db.Column(db.Integer)
+    # NULL fields follow the app-wide settings
+    max_posts = db.Column(db.Integer)
+    notify_mode = db.Column(db.String(10))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    destinations = db.relationship('NotificationDestination', secondary=group_destinations, backref='groups')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'priority': self.priority,
+            'weight': self.weight,
+            'min_interval_minutes': self.min_interval_minutes,
+            'max_interval_minutes': self.max_interval_minutes,
+            'max_posts': self.max_posts,
+            'notify_mode': self.notify_mode,
+            'destination_ids': [destination.id for destination in self.destinations],
+            'created_at': self.created_at.isoformat()
+        }
+
+
+class MonitoredAccount(db.Model):
+    # Never hand a deleted account's id to a new one, its old posts still point at it
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(50), unique=True, nullable=False)
+    display_name = db.Column(db.String(100), nullable=False)
+    profile_image_url = db.Column(db.String(200))
+    is_active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_checked = db.Column(db.DateTime, default=datetime.utcnow)
+    retention_days = db.Column(db.Integer)
+    retention_max_posts = db.Column(db.Integer)
+    last_seen_post_id = db.Column(db.String(100))
+    last_seen_post_at = db.Column(db.DateTime)
+    # Circuit breaker, see breaker.py; NULL state means closed
+    breaker_state = db.Column(db.String(20))
+    breaker_failures = db.Column(db.Integer)
+    breaker_status_code = db.Column(db.Integer)
+    breaker_error = db.Column(db.String(200))
+    breaker_until = db.Column(db.DateTime)
+    # instant or digest; NULL follows NOTIFY_MODE
+    notify_mode = db.Column(db.String(10))
+    # Scan policy, see groups.py; NULL uses the app-wide settings
+    group_id = db.Column(db.Integer, db.ForeignKey('account_group.id'), index=True)
+    destinations = db.relationship('NotificationDestination', secondary=account_destinations,
+                                   backref='accounts')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'username': self.username,
+            'display_name': self.display_name,
+            'profile_image_url': self.profile_image_url,
+            'is_active': self.is_active,
+            'created_at': self.created_at.isoformat(),
+            'last_checked': self.last_checked.isoformat(),
+            'retention_days': self.retention_days,
+            'retention_max_posts': self.retention_max_posts,
+            'last_seen_post_id': self.last_seen_post_id,
+            'last_seen_post_at': self.last_seen_post_at.isoformat() if self.last_seen_post_at else None,
+            'notify_mode': self.notify_mode,
+            'group_id': self.group_id,
+            'breaker': {
+                'state': self.breaker_state or 'closed',
+                'failures': self.breaker_failures or 0,
+                'status_code': self.breaker_status_code,
+                'error': self.breaker_error,
+                'quarantined_until': self.breaker_until.isoformat() if self.breaker_until else None
+            }
+        }
+
+
+class PostHistory(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    account_id = db.Column(db.Integer, db.ForeignKey('monitored_account.id'), nullable=False, index=True)
+    post_id = db.Column(db.String(100), unique=True, nullable=False)
+    text = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, index=True)
+    url = db.Column(db.String(200))
+    is_notified = db.Column(db.Boolean, default=False)
+    post_hash = db.Column(db.String(64), nullable=False)
+    simhash = db.Column(db.BigInteger)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'account_id': self.account_id,
+            'post_id': self.post_id,
+            'text': self.text,
+            'created_at': self.created_at.isoformat(),
+            'url': self.url,
+            'is_notified': self.is_notified
+        }
+
+
+class NotificationDestination(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    # telegram (chat id), sms (phone number), pushbullet (email or empty), webhook (URL)
+    channel = db.Column(db.String(20), nullable=False)
+    target = db.Column(db.String(500))
+    is_active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'channel': self.channel,
+            'target': self.target,
+            'is_active': self.is_active,
+            'created_at': self.created_at.isoformat()
+        }
+
+
+class AlertRule(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    # NULL applies the rule to every account
+    account_id = db.Column(db.Integer, db.ForeignKey('monitored_account.id'), index=True)
+    # keyword (case-insensitive substring) or regex
+    kind = db.Column(db.String(10), nullable=False)
+    pattern = db.Column(db.String(500), nullable=False)
+    is_active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'account_id': self.account_id,
+            'kind': self.kind,
+            'pattern': self.pattern,
+            'is_active': self.is_active,
+            'created_at': self.created_at.isoformat()
+        }
+
+
+class ScanTask(db.Model):
+    """One account check in the durable scan queue, see work_queue.py"""
+    id = db.Column(db.Integer, primary_key=True)
+    account_id = db.Column(db.Integer, db.ForeignKey('monitored_account.id'), nullable=False, index=True)
+    # queued, leased, done or dead (out of attempts)
+    state = db.Column(db.String(10), nullable=False, default='queued')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    # Not claimable before this; pushed back after a failure
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    lease_owner = db.Column(db.String(100))
+    # A leased task whose worker hasn't finished by then is claimable again
+    leased_until = db.Column(db.DateTime)
+    last_error = db.Column(db.String(500))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (db.Index('ix_scan_task_claim', 'state', 'available_at'),)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'account_id': self.account_id,
+            'state': self.state,
+            'attempts': self.attempts,
+            'available_at': self.available_at.isoformat(),
+            'lease_owner': self.lease_owner,
+            'leased_until': self.leased_until.isoformat() if self.leased_until else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class ScanRun(db.Model):
+    """One scan pass (or worker batch) in the scan ledger, see ledger.py"""
+    id = db.Column(db.Integer, primary_key=True)
+    trigger = db.Column(db.String(20))
+    started_at = db.Column(db.DateTime, nullable=False, index=True)
+    finished_at = db.Column(db.DateTime, nullable=False)
+    checked = db.Column(db.Integer, nullable=False, default=0)
+    errors = db.Column(db.Integer, nullable=False, default=0)
+    new_posts = db.Column(db.Integer, nullable=False, default=0)
+    bytes = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'trigger': self.trigger,
+            'started_at': self.started_at.isoformat(),
+            'finished_at': self.finished_at.isoformat(),
+            'duration_seconds': round((self.finished_at - self.started_at).total_seconds(), 3),
+            'checked': self.checked,
+            'errors': self.errors,
+            'new_posts': self.new_posts,
+            'bytes': self.bytes
+        }
+
+
+class ScanAccountResult(db.Model):
+    """One account check within a ScanRun"""
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('scan_run.id'), nullable=False, index=True)
+    # No foreign key: results outlive removed accounts, hence the username too
+    account_id = db.Column(db.Integer, nullable=False)
+    username = db.Column(db.String(50), nullable=False)
+    # started_at truncated to the hour, what the rollups group by
+    hour = db.Column(db.DateTime, nullable=False, index=True)
+    started_at = db.Column(db.DateTime, nullable=False)
+    duration_ms = db.Column(db.Integer, nullable=False)
+    status_code = db.Column(db.Integer)
+    bytes = db.Column(db.Integer, nullable=False, default=0)
+    parse_ms = db.Column(db.Integer, nullable=False, default=0)
+    posts_found = db.Column(db.Integer, nullable=False, default=0)
+    new_posts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.String(200))
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'run_id': self.run_id,
+            'account_id': self.account_id,
+            'username': self.username,
+            'started_at': self.started_at.isoformat(),
+            'duration_ms': self.duration_ms,
+            'status_code': self.status_code,
+            'bytes': self.bytes,
+            'parse_ms': self.parse_ms,
+            'posts_found': self.posts_found,
+            'new_posts': self.new_posts,
+            'error': self.error
+        }
+
+
+class ScanHourlyRollup(db.Model):
+    """Totals of one account's checks in one hour, what the analytics endpoints read"""
+    id = db.Column(db.Integer, primary_key=True)
+    hour = db.Column(db.DateTime, nullable=False)
+    account_id = db.Column(db.Integer, nullable=False)
+    username = db.Column(db.String(50), nullable=False)
+    checks = db.Column(db.Integer, nullable=False)
+    errors = db.Column(db.Integer, nullable=False)
+    posts_found = db.Column(db.Integer, nullable=False)
+    new_posts = db.Column(db.Integer, nullable=False)
+    bytes = db.Column(db.BigInteger, nullable=False)
+    duration_ms = db.Column(db.BigInteger, nullable=False)
+    max_duration_ms = db.Column(db.Integer, nullable=False)
+    parse_ms = db.Column(db.BigInteger, nullable=False)
+
+    # One row per account and hour, so a roll-up that runs twice can't count an hour twice
+    __table_args__ = (db.Index('uq_scan_hourly_rollup_hour_account', 'hour', 'account_id', unique=True),)
@@ -0,0 +1,391 @@
+"""
+Scan pipeline: fetch, dedup, persist, notify
+Scanner.check_account is the one hot path used by the scheduled scan, the
+manual trigger and the per-account check endpoint.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+
+from .breaker import CircuitBreaker
+from .dedup import SimHashIndex, simhash, to_signed, from_signed
+from .digest import DigestBuffer
+from .groups import FairScheduler
+from .ledger import ScanLedger
+from .models import db, AlertRule, MonitoredAccount, PostHistory
+from .router import NotificationRouter
+from .rules import RuleSet
+from .scraper import ScrapeError, is_known_post
+
+
+def utc_timestamp(value):
+    """Epoch seconds for a naive UTC datetime as stored in PostHistory"""
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def advance_high_water_mark(account, posts):
+    """Move the account's mark to the newest real post id seen"""
+    newest = None
+    for post in posts:
+        if post.pinned or not post.id.isdigit():
+            continue
+        if newest is None or int(post.id) > int(newest.id):
+            newest = post
+    if newest and (not account.last_seen_post_id or not is_known_post(newest.id, account.last_seen_post_id)):
+        account.last_seen_post_id = newest.id
+        account.last_seen_post_at = newest.created_at
+
+
+class Scanner:
+    """Owns the scan loop for one app and the state it needs between passes"""
+
+    def __init__(self, app, scraper, notifier, max_posts=5, scan_delay=2, profiler=None, ledger=None):
+        self.app = app
+        self.scraper = scraper
+        self.notifier = notifier
+        self.max_posts = max_posts
+        self.scan_delay = scan_delay
+        # Accounts loaded per database session during a pass
+        self.session_batch = max(1, int(os.getenv('SCAN_SESSION_BATCH', '50')))
+
+        # Near-duplicate detection over the last few days of posts
+        self.dedup_index = SimHashIndex(
+            threshold=int(os.getenv('SIMHASH_THRESHOLD', '3')),
+            window_days=int(os.getenv('SIMHASH_WINDOW_DAYS', '7')),
+            max_entries=int(os.getenv('SIMHASH_MAX_ENTRIES', '200000'))
+        )
+        self._dedup_load_lock = threading.Lock()
+        # Highest PostHistory.id the index has seen, see sync_dedup_index
+        self._dedup_synced_id = 0
+        self.breaker = CircuitBreaker.from_env()
+        # Stage timings, off unless SCAN_PROFILING or /api/profiler turns them on
+        self.profiler = profiler or scraper.profiler
+        # Fan-out to each account's destinations, instant or as a digest
+        self.router = NotificationRouter.from_env(notifier, profiler=self.profiler)
+        self.digest = DigestBuffer.from_env(self.router)
+        # Keyword/regex filters checked before anything is sent
+        self.rules = RuleSet()
+        # Per-group scan policies and the fair order passes follow
+        self.groups = FairScheduler.from_env()
+        # Per-check results of the current pass, see ledger.py
+        self.ledger = ledger or ScanLedger()
+
+    def ensure_dedup_index(self):
+        """Load the SimHash index once, whether the warm-up thread or a scan gets there first"""
+        with self._dedup_load_lock:
+            if not self.dedup_index.loaded:
+                self.load_dedup_index()
+
+    def load_dedup_index(self):
+        """Rebuild the SimHash index from recent PostHistory rows"""
+        cutoff = datetime.utcnow() - timedelta(days=self.dedup_index.window_days)
+        # Rows stored while loading are picked up again by the next sync; add() replaces them
+        self._dedup_synced_id = db.session.query(func.max(PostHistory.id)).scalar() or 0
+        rows = db.session.query(
+            PostHistory.post_id, PostHistory.simhash, PostHistory.text, PostHistory.created_at
+        ).filter(PostHistory.created_at >= cutoff).yield_per(1000)
+
+        # Rows stored before fingerprints existed are fingerprinted on the fly
+        self.dedup_index.load(
+            (post_id, from_signed(fingerprint) if fingerprint is not None else simhash(text), utc_timestamp(created_at))
+            for post_id, fingerprint, text, created_at in rows
+        )
+        print(f"✅ Dedup index loaded with {len(self.dedup_index)} fingerprints")
+
+    def sync_dedup_index(self):
+        """Add posts other processes (scan workers, the web app) stored since the last load or sync
+
+        Cheap enough for the start of every pass or worker batch: one range
+        scan on the PostHistory primary key. Returns how many posts were added.
+        """
+        if not self.dedup_index.loaded:
+            self.ensure_dedup_index()
+            return 0
+        cutoff = datetime.utcnow() - timedelta(days=self.dedup_index.window_days)
+        rows = db.session.query(
+            PostHistory.id, PostHistory.post_id, PostHistory.simhash, PostHistory.text, PostHistory.created_at
+        ).filter(PostHistory.id > self._dedup_synced_id).order_by(PostHistory.id).yield_per(1000)
+        added = 0
+        for row_id, post_id, fingerprint, text, created_at in rows:
+            self._dedup_synced_id = row_id
+            if created_at < cutoff:
+                continue
+            self.dedup_index.add(post_id, from_signed(fingerprint) if fingerprint is not None else simhash(text),
+                                 utc_timestamp(created_at))
+            added += 1
+        return added
+
+    def find_duplicate_post(self, post_hash, fingerprint):
+        """Return the post_id of an earlier post with the same or nearly the same text"""
+        if not self.dedup_index.loaded:
+            self.ensure_dedup_index()
+
+        # Posts that are only links or emoji have no fingerprint, fall back to exact matching
+        if fingerprint is None:
+            duplicate = PostHistory.query.filter_by(post_hash=post_hash).first()
+            return duplicate.post_id if duplicate else None
+
+        match = self.dedup_index.find_duplicate(fingerprint)
+        if match:
+            print(f"🔁 Near-duplicate of post {match[0]} ({match[1]} bits apart), skipping")
+            return match[0]
+        return None
+
+    def forget_deleted_posts(self, post_ids):
+        """Keep the dedup index in step with rows removed by retention"""
+        for post_id in post_ids:
+            self.dedup_index.remove(post_id)
+
+    def sync_profile(self, account):
+        """Copy freshly cached profile metadata onto the account row"""
+        profile = self.scraper.profile_cache.get(account.username)
+        if not profile or not profile.get('exists'):
+            return
+        if profile['display_name'] != account.username and profile['display_name'] != account.display_name:
+            account.display_name = profile['display_name'][:100]
+        if profile['profile_image_url'] and profile['profile_image_url'] != account.profile_image_url:
+            account.profile_image_url = profile['profile_image_url'][:200]
+
+    def refresh_rules(self):
+        """Reload alert rules if they changed, e.g. through another worker process"""
+        active = AlertRule.query.filter_by(is_active=True)
+        signature = active.with_entities(func.count(AlertRule.id), func.max(AlertRule.id),
+                                         func.sum(AlertRule.id)).one()
+        if tuple(signature) != self.rules.signature:
+            self.rules.load(active.with_entities(AlertRule.id, AlertRule.account_id,
+                                                 AlertRule.kind, AlertRule.pattern))
+            print(f"✅ Loaded {len(self.rules)} alert rules")
+
+    def refresh_groups(self):
+        """Reload group policies, which the API may have changed since the last pass"""
+        self.groups.load()
+
+    def max_posts_for(self, group_id):
+        return self.groups.policy_for(group_id).max_posts or self.max_posts
+
+    def post_cap_for(self, group_id):
+        # A group's max_posts also bounds burst reads past the high-water mark
+        return self.groups.policy_for(group_id).max_posts
+
+    def destinations_for(self, account):
+        """(channel, target) pairs for an account's or else its group's destinations; None for the default"""
+        return tuple((d.channel, d.target) for d in account.destinations if d.is_active) or \
+            self.groups.policy_for(account.group_id).destinations
+
+    def plan_pass(self, stats):
+        """Ids of the active accounts this pass should check, in fair order across groups"""
+        rows = db.session.query(MonitoredAccount.id, MonitoredAccount.group_id, MonitoredAccount.last_checked) \
+            .filter_by(is_active=True).order_by(MonitoredAccount.last_checked.asc(), MonitoredAccount.id).all()
+        self.refresh_groups()
+        account_ids, counts = self.groups.plan(rows)
+        stats['not_due'] += counts['not_due']
+        stats['overdue'] += counts['overdue']
+        stats['over_budget'] += counts['over_budget']
+        print(f"📊 Found {len(rows)} active accounts, {len(account_ids)} to check this pass")
+        if counts['not_due'] or counts['over_budget']:
+            print(f"🗂️  {counts['not_due']} checked within their group's interval, "
+                  f"{counts['over_budget']} over the pass budget")
+        if counts['overdue']:
+            print(f"⚠️  {counts['overdue']} accounts waited longer than their group's max interval")
+        return account_ids
+
+    def check_account(self, account):
+        """Fetch, store and notify new posts for one account; returns how many were new"""
+        started_at, started = datetime.utcnow(), time.perf_counter()
+        page = getattr(self.scraper, 'page_stats', None)
+        with self.profiler.attribute(account.username):
+            try:
+                posts = self.scraper.get_user_posts(account.username, max_posts=self.max_posts_for(account.group_id),
+                                                    since_id=account.last_seen_post_id,
+                                                    since_time=account.last_seen_post_at,
+                                                    cap=self.post_cap_for(account.group_id))
+            except ScrapeError as e:
+                self.record_failure(account, e)
+                self.ledger.record(account.id, account.username, started_at, time.perf_counter() - started, page,
+                                   error=e)
+                return 0
+            try:
+                new_posts = self.record_posts(account, posts)
+            except Exception as e:
+                self.ledger.record(account.id, account.username, started_at, time.perf_counter() - started, page,
+                                   posts_found=len(posts), error=e)
+                raise
+        self.ledger.record(account.id, account.username, started_at, time.perf_counter() - started, page,
+                           posts_found=len(posts), new_posts=new_posts)
+        return new_posts
+
+    def record_failure(self, account, error):
+        """Count a failed fetch against the account's breaker"""
+        print(f"❌ Failed to fetch posts for @{account.username}: {error}")
+        self.breaker.record_failure(account, error)
+        account.last_checked = datetime.utcnow()
+        with self.profiler.stage('persist', account.username):
+            db.session.commit()
+
+    def record_posts(self, account, posts, details=None):
+        """Store and notify the new ones among an account's fetched posts
+
+        details maps post URLs to TweetDetails fetched ahead of time; posts
+        missing from it are fetched here.
+        """
+        self.breaker.record_success(account)
+        self.sync_profile(account)
+        new_posts = 0
+
+        username = account.username
+        stage = self.profiler.stage
+
+        for post in posts:
+            # Check if we already have this post
+            with stage('dedup', username):
+                existing = PostHistory.query.filter_by(post_id=post.id).first()
+            if existing:
+                continue
+
+            # Get full tweet details
+            url = post.url
+            tweet_details = details.get(url) if details else None
+            if tweet_details is None:
+                with self.profiler.attribute(username):
+                    tweet_details = self.scraper.get_tweet_details(url)
+
+            with stage('dedup', username):
+                # Create post hash and fingerprint for duplicate detection
+                post_hash = hashlib.md5(tweet_details.text.encode()).hexdigest()
+                fingerprint = simhash(tweet_details.text)
+
+                # Check for duplicate or near-duplicate content
+                if self.find_duplicate_post(post_hash, fingerprint):
+                    continue
+
+            with stage('persist', username):
+                # Create new post record
+                new_post = PostHistory(
+                    account_id=account.id,
+                    post_id=post.id,
+                    text=tweet_details.text,
+                    created_at=post.created_at,
+                    url=url,
+                    post_hash=post_hash,
+                    simhash=to_signed(fingerprint)
+                )
+                db.session.add(new_post)
+                self.dedup_index.add(post.id, fingerprint, utc_timestamp(post.created_at))
+            new_posts += 1
+
+            # Send notification, or queue it for the account's digest
+            with stage('notify', username):
+                if not self.rules.should_notify(account.id, tweet_details.text):
+                    print(f"🔕 Post {post.id} from @{account.username} matched no alert rule")
+                    continue
+                self.digest.notify(account, tweet_details.text, url, destinations=self.destinations_for(account),
+                                   group_mode=self.groups.policy_for(account.group_id).notify_mode)
+                new_post.is_notified = True
+
+        # Update last checked time and high-water mark
+        advance_high_water_mark(account, posts)
+        account.last_checked = datetime.utcnow()
+        with stage('persist', username):
+            db.session.commit()
+        return new_posts
+
+    def iter_accounts(self, account_ids):
+        """Yield accounts in the given order, loading session_batch at a time
+
+        Each batch is committed and expunged before the next is loaded, so a
+        pass over many accounts holds one batch of accounts and new posts, not
+        all of them.
+        """
+        for start in range(0, len(account_ids), self.session_batch):
+            batch = account_ids[start:start + self.session_batch]
+            loaded = {account.id: account for account in MonitoredAccount.query
+                      .filter(MonitoredAccount.id.in_(batch))
+                      .options(selectinload(MonitoredAccount.destinations))}
+            for account_id in batch:
+                # Accounts removed since the pass started are simply missing
+                if account_id in loaded:
+                    yield loaded[account_id]
+            # Expunging would silently drop anything the caller changed but didn't commit
+            db.session.commit()
+            db.session.expunge_all()
+
+    def monitor_accounts(self, deadline=None):
+        """Check for new posts from monitored accounts
+
+        Accounts are visited least recently checked first. With a deadline (a
+        time.monotonic() value) the pass stops there and the accounts it didn't
+        reach keep their old last_checked, so they lead the next pass.
+        Returns a stats dict for the pass.
+        """
+        print("🔍 Checking for new posts...")
+        print(f"⏰ Current time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        stats = {'new_posts': 0, 'checked': 0, 'quarantined': 0, 'carried_over': 0, 'over_budget': 0,
+                 'not_due': 0, 'overdue': 0}
+        streamed = self.stream_snapshot()
+
+        # Use application context for database operations
+        with self.app.app_context():
+            try:
+                account_ids = self.plan_pass(stats)
+
+                # Expire fingerprints that fell out of the dedup window, pick up posts stored elsewhere
+                self.dedup_index.prune()
+                self.sync_dedup_index()
+                self.refresh_rules()
+
+                # This app context's session only lives for the pass, and the pass is what writes
+                # these rows; expiring them on every commit would reload each account per check
+                db.session().expire_on_commit = False
+
+                for i, account in enumerate(self.iter_accounts(account_ids)):
+                    if deadline is not None and time.monotonic() >= deadline:
+                        stats['carried_over'] += len(account_ids) - i
+                        print(f"⌛ Scan deadline reached, {stats['carried_over']} accounts carried over to the next pass")
+                        break
+                    if not self.breaker.allow(account):
+                        print(f"⏸️  Skipping @{account.username}, quarantined until "
+                              f"{account.breaker_until:%Y-%m-%d %H:%M} UTC")
+                        stats['quarantined'] += 1
+                        continue
+                    try:
+                        print(f"📱 Checking @{account.username}...")
+                        stats['new_posts'] += self.check_account(account)
+                        stats['checked'] += 1
+
+                        self.digest.flush_if_due()
+
+                        # Add delay between accounts to avoid rate limiting
+                        time.sleep(self.scan_delay)
+
+                    except Exception as e:
+                        print(f"❌ Error monitoring account {account.username}: {e}")
+                        db.session.rollback()
+
+            except Exception as e:
+                print(f"❌ Error in monitor_accounts: {e}")
+                db.session.rollback()
+
+        self.add_stream_stats(stats, streamed)
+        return stats
+
+    def stream_snapshot(self):
+        """Streamed download totals at the start of a pass; None when the scraper buffers pages"""
+        if getattr(self.scraper, 'streaming', False):
+            return self.scraper.stream_stats.snapshot()
+        return None
+
+    def add_stream_stats(self, stats, snapshot):
+        """Add what the pass's streamed downloads read and saved to its stats"""
+        if snapshot is None:
+            return
+        delta = self.scraper.stream_stats.since(snapshot)
+        stats.update(bytes_read=delta['bytes_read'], bytes_saved=delta['bytes_saved'],
+                     pages_cut_short=delta['cut_short'])
+        print(f"📉 Read {delta['bytes_read'] / 1024:.0f} KB, saved {delta['bytes_saved'] / 1024:.0f} KB "
+              f"by stopping {delta['cut_short']} of {delta['pages']} pages early")
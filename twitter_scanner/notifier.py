@@ -0,0 +1,143 @@
+"""
+Notification backends and message formatting
+"""
+
+import os
+from datetime import datetime
+
+
+def format_post_message(username, text, url):
+    """Telegram HTML message for a new post"""
+    return f"""🐦 <b>New Post from @{username}</b>
+
+📝 <b>Content:</b>
+{text}
+
+🔗 <b>View on Twitter:</b>
+{url}
+
+⏰ <b>Time:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
+
+
+# Telegram rejects longer messages
+TELEGRAM_MAX_LENGTH = 4096
+
+
+def format_digest_messages(username, posts, limit=TELEGRAM_MAX_LENGTH):
+    """Telegram HTML messages summarizing (text, url) posts from one account
+
+    Posts are never split across messages; a single post too long for one
+    message has its text cut short.
+    """
+    header = f"🐦 <b>{len(posts)} new posts from @{username}</b>\n"
+    footer = f"\n⏰ <b>Time:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    messages = []
+    current = header
+
+    for text, url in posts:
+        entry = f"\n📝 {text}\n🔗 {url}\n"
+        room = limit - len(header) - len(footer)
+        if len(entry) > room:
+            # Keep the link, trim the text
+            entry = f"\n📝 {text[:room - len(url) - 12]}…\n🔗 {url}\n"
+        if len(current) + len(entry) + len(footer) > limit:
+            messages.append(current + footer)
+            current = header
+        current += entry
+
+    messages.append(current + footer)
+    return messages
+
+
+def format_test_message(platform=None):
+    title = f"Twitter Scanner Test ({platform})" if platform else "Twitter Scanner Test"
+    return f"""🤖 <b>{title}</b>
+
+✅ Telegram bot is working correctly!
+
+⏰ <b>Time:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+🎉 You will receive notifications when monitored accounts post new content."""
+
+
+# Telegram Bot Class
+class TelegramBot:
+    def __init__(self):
+        self.bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
+        self.chat_id = os.getenv('TELEGRAM_CHAT_ID')
+        self._session = None
+
+    @property
+    def configured(self):
+        return bool(self.bot_token and self.chat_id)
+
+    @property
+    def session(self):
+        """requests.Session, created on first use; keeps the connection to Telegram open"""
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    def send_message(self, message, chat_id=None):
+        """Send message to Telegram, to TELEGRAM_CHAT_ID unless another chat is given"""
+        chat_id = chat_id or self.chat_id
+        if not self.bot_token or not chat_id:
+            print("Telegram not configured, skipping notification")
+            return False
+
+        try:
+            response = self.post_message(message, chat_id)
+
+            if response.status_code == 200:
+                print("✅ Telegram message sent successfully")
+                return True
+            else:
+                print(f"❌ Telegram API error: {response.text}")
+                return False
+
+        except Exception as e:
+            print(f"❌ Error sending Telegram message: {e}")
+            return False
+
+    def post_message(self, message, chat_id=None):
+        """POST to sendMessage and return the response; connection errors are raised"""
+        url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
+        data = {
+            'chat_id': chat_id or self.chat_id,
+            'text': message,
+            'parse_mode': 'HTML'
+        }
+        return self.session.post(url, data=data, timeout=10)
+
+    def test_connection(self):
+        """Test if bot is working"""
+        if not self.bot_token or not self.chat_id:
+            return False
+
+        try:
+            url = f"https://api.telegram.org/bot{self.bot_token}/getMe"
+            response = self.session.get(url, timeout=10)
+            return response.status_code == 200
+        except Exception:
+            return False
+
+
+class NullNotifier:
+    """Notifier for profiles without notifications; drops every message"""
+
+    configured = False
+
+    def send_message(self, message):
+        return False
+
+    def test_connection(self):
+        return False
+
+
+def create_notifier(kind):
+    if kind == 'telegram':
+        return TelegramBot()
+    if kind == 'none':
+        return NullNotifier()
+    raise ValueError(f"Unknown notifier '{kind}'")
@@ -0,0 +1,160 @@
+"""
+Profile metadata cache
+Display name, avatar and follower counts are parsed out of the profile page
+the posts fetch already downloads, and kept with a TTL so adding or showing
+an account rarely needs a request of its own.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+_COUNT_RE = re.compile(r'([\d.,]+)\s*([KkMmBb]?)')
+_MULTIPLIERS = {'': 1, 'k': 1_000, 'm': 1_000_000, 'b': 1_000_000_000}
+_TITLE_RE = re.compile(r'^(.*?)\s*\(@\w+\)')
+
+
+def parse_count(text):
+    """'1,234' -> 1234, '1.2K' -> 1200, '3M' -> 3000000"""
+    match = _COUNT_RE.search(text or '')
+    if not match:
+        return None
+    number, suffix = match.groups()
+    try:
+        if suffix:
+            return int(float(number.replace(',', '')) * _MULTIPLIERS[suffix.lower()])
+        return int(number.replace(',', '').replace('.', ''))
+    except ValueError:
+        return None
+
+
+def _meta(soup, *names):
+    for name in names:
+        tag = soup.find('meta', attrs={'property': name}) or soup.find('meta', attrs={'name': name})
+        if tag and tag.get('content'):
+            return tag['content'].strip()
+    return None
+
+
+def parse_profile(soup, username):
+    """Extract profile metadata from a parsed profile page"""
+    display_name = None
+    name_block = soup.find('div', {'data-testid': 'UserName'})
+    if name_block:
+        span = name_block.find('span')
+        if span:
+            display_name = span.get_text(strip=True) or None
+    if not display_name:
+        title = _meta(soup, 'og:title', 'twitter:title') or ''
+        match = _TITLE_RE.match(title)
+        if match:
+            display_name = match.group(1).strip() or None
+
+    avatar = None
+    avatar_img = soup.select_one('[data-testid^="UserAvatar"] img')
+    if avatar_img and avatar_img.get('src'):
+        avatar = avatar_img['src']
+    else:
+        avatar = _meta(soup, 'og:image', 'twitter:image')
+
+    counts = {}
+    for key, suffixes in (('followers_count', ('/followers', '/verified_followers')),
+                          ('following_count', ('/following',))):
+        for suffix in suffixes:
+            link = soup.find('a', href=lambda href: href and href.endswith(suffix))
+            if link:
+                counts[key] = parse_count(link.get_text(' ', strip=True))
+                break
+
+    return {
+        'username': username,
+        'display_name': display_name or username,
+        'profile_image_url': avatar or '',
+        'followers_count': counts.get('followers_count'),
+        'following_count': counts.get('following_count'),
+        'exists': True
+    }
+
+
+class ProfileCache:
+    """Thread-safe LRU of profile dicts with per-entry expiry
+
+    Stale entries are still served while a single background refresh runs,
+    so callers only block when nothing has been cached yet. Stale "doesn't
+    exist" entries are the exception: they are fetched again before
+    answering, so an account that was just created isn't turned away.
+    """
+
+    def __init__(self, ttl=3600, negative_ttl=300, max_entries=5000):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, username, profile):
+        ttl = self.ttl if profile.get('exists') else self.negative_ttl
+        key = username.lower()
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, profile)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def lookup(self, username):
+        """Return (profile, is_fresh), or (None, False) if never cached"""
+        key = username.lower()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            self._entries.move_to_end(key)
+            expires, profile = entry
+            return profile, expires > time.time()
+
+    def get(self, username):
+        """Fresh cached profile or None"""
+        profile, fresh = self.lookup(username)
+        return profile if fresh else None
+
+    def invalidate(self, username):
+        with self._lock:
+            self._entries.pop(username.lower(), None)
+
+    def get_or_fetch(self, username, fetch):
+        """Serve from cache, refreshing stale entries in the background"""
+        profile, fresh = self.lookup(username)
+        if profile is not None and (fresh or profile.get('exists')):
+            if not fresh:
+                self._refresh_async(username, fetch)
+            return profile
+
+        profile = fetch(username)
+        if profile is not None:
+            self.put(username, profile)
+        return profile
+
+    def _refresh_async(self, username, fetch):
+        key = username.lower()
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                profile = fetch(username)
+                if profile is not None:
+                    self.put(username, profile)
+            except Exception as e:
+                print(f"Error refreshing profile for {username}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True, name=f"ProfileRefresh-{username}").start()
@@ -0,0 +1,221 @@
+"""
+Scan profiling
+ScanProfiler times the stages of every account check (rate limit waits,
+downloads, parsing, dedup, database writes, notification handoff and the
+router's deliveries) and attributes each stage's time to the account it was
+spent on. With sampling on, a background thread also samples the stacks of
+the threads doing that work every few milliseconds. The last few passes are
+kept in memory; their stacks come out in the collapsed format flamegraph.pl
+and speedscope read. Everything is off unless SCAN_PROFILING is set or it is
+switched on through /api/profiler, and a disabled profiler costs one
+attribute check per stage.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+STAGES = ('throttle', 'fetch', 'parse', 'dedup', 'persist', 'notify', 'send')
+# Deep enough for Flask + SQLAlchemy, short enough to keep collapsed lines readable
+MAX_STACK_DEPTH = 64
+
+_DISABLED = nullcontext()
+
+
+def frame_label(code):
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def collapse(frame, root):
+    """'root;outer;...;inner' for a frame, as flame graph tools expect"""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.append(root)
+    return ';'.join(reversed(labels))
+
+
+class ScanProfiler:
+    """Stage timers, per-account costs and sampled stacks for the last keep_passes passes"""
+
+    def __init__(self, enabled=False, sample_interval=0.01, keep_passes=5):
+        self.enabled = enabled
+        self.sample_interval = sample_interval
+        self.passes = deque(maxlen=max(1, keep_passes))
+        self._current = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Thread ident -> names of the stages it is in, read by the sampler
+        self._active = {}
+        self._sampler = None
+        self._sampling = threading.Event()
+
+    @classmethod
+    def from_env(cls):
+        profiler = cls(
+            enabled=os.getenv('SCAN_PROFILING', '').lower() in ('1', 'true', 'yes'),
+            sample_interval=float(os.getenv('SCAN_PROFILE_SAMPLE_MS', '10')) / 1000,
+            keep_passes=int(os.getenv('SCAN_PROFILE_PASSES', '5'))
+        )
+        if profiler.enabled and os.getenv('SCAN_PROFILE_SAMPLING', '').lower() in ('1', 'true', 'yes'):
+            profiler.start_sampling()
+        return profiler
+
+    @property
+    def sampling(self):
+        return self._sampling.is_set()
+
+    def begin_pass(self, label='pass'):
+        """Start collecting for a pass; a pass already open keeps collecting"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._current is None:
+                self._current = {
+                    'label': label,
+                    'started_at': datetime.now().isoformat(),
+                    'started': time.perf_counter(),
+                    'thread': threading.get_ident(),
+                    'stages': defaultdict(float),
+                    'accounts': defaultdict(lambda: defaultdict(float)),
+                    'stacks': Counter(),
+                }
+
+    def end_pass(self):
+        with self._lock:
+            current, self._current = self._current, None
+            if current is not None:
+                current['duration_seconds'] = time.perf_counter() - current.pop('started')
+                self.passes.append(current)
+
+    def stage(self, name, account=None):
+        """Context manager timing one stage for account (default: the thread's attributed account)
+
+        Nested stages are timed exclusively: a parse inside a fetch isn't counted twice.
+        """
+        if not self.enabled:
+            return _DISABLED
+        return self._stage(name, account)
+
+    @contextmanager
+    def _stage(self, name, account):
+        ident = threading.get_ident()
+        stack = self._active.setdefault(ident, [])
+        children = getattr(self._local, 'children', None)
+        if children is None:
+            children = self._local.children = []
+        stack.append(name)
+        children.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            own = elapsed - children.pop()
+            if children:
+                children[-1] += elapsed
+            self.add(name, own, account or getattr(self._local, 'account', None))
+
+    @contextmanager
+    def attribute(self, account):
+        """Charge stages on this thread to account (a username) until the block exits"""
+        previous = getattr(self._local, 'account', None)
+        self._local.account = account
+        try:
+            yield
+        finally:
+            self._local.account = previous
+
+    def add(self, name, seconds, account=None):
+        """Record time measured elsewhere, e.g. an awaited download"""
+        with self._lock:
+            if self._current is None:
+                return
+            self._current['stages'][name] += seconds
+            if account:
+                self._current['accounts'][account][name] += seconds
+
+    def start_sampling(self, interval=None):
+        """Sample the scan threads' stacks every interval seconds until stop_sampling()"""
+        if interval:
+            self.sample_interval = interval
+        self.enabled = True
+        if self._sampling.is_set():
+            return
+        self._sampling.set()
+        self._sampler = threading.Thread(target=self._sample_loop, daemon=True, name="ScanProfilerSampler")
+        self._sampler.start()
+
+    def stop_sampling(self):
+        self._sampling.clear()
+        self._sampler = None
+
+    def _sample_loop(self):
+        while self._sampling.is_set():
+            time.sleep(self.sample_interval)
+            current = self._current
+            if current is None:
+                continue
+            frames = sys._current_frames()
+            stacks = []
+            for ident, frame in frames.items():
+                stage_names = list(self._active.get(ident, ()))
+                # Worker threads count while they are in a stage; the pass's own thread always
+                if stage_names or ident == current['thread']:
+                    stacks.append(collapse(frame, stage_names[-1] if stage_names else 'scan'))
+            # Frames hold on to their locals, let them go before sleeping
+            frames = frame = None
+            with self._lock:
+                if self._current is current:
+                    current['stacks'].update(stacks)
+
+    def collapsed_stacks(self, passes=None):
+        """Collapsed stack lines ('a;b;c count') summed over the last `passes` passes"""
+        stacks = Counter()
+        with self._lock:
+            recent = list(self.passes)[-passes:] if passes else list(self.passes)
+            for record in recent:
+                stacks.update(record['stacks'])
+        return '\n'.join(f"{stack} {count}" for stack, count in stacks.most_common()) + ('\n' if stacks else '')
+
+    def report(self, passes=None, top=10):
+        """Stage totals and the accounts costing the most in each stage over the last passes"""
+        stages = defaultdict(float)
+        accounts = defaultdict(lambda: defaultdict(float))
+        with self._lock:
+            recent = list(self.passes)[-passes:] if passes else list(self.passes)
+            summaries = []
+            for record in recent:
+                summaries.append({
+                    'label': record['label'],
+                    'started_at': record['started_at'],
+                    'duration_seconds': round(record['duration_seconds'], 3),
+                    'stages': {name: round(seconds, 4) for name, seconds in record['stages'].items()},
+                    'samples': sum(record['stacks'].values()),
+                })
+                for name, seconds in record['stages'].items():
+                    stages[name] += seconds
+                for account, costs in record['accounts'].items():
+                    for name, seconds in costs.items():
+                        accounts[name][account] += seconds
+
+        costliest = {}
+        for name, by_account in accounts.items():
+            total = stages[name] or 1.0
+            ranked = sorted(by_account.items(), key=lambda item: item[1], reverse=True)[:top]
+            costliest[name] = [{'username': username, 'seconds': round(seconds, 4),
+                                'share': round(seconds / total, 3)} for username, seconds in ranked]
+        return {
+            'enabled': self.enabled,
+            'sampling': self.sampling,
+            'sample_interval_ms': round(self.sample_interval * 1000, 3),
+            'passes': summaries,
+            'stages': {name: round(stages[name], 4) for name in STAGES if name in stages},
+            'costliest_accounts': costliest,
+        }
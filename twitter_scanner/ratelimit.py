@@ -0,0 +1,64 @@
+"""
+Token bucket rate limiter shared by threads and coroutines
+"""
+
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """Allow `rate` calls per second on average with bursts of up to `burst`"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self):
+        """Take a token if one is available without waiting"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def _take(self):
+        """Take a token and return 0, or return how long until one is available"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Block until a token is available; returns the time spent waiting"""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            delay = self._take()
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    async def acquire_async(self):
+        """acquire() for coroutines, sleeping without blocking the event loop"""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            delay = self._take()
+            if not delay:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
@@ -0,0 +1,60 @@
+"""
+Compact records for posts moving through the scan pipeline
+Scrapers hand these to the Scanner instead of dicts: no per-post __dict__,
+one shared string per username and URLs built only when something asks.
+"""
+
+import sys
+from typing import NamedTuple
+
+
+def status_url(username, post_id):
+    """Public URL of a post"""
+    return f"https://twitter.com/{username}/status/{post_id}"
+
+
+class ScrapedPost:
+    """One post read from a profile page"""
+
+    __slots__ = ('id', 'username', 'text', 'created_at', 'pinned')
+
+    def __init__(self, id, username, text, created_at, pinned=False):
+        self.id = id
+        # Every post from an account shares one username string
+        self.username = sys.intern(username)
+        self.text = text
+        self.created_at = created_at
+        self.pinned = pinned
+
+    @property
+    def url(self):
+        return status_url(self.username, self.id)
+
+    def __repr__(self):
+        return f"ScrapedPost(id={self.id!r}, username={self.username!r}, pinned={self.pinned})"
+
+
+class TweetDetails(NamedTuple):
+    """Full text of a post, fetched from its status page"""
+    text: str
+    url: str
+
+
+class PageStats:
+    """HTTP status, size and parse time of one profile page, for the scan ledger"""
+
+    __slots__ = ('status_code', 'bytes', 'parse_seconds')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.status_code = None
+        self.bytes = 0
+        self.parse_seconds = 0.0
+
+
+def response_size(response, text):
+    """Body size of a response in bytes, or in characters when it only offers text"""
+    content = getattr(response, 'content', None)
+    return len(content) if isinstance(content, bytes) else len(text)
@@ -0,0 +1,213 @@
+"""
+Response cache for read-heavy dashboard endpoints
+Rendered bodies are kept per endpoint and parameters and tagged with the
+app's data version current when they were built. A commit that changed
+accounts or posts, the tables the cached endpoints read, bumps the version
+of the app it ran in, so account changes and stored posts invalidate every
+cached page at once without each route having to remember to. Scan
+bookkeeping (last_checked, the ledger, queue tasks) doesn't; the TTL picks
+those up. Responses carry strong ETags (If-None-Match gets a 304) and are
+compressed once per cached body.
+"""
+
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from itertools import chain
+
+from flask import current_app, has_app_context, make_response, request
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from .models import MonitoredAccount, PostHistory
+
+# Tables behind the cached endpoints
+WATCHED_TABLES = frozenset({MonitoredAccount.__table__.name, PostHistory.__table__.name})
+# Written by every account check; a change to only these doesn't invalidate
+QUIET_COLUMNS = frozenset({'last_checked'})
+
+
+def _watched(obj):
+    table = getattr(obj, '__table__', None)
+    return table is not None and table.name in WATCHED_TABLES
+
+
+def _modified(obj):
+    """True if an updated object changed more than its quiet columns"""
+    return any(attr.history.has_changes() for attr in inspect(obj).attrs if attr.key not in QUIET_COLUMNS)
+
+
+@event.listens_for(Session, 'after_flush')
+def _flushed(session, flush_context):
+    # The collections and attribute history still show what was just flushed
+    if any(_watched(obj) for obj in chain(session.new, session.deleted)) or \
+            any(_watched(obj) and _modified(obj) for obj in session.dirty):
+        session.info['data_changed'] = True
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _bulk_write(orm_execute_state):
+    # Query.delete()/update() skip the flush
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and \
+            any(mapper.local_table.name in WATCHED_TABLES for mapper in orm_execute_state.all_mappers):
+        orm_execute_state.session.info['data_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _committed(session):
+    if session.info.pop('data_changed', False) and has_app_context():
+        # Each app has its own cache and version; a session belongs to the app context it runs in
+        services = current_app.extensions.get('twitter_scanner')
+        if services is not None:
+            services.response_cache.bump()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _rolled_back(session):
+    session.info.pop('data_changed', None)
+
+
+def _brotli():
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+class CachedResponse:
+    """One rendered body plus its compressed variants, built on first request"""
+
+    __slots__ = ('version', 'body', 'mimetype', 'etag', 'created', '_encoded')
+
+    def __init__(self, version, body, mimetype):
+        self.version = version
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.created = time.monotonic()
+        self._encoded = {}
+
+    @property
+    def size(self):
+        """Bytes held for the body and its compressed variants"""
+        return len(self.body) + sum(len(body) for body in self._encoded.values())
+
+    def encoded(self, encoding):
+        body = self._encoded.get(encoding)
+        if body is None:
+            if encoding == 'br':
+                body = _brotli().compress(self.body)
+            else:
+                body = gzip.compress(self.body, compresslevel=6)
+            self._encoded[encoding] = body
+        return body
+
+
+class ResponseCache:
+    """LRU of CachedResponse entries, valid while the data version hasn't moved
+
+    Bounded by entry count and by max_bytes of bodies; a body bigger than
+    max_bytes on its own is served but not kept.
+    """
+
+    def __init__(self, max_entries=256, ttl=60, compress=True, min_compress_bytes=1024,
+                 max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.compress = compress
+        self.min_compress_bytes = min_compress_bytes
+        self.brotli = compress and _brotli() is not None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def bump(self):
+        """Invalidate every cached response, for changes that don't go through a commit"""
+        with self._lock:
+            self.version += 1
+            return self.version
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            # The TTL covers writes made by other processes
+            if entry is None or entry.version != version or time.monotonic() - entry.created > self.ttl:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            # Compressed variants are added after put(), so the total is recounted each time
+            size = sum(cached.size for cached in self._entries.values())
+            while self._entries and (len(self._entries) > self.max_entries or size > self.max_bytes):
+                size -= self._entries.popitem(last=False)[1].size
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        with self._lock:
+            return sum(cached.size for cached in self._entries.values())
+
+    def respond(self, entry):
+        """304 for a matching If-None-Match, otherwise the best encoding the client accepts"""
+        encoding = None
+        if self.compress and len(entry.body) >= self.min_compress_bytes:
+            accepted = request.accept_encodings
+            if self.brotli and accepted['br']:
+                encoding = 'br'
+            elif accepted['gzip']:
+                encoding = 'gzip'
+
+        # Strong ETags must differ between content codings
+        etag = f'{entry.etag}-{encoding}' if encoding else entry.etag
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(entry.encoded(encoding) if encoding else entry.body)
+            response.mimetype = entry.mimetype
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    def status(self):
+        return {'entries': len(self._entries), 'bytes': self.size, 'hits': self.hits, 'misses': self.misses,
+                'data_version': self.version}
+
+
+def cached_response(view):
+    """Serve a GET view from the app's ResponseCache; only 200 responses without no-store are stored"""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        cache = current_app.extensions['twitter_scanner'].response_cache
+        key = (request.endpoint, tuple(sorted(request.args.items(multi=True))), tuple(sorted(kwargs.items())))
+        # Read before rendering so a write during rendering leaves the entry stale
+        version = cache.version
+
+        entry = cache.get(key, version)
+        if entry is None:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed or response.cache_control.no_store:
+                return response
+            entry = CachedResponse(version, response.get_data(), response.mimetype)
+            cache.put(key, entry)
+        return cache.respond(entry)
+
+    return wrapper
@@ -0,0 +1,180 @@
+"""
+Retention for PostHistory
+Expired posts are exported to gzipped NDJSON archive files and then deleted
+in small batches, so the table stays bounded without long-running locks.
+"""
+
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+
+class RetentionPolicy:
+    """Age and row-count limits; None means unlimited"""
+
+    def __init__(self, max_age_days=None, max_posts=None):
+        self.max_age_days = max_age_days
+        self.max_posts = max_posts
+
+    @classmethod
+    def from_env(cls):
+        """Global policy from RETENTION_DAYS / RETENTION_MAX_POSTS (0 disables a limit)"""
+        max_age_days = int(os.getenv('RETENTION_DAYS', '90')) or None
+        max_posts = int(os.getenv('RETENTION_MAX_POSTS', '0')) or None
+        return cls(max_age_days, max_posts)
+
+    def for_account(self, account):
+        """Per-account overrides stored on MonitoredAccount take precedence"""
+        return RetentionPolicy(
+            account.retention_days if account.retention_days is not None else self.max_age_days,
+            account.retention_max_posts if account.retention_max_posts is not None else self.max_posts
+        )
+
+    def is_unlimited(self):
+        return not self.max_age_days and not self.max_posts
+
+
+class ArchiveWriter:
+    """Appends rows to one gzipped NDJSON file per day"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path_for(self, day):
+        return os.path.join(self.directory, f'post_history-{day:%Y-%m-%d}.ndjson.gz')
+
+    def write(self, records):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(datetime.utcnow())
+        # Appending adds a new gzip member, which gzip readers handle transparently
+        with gzip.open(path, 'at', encoding='utf-8') as archive:
+            for record in records:
+                archive.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+                archive.write('\n')
+        return path
+
+
+def read_archive(path):
+    """Yield archived rows back as dicts"""
+    with gzip.open(path, 'rt', encoding='utf-8') as archive:
+        for line in archive:
+            if line.strip():
+                yield json.loads(line)
+
+
+class RetentionJob:
+    """Incremental archive-then-delete pass over PostHistory
+
+    Each run handles at most max_batches batches and remembers which account
+    it stopped at, so a large backlog is worked off over several runs while
+    scans keep getting the table in between.
+    """
+
+    def __init__(self, db, account_model, post_model, policy=None, archive_dir='archive',
+                 batch_size=500, max_batches=20, pause=0.1, on_delete=None):
+        self.db = db
+        self.account_model = account_model
+        self.post_model = post_model
+        self.policy = policy or RetentionPolicy.from_env()
+        self.archive = ArchiveWriter(archive_dir) if archive_dir else None
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.pause = pause
+        self.on_delete = on_delete
+        self._next_account_id = 0
+
+    def _expired_ids(self, account_id, policy, now):
+        Post = self.post_model
+        query = self.db.session.query(Post.id).filter(Post.account_id == account_id)
+
+        if policy.max_age_days:
+            cutoff = now - timedelta(days=policy.max_age_days)
+            ids = [row.id for row in query.filter(Post.created_at < cutoff)
+                   .order_by(Post.created_at).limit(self.batch_size)]
+            if ids:
+                return ids
+
+        if policy.max_posts:
+            return [row.id for row in query.order_by(Post.created_at.desc(), Post.id.desc())
+                    .offset(policy.max_posts).limit(self.batch_size)]
+        return []
+
+    def _orphan_ids(self, now):
+        """Posts left behind by removed accounts fall under the global age limit"""
+        if not self.policy.max_age_days:
+            return []
+        Post = self.post_model
+        cutoff = now - timedelta(days=self.policy.max_age_days)
+        known = self.db.session.query(self.account_model.id)
+        return [row.id for row in self.db.session.query(Post.id)
+                .filter(~Post.account_id.in_(known), Post.created_at < cutoff)
+                .order_by(Post.created_at).limit(self.batch_size)]
+
+    def _archive_and_delete(self, ids):
+        Post = self.post_model
+        rows = self.db.session.query(Post).filter(Post.id.in_(ids)).all()
+        post_ids = [row.post_id for row in rows]
+
+        # The archive file is closed before anything is deleted
+        if self.archive:
+            self.archive.write({
+                'id': row.id,
+                'account_id': row.account_id,
+                'post_id': row.post_id,
+                'text': row.text,
+                'created_at': row.created_at.isoformat() if row.created_at else None,
+                'url': row.url,
+                'is_notified': row.is_notified,
+                'post_hash': row.post_hash,
+                'simhash': row.simhash
+            } for row in rows)
+
+        self.db.session.query(Post).filter(Post.id.in_(ids)).delete(synchronize_session=False)
+        for row in rows:
+            self.db.session.expunge(row)
+        self.db.session.commit()
+
+        if self.on_delete:
+            self.on_delete(post_ids)
+        return len(rows)
+
+    def run(self, now=None):
+        """Process up to max_batches batches; returns a stats dict"""
+        now = now or datetime.utcnow()
+        stats = {'archived': 0, 'batches': 0, 'complete': False}
+
+        accounts = self.db.session.query(self.account_model) \
+            .filter(self.account_model.id >= self._next_account_id) \
+            .order_by(self.account_model.id).all()
+        targets = [(account.id, self.policy.for_account(account)) for account in accounts]
+
+        for account_id, policy in targets:
+            if policy.is_unlimited():
+                continue
+
+            while stats['batches'] < self.max_batches:
+                ids = self._expired_ids(account_id, policy, now)
+                if not ids:
+                    break
+                stats['archived'] += self._archive_and_delete(ids)
+                stats['batches'] += 1
+                time.sleep(self.pause)
+
+            if stats['batches'] >= self.max_batches:
+                # Resume from this account next time
+                self._next_account_id = account_id
+                return stats
+
+        while stats['batches'] < self.max_batches:
+            ids = self._orphan_ids(now)
+            if not ids:
+                self._next_account_id = 0
+                stats['complete'] = True
+                break
+            stats['archived'] += self._archive_and_delete(ids)
+            stats['batches'] += 1
+            time.sleep(self.pause)
+
+        return stats
@@ -0,0 +1,144 @@
+"""
+Notification fan-out
+The scanner hands every rendered message to the router together with the
+account's destinations and moves on. Each channel has its own queue, worker
+threads, rate limit and retry policy, so a slow webhook or SMS provider
+never holds up the scan loop or the other channels.
+"""
+
+import os
+import queue
+import threading
+import time
+
+from .channels import Message, PermanentDeliveryError, create_channels
+from .profiling import ScanProfiler
+from .ratelimit import RateLimiter
+
+# Sends per second per channel; Telegram allows about 30 messages a second per bot
+DEFAULT_RATES = {'default': 20, 'telegram': 20, 'sms': 1, 'pushbullet': 2, 'webhook': 10}
+
+# Accounts without destinations of their own
+DEFAULT_DESTINATIONS = (('default', None),)
+
+
+class ChannelWorkers:
+    """Queue, worker pool and counters for one channel"""
+
+    def __init__(self, name, channel, workers, rate, retries, backoff, profiler=None):
+        self.name = name
+        self.channel = channel
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.profiler = profiler or ScanProfiler()
+        self.rate_limiter = RateLimiter(rate=rate, burst=max(1, int(rate)))
+        self.queue = queue.Queue()
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def submit(self, target, message):
+        with self._lock:
+            # Threads start with the first message so unused channels cost nothing
+            if not self._threads:
+                for i in range(self.workers):
+                    thread = threading.Thread(target=self._work, daemon=True,
+                                              name=f"Notify-{self.name}-{i}")
+                    thread.start()
+                    self._threads.append(thread)
+        self.queue.put((target, message))
+
+    def _work(self):
+        while True:
+            target, message = self.queue.get()
+            try:
+                self._deliver(target, message)
+            finally:
+                self.queue.task_done()
+
+    def _deliver(self, target, message):
+        for attempt in range(self.retries + 1):
+            if attempt:
+                with self._lock:
+                    self.retried += 1
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            self.rate_limiter.acquire()
+            try:
+                with self.profiler.stage('send', message.username):
+                    sent = self.channel.send(target, message)
+                if sent:
+                    with self._lock:
+                        self.sent += 1
+                    return
+                error = 'send returned False'
+            except PermanentDeliveryError as e:
+                # Retrying can't help, and would hold this worker for the whole backoff
+                error = e
+                break
+            except Exception as e:
+                error = e
+        with self._lock:
+            self.failed += 1
+        print(f"❌ Giving up on {self.name} notification to {target or 'default'}: {error}")
+
+    def status(self):
+        return {'queued': self.queue.qsize(), 'workers': len(self._threads),
+                'sent': self.sent, 'failed': self.failed, 'retried': self.retried}
+
+
+class NotificationRouter:
+    """Fans rendered messages out to (channel, target) destinations"""
+
+    def __init__(self, channels, workers=4, rates=None, retries=3, backoff=1.0, profiler=None):
+        rates = dict(DEFAULT_RATES, **(rates or {}))
+        self.channels = {
+            name: ChannelWorkers(name, channel, workers, rates.get(name, 10), retries, backoff, profiler)
+            for name, channel in channels.items()
+        }
+
+    @classmethod
+    def from_env(cls, notifier, profiler=None):
+        channels = create_channels(notifier)
+        rates = {name: float(os.getenv(f'NOTIFY_RATE_{name.upper()}', DEFAULT_RATES.get(name, 10)))
+                 for name in channels}
+        return cls(
+            channels,
+            workers=int(os.getenv('NOTIFY_WORKERS', '4')),
+            rates=rates,
+            retries=int(os.getenv('NOTIFY_RETRIES', '3')),
+            backoff=float(os.getenv('NOTIFY_RETRY_BACKOFF_SECONDS', '1')),
+            profiler=profiler
+        )
+
+    def send_message(self, message, destinations=None, username=None, url=None):
+        """Queue one message for every destination; returns how many were queued"""
+        if not isinstance(message, Message):
+            message = Message(message, username, url)
+
+        queued = 0
+        for channel, target in destinations or DEFAULT_DESTINATIONS:
+            workers = self.channels.get(channel)
+            if workers is None:
+                print(f"⚠️  Unknown notification channel '{channel}', skipping")
+                continue
+            if not getattr(workers.channel, 'enabled', True):
+                continue
+            workers.submit(target, message)
+            queued += 1
+        return queued
+
+    def drain(self, timeout=10):
+        """Wait until every queue is empty; True if they all emptied in time"""
+        deadline = time.monotonic() + timeout
+        for workers in self.channels.values():
+            while workers.queue.unfinished_tasks:
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.01)
+        return True
+
+    def status(self):
+        return {name: workers.status() for name, workers in self.channels.items()}
@@ -0,0 +1,882 @@
+"""
+HTTP routes shared by every deployment profile
+Components are looked up on current_app, so the same blueprint serves a
+real or mock scraper, Telegram or no notifications, and any store.
+"""
+
+import csv
+import io
+import re
+from datetime import datetime, timedelta
+
+from flask import Blueprint, Response, current_app, jsonify, render_template, request, stream_with_context
+from sqlalchemy import text
+
+from .bulk_accounts import parse_usernames, import_accounts, summarize_import
+from .digest import NOTIFY_MODES
+from .groups import PRIORITY_CLASSES
+from .ledger import error_hotspots, slowest_accounts, throughput
+from .models import (db, AccountGroup, AlertRule, MonitoredAccount, NotificationDestination, PostHistory,
+                     ScanAccountResult, ScanRun, ScanTask)
+from .notifier import format_test_message
+from .response_cache import cached_response
+from .serialization import account_dicts, dumps, json_response, post_dicts
+from .rules import REGEX, RULE_KINDS
+
+# Channels a destination can use; 'default' is the app's own notifier
+DESTINATION_CHANNELS = ('telegram', 'sms', 'pushbullet', 'webhook')
+
+bp = Blueprint('scanner', __name__)
+
+
+def services():
+    """The Services bundle create_app attached to the current app"""
+    return current_app.extensions['twitter_scanner']
+
+
+def flush_manual_digest():
+    """Without a scheduler nothing else would ever send buffered digests
+
+    Serverless platforms may freeze the process once the response is out, so
+    the notification queues are drained here too.
+    """
+    if not current_app.config['SCHEDULER']:
+        scanner = services().scanner
+        scanner.digest.flush()
+        scanner.router.drain(timeout=current_app.config['NOTIFY_DRAIN_SECONDS'])
+
+
+# Routes
+@bp.route('/')
+@cached_response
+def index():
+    try:
+        accounts = MonitoredAccount.query.filter_by(is_active=True).all()
+        return render_template(current_app.config['INDEX_TEMPLATE'], accounts=accounts)
+    except Exception as e:
+        # Keep the root URL answering for platform health checks, but never cache this in place of the page
+        print(f"Error loading index page: {e}")
+        response = jsonify({
+            'status': 'running',
+            'message': 'Twitter Scanner is running',
+            'timestamp': datetime.now().isoformat()
+        })
+        response.cache_control.no_store = True
+        return response
+
+
+@bp.route('/health')
+def health_check():
+    """Health check endpoint"""
+    try:
+        # Test database connection
+        db.session.execute(text('SELECT 1'))
+        return jsonify({
+            'status': 'healthy',
+            'timestamp': datetime.now().isoformat(),
+            'database': 'connected',
+            'platform': (current_app.config['PLATFORM'] or 'local').lower()
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'status': 'unhealthy',
+            'timestamp': datetime.now().isoformat(),
+            'error': str(e)
+        }), 500
+
+
+@bp.route('/api/accounts', methods=['GET'])
+@cached_response
+def get_accounts():
+    try:
+        return json_response(account_dicts(MonitoredAccount.query.order_by(MonitoredAccount.id)))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/accounts', methods=['POST'])
+def add_account():
+    try:
+        data = request.get_json()
+        username = data.get('username', '').strip().lstrip('@')
+
+        if not username:
+            return jsonify({'error': 'Username is required'}), 400
+
+        # Check if account already exists
+        existing = MonitoredAccount.query.filter_by(username=username).first()
+        if existing:
+            return jsonify({'error': 'Account already being monitored'}), 400
+
+        # Get user info from Twitter
+        user_info = services().scraper.get_user_profile(username)
+        if not user_info.get('exists'):
+            return jsonify({'error': 'User not found on Twitter'}), 400
+
+        # Create new monitored account
+        account = MonitoredAccount(
+            username=username,
+            display_name=user_info.get('display_name', username),
+            profile_image_url=user_info.get('profile_image_url', '')
+        )
+
+        db.session.add(account)
+        db.session.commit()
+
+        return jsonify(account.to_dict()), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/accounts/bulk', methods=['POST'])
+def bulk_add_accounts():
+    """Add many accounts from a CSV or JSON list"""
+    try:
+        try:
+            usernames = parse_usernames(request.get_data(as_text=True), request.content_type)
+        except (ValueError, AttributeError) as e:
+            return jsonify({'error': f'Could not parse account list: {e}'}), 400
+
+        if not usernames:
+            return jsonify({'error': 'No usernames provided'}), 400
+
+        svc = services()
+        workers = current_app.config['BULK_WORKERS']
+
+        # Large lists run in the background and are polled via the job URL
+        if len(usernames) > current_app.config['BULK_SYNC_LIMIT']:
+            app = current_app._get_current_object()
+
+            def run(job):
+                with app.app_context():
+                    import_accounts(svc.scraper, usernames, job, workers=workers)
+
+            job = svc.bulk_jobs.start(len(usernames), run)
+            return jsonify({
+                'job_id': job.id,
+                'status': job.status,
+                'total': len(usernames),
+                'status_url': f'/api/accounts/bulk/{job.id}'
+            }), 202
+
+        results = import_accounts(svc.scraper, usernames, workers=workers)
+        return jsonify({'summary': summarize_import(results), 'results': results})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/accounts/bulk/<job_id>', methods=['GET'])
+def bulk_job_status(job_id):
+    """Progress and results of a background import"""
+    job = services().bulk_jobs.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    data = job.to_dict(include_results=job.status in ('finished', 'failed'))
+    if job.status == 'finished':
+        data['summary'] = summarize_import(job.results)
+    return jsonify(data)
+
+
+@bp.route('/api/accounts/export', methods=['GET'])
+def export_accounts():
+    """Stream all accounts as CSV (default) or a JSON array"""
+    export_format = request.args.get('format', 'csv').lower()
+    columns = (MonitoredAccount.id, MonitoredAccount.username, MonitoredAccount.display_name,
+               MonitoredAccount.is_active, MonitoredAccount.created_at)
+
+    def rows():
+        return db.session.query(*columns).order_by(MonitoredAccount.id).yield_per(500)
+
+    if export_format == 'json':
+        def generate():
+            # Encode 500 rows at a time and splice the arrays together
+            yield b'['
+            batch = []
+            first = True
+            for row in rows():
+                batch.append({
+                    'id': row.id,
+                    'username': row.username,
+                    'display_name': row.display_name,
+                    'is_active': row.is_active,
+                    'created_at': row.created_at
+                })
+                if len(batch) == 500:
+                    yield (b'' if first else b',') + dumps(batch)[1:-1]
+                    batch, first = [], False
+            if batch:
+                yield (b'' if first else b',') + dumps(batch)[1:-1]
+            yield b']'
+        return Response(stream_with_context(generate()), mimetype='application/json')
+
+    if export_format != 'csv':
+        return jsonify({'error': 'format must be csv or json'}), 400
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(['id', 'username', 'display_name', 'is_active', 'created_at'])
+        for row in rows():
+            writer.writerow([row.id, row.username, row.display_name, row.is_active,
+                             row.created_at.isoformat() if row.created_at else ''])
+            if buffer.tell() > 8192:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return Response(stream_with_context(generate_csv()), mimetype='text/csv',
+                    headers={'Content-Disposition': 'attachment; filename=accounts.csv'})
+
+
+@bp.route('/api/accounts/<int:account_id>', methods=['DELETE'])
+def remove_account(account_id):
+    try:
+        account = MonitoredAccount.query.get_or_404(account_id)
+        rule_ids = [rule_id for rule_id, in db.session.query(AlertRule.id).filter_by(account_id=account_id)]
+        AlertRule.query.filter_by(account_id=account_id).delete()
+        ScanTask.query.filter_by(account_id=account_id).delete()
+        db.session.delete(account)
+        db.session.commit()
+        for rule_id in rule_ids:
+            services().scanner.rules.remove(rule_id)
+        return jsonify({'message': 'Account removed successfully'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/accounts/<int:account_id>/toggle', methods=['POST'])
+def toggle_account(account_id):
+    try:
+        account = MonitoredAccount.query.get_or_404(account_id)
+        account.is_active = not account.is_active
+        db.session.commit()
+        return jsonify(account.to_dict())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/accounts/<int:account_id>/profile', methods=['GET'])
+def get_account_profile(account_id):
+    """Cached profile metadata (display name, avatar, follower counts)"""
+    try:
+        account = MonitoredAccount.query.get_or_404(account_id)
+        scraper = services().scraper
+        cached, fresh = scraper.profile_cache.lookup(account.username)
+
+        # Stale entries are returned right away while a refresh runs in the background
+        profile = scraper.get_user_profile(account.username)
+        return jsonify(dict(profile, stale=cached is not None and not fresh))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/accounts/<int:account_id>/retention', methods=['POST'])
+def set_account_retention(account_id):
+    """Override the global retention policy for one account"""
+    try:
+        account = MonitoredAccount.query.get_or_404(account_id)
+        data = request.get_json() or {}
+
+        for field, key in (('retention_days', 'days'), ('retention_max_posts', 'max_posts')):
+            if key in data:
+                value = data[key]
+                if value is not None and (not isinstance(value, int) or value < 1):
+                    return jsonify({'error': f'{key} must be a positive integer or null'}), 400
+                setattr(account, field, value)
+
+        db.session.commit()
+        return jsonify(account.to_dict())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/accounts/<int:account_id>/notifications', methods=['POST'])
+def set_account_notify_mode(account_id):
+    """Choose instant or digest notifications for one account, null for the default"""
+    try:
+        account = MonitoredAccount.query.get_or_404(account_id)
+        mode = (request.get_json() or {}).get('mode')
+        if mode is not None and mode not in NOTIFY_MODES:
+            return jsonify({'error': f"mode must be one of {', '.join(NOTIFY_MODES)} or null"}), 400
+
+        account.notify_mode = mode
+        db.session.commit()
+        return jsonify(account.to_dict())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/destinations', methods=['GET'])
+def get_destinations():
+    try:
+        destinations = NotificationDestination.query.all()
+        return jsonify([destination.to_dict() for destination in destinations])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/destinations', methods=['POST'])
+def add_destination():
+    """Add a Telegram chat, phone number, Pushbullet email or webhook URL"""
+    try:
+        data = request.get_json() or {}
+        channel = data.get('channel')
+        if channel not in DESTINATION_CHANNELS:
+            return jsonify({'error': f"channel must be one of {', '.join(DESTINATION_CHANNELS)}"}), 400
+        target = (data.get('target') or '').strip()
+        if not target and channel != 'pushbullet':
+            return jsonify({'error': 'target is required'}), 400
+
+        destination = NotificationDestination(
+            name=data.get('name') or f'{channel} {target}'.strip(),
+            channel=channel,
+            target=target
+        )
+        db.session.add(destination)
+        db.session.commit()
+        return jsonify(destination.to_dict()), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/destinations/<int:destination_id>', methods=['DELETE'])
+def remove_destination(destination_id):
+    try:
+        destination = NotificationDestination.query.get_or_404(destination_id)
+        db.session.delete(destination)
+        db.session.commit()
+        return jsonify({'message': 'Destination removed successfully'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/accounts/<int:account_id>/destinations', methods=['GET', 'POST'])
+def account_destinations(account_id):
+    """Show or replace where an account's posts are sent; an empty list means the default chat"""
+    try:
+        account = MonitoredAccount.query.get_or_404(account_id)
+        if request.method == 'POST':
+            ids = (request.get_json() or {}).get('destination_ids') or []
+            destinations = NotificationDestination.query.filter(NotificationDestination.id.in_(ids)).all()
+            if len(destinations) != len(set(ids)):
+                return jsonify({'error': 'Unknown destination id'}), 400
+            account.destinations = destinations
+            db.session.commit()
+        return jsonify([destination.to_dict() for destination in account.destinations])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def apply_group_fields(group, data):
+    """Copy validated policy fields from a request onto a group; returns an error message or None"""
+    if 'name' in data:
+        name = (data['name'] or '').strip() if isinstance(data['name'], str) else ''
+        if not name or len(name) > 100:
+            return 'name must be 1-100 characters'
+        if AccountGroup.query.filter(AccountGroup.name == name, AccountGroup.id != group.id).first():
+            return 'A group with that name already exists'
+        group.name = name
+    if 'priority' in data:
+        if data['priority'] is not None and data['priority'] not in PRIORITY_CLASSES:
+            return f"priority must be one of {', '.join(PRIORITY_CLASSES)} or null"
+        group.priority = data['priority']
+    if 'weight' in data:
+        weight = data['weight']
+        if weight is not None and (isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight <= 0):
+            return 'weight must be a positive number or null'
+        group.weight = weight
+    for field in ('min_interval_minutes', 'max_interval_minutes', 'max_posts'):
+        if field in data:
+            value = data[field]
+            if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 1):
+                return f'{field} must be a positive integer or null'
+            setattr(group, field, value)
+    if group.min_interval_minutes and group.max_interval_minutes and \
+            group.min_interval_minutes > group.max_interval_minutes:
+        return 'min_interval_minutes must not be above max_interval_minutes'
+    if 'notify_mode' in data:
+        if data['notify_mode'] is not None and data['notify_mode'] not in NOTIFY_MODES:
+            return f"notify_mode must be one of {', '.join(NOTIFY_MODES)} or null"
+        group.notify_mode = data['notify_mode']
+    if 'destination_ids' in data:
+        ids = data['destination_ids'] or []
+        destinations = NotificationDestination.query.filter(NotificationDestination.id.in_(ids)).all()
+        if len(destinations) != len(set(ids)):
+            return 'Unknown destination id'
+        group.destinations = destinations
+    return None
+
+
+@bp.route('/api/groups', methods=['GET'])
+def get_groups():
+    """Account groups with their policies and how many accounts each holds"""
+    try:
+        counts = dict(db.session.query(MonitoredAccount.group_id, db.func.count(MonitoredAccount.id))
+                      .group_by(MonitoredAccount.group_id).all())
+        groups = AccountGroup.query.order_by(AccountGroup.id).all()
+        return jsonify([dict(group.to_dict(), accounts=counts.get(group.id, 0)) for group in groups])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/groups', methods=['POST'])
+def add_group():
+    """Create a group; policy fields left out follow the app-wide settings"""
+    try:
+        data = request.get_json() or {}
+        group = AccountGroup(name=None)
+        error = apply_group_fields(group, dict(data, name=data.get('name')))
+        if error:
+            db.session.rollback()
+            return jsonify({'error': error}), 400
+        db.session.add(group)
+        db.session.commit()
+        services().scanner.refresh_groups()
+        return jsonify(group.to_dict()), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/groups/<int:group_id>', methods=['POST'])
+def update_group(group_id):
+    """Change some of a group's policy fields"""
+    try:
+        group = db.session.get(AccountGroup, group_id)
+        if group is None:
+            return jsonify({'error': 'Group not found'}), 404
+        error = apply_group_fields(group, request.get_json() or {})
+        if error:
+            db.session.rollback()
+            return jsonify({'error': error}), 400
+        db.session.commit()
+        services().scanner.refresh_groups()
+        return jsonify(group.to_dict())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/groups/<int:group_id>', methods=['DELETE'])
+def remove_group(group_id):
+    """Delete a group; its accounts go back to the app-wide settings"""
+    try:
+        group = db.session.get(AccountGroup, group_id)
+        if group is None:
+            return jsonify({'error': 'Group not found'}), 404
+        MonitoredAccount.query.filter_by(group_id=group_id).update({'group_id': None})
+        db.session.delete(group)
+        db.session.commit()
+        services().scanner.refresh_groups()
+        return jsonify({'message': 'Group removed successfully'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/groups/<int:group_id>/accounts', methods=['POST'])
+def add_group_accounts(group_id):
+    """Move the given account_ids into a group"""
+    try:
+        if not db.session.get(AccountGroup, group_id):
+            return jsonify({'error': 'Group not found'}), 404
+        ids = (request.get_json() or {}).get('account_ids')
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            return jsonify({'error': 'account_ids must be a list of account ids'}), 400
+        moved = MonitoredAccount.query.filter(MonitoredAccount.id.in_(ids)) \
+            .update({'group_id': group_id}, synchronize_session=False)
+        db.session.commit()
+        return jsonify({'message': f'Moved {moved} accounts', 'moved': moved})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/accounts/<int:account_id>/group', methods=['POST'])
+def set_account_group(account_id):
+    """Put one account in a group, or take it out with null"""
+    try:
+        account = db.session.get(MonitoredAccount, account_id)
+        if account is None:
+            return jsonify({'error': 'Account not found'}), 404
+        group_id = (request.get_json() or {}).get('group_id')
+        if group_id is not None and not db.session.get(AccountGroup, group_id):
+            return jsonify({'error': 'Group not found'}), 404
+        account.group_id = group_id
+        db.session.commit()
+        return jsonify(account.to_dict())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/rules', methods=['GET'])
+def get_rules():
+    """Alert rules, optionally only those for one account (?account_id=)"""
+    try:
+        query = AlertRule.query
+        account_id = request.args.get('account_id', type=int)
+        if account_id is not None:
+            query = query.filter_by(account_id=account_id)
+        return jsonify([rule.to_dict() for rule in query.order_by(AlertRule.id).all()])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/rules', methods=['POST'])
+def add_rule():
+    """Add a keyword or regex rule, for one account or (without account_id) for all"""
+    try:
+        data = request.get_json() or {}
+        kind = data.get('kind', 'keyword')
+        pattern = (data.get('pattern') or '').strip()
+        account_id = data.get('account_id')
+
+        if kind not in RULE_KINDS:
+            return jsonify({'error': f"kind must be one of {', '.join(RULE_KINDS)}"}), 400
+        if not pattern or len(pattern) > 500:
+            return jsonify({'error': 'pattern must be 1-500 characters'}), 400
+        if kind == REGEX:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                return jsonify({'error': f'Invalid regex: {e}'}), 400
+        if account_id is not None and not db.session.get(MonitoredAccount, account_id):
+            return jsonify({'error': 'Account not found'}), 404
+
+        rule = AlertRule(account_id=account_id, kind=kind, pattern=pattern)
+        db.session.add(rule)
+        db.session.commit()
+
+        # Only this rule is compiled in, the rest of the matcher is kept
+        services().scanner.rules.add(rule.id, rule.account_id, rule.kind, rule.pattern)
+        return jsonify(rule.to_dict()), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/rules/<int:rule_id>', methods=['DELETE'])
+def remove_rule(rule_id):
+    try:
+        rule = AlertRule.query.get_or_404(rule_id)
+        db.session.delete(rule)
+        db.session.commit()
+        services().scanner.rules.remove(rule_id)
+        return jsonify({'message': 'Rule removed successfully'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/accounts/<int:account_id>/breaker/reset', methods=['POST'])
+def reset_account_breaker(account_id):
+    """Take an account out of quarantine so the next pass checks it again"""
+    try:
+        account = MonitoredAccount.query.get_or_404(account_id)
+        services().scanner.breaker.reset(account)
+        db.session.commit()
+        return jsonify(account.to_dict())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/retention/run', methods=['POST'])
+def trigger_retention():
+    """Manually run one retention pass"""
+    try:
+        stats = services().retention_job.run()
+        return jsonify(stats)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/posts/<int:account_id>')
+@cached_response
+def get_posts(account_id):
+    try:
+        posts = PostHistory.query.filter_by(account_id=account_id).order_by(PostHistory.created_at.desc()).limit(20)
+        return json_response(post_dicts(posts))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/check/<int:account_id>', methods=['POST'])
+def manual_check(account_id):
+    """Manually check for new posts from a specific account"""
+    try:
+        account = MonitoredAccount.query.get_or_404(account_id)
+        # A manual check always fetches, so it doubles as an early probe for quarantined accounts
+        scanner = services().scanner
+        scanner.refresh_rules()
+        new_posts = scanner.check_account(account)
+        flush_manual_digest()
+        return jsonify({'message': f'Found {new_posts} new posts', 'new_posts': new_posts,
+                        'breaker': account.to_dict()['breaker']})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/test-telegram', methods=['POST'])
+def test_telegram():
+    """Test Telegram bot connection"""
+    try:
+        notifier = services().notifier
+        if notifier.test_connection():
+            if notifier.send_message(format_test_message(current_app.config['PLATFORM'])):
+                return jsonify({'message': 'Telegram test successful!'})
+            else:
+                return jsonify({'error': 'Failed to send test message'}), 500
+        else:
+            return jsonify({'error': 'Telegram bot not configured or invalid credentials'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/trigger-scan', methods=['POST'])
+def trigger_scan():
+    """Manually trigger a scan of all accounts"""
+    try:
+        print("🔄 Manual scan triggered")
+        if current_app.config['SCAN_QUEUE']:
+            queued = services().scan_queue.enqueue_pass()
+            return jsonify({'message': f'Queued {queued} account checks for the scan workers', 'queued': queued}), 202
+
+        coordinator = services().coordinator
+        scan = coordinator.run_pass(trigger='manual')
+        if scan is None:
+            return jsonify({'error': 'A scan is already in progress', 'scan': coordinator.status()['in_flight']}), 409
+        flush_manual_digest()
+
+        new_posts = scan['new_posts']
+        return jsonify({'message': f'Manual scan completed! Found {new_posts} new posts', 'new_posts': new_posts,
+                        'scan': scan})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/scan-queue', methods=['GET'])
+def scan_queue_status():
+    """Scan task counts, queue age and recent dead letters"""
+    try:
+        return jsonify(services().scan_queue.stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/scan-queue/requeue', methods=['POST'])
+def requeue_dead_tasks():
+    """Retry dead-lettered scan tasks, all of them or the given task_ids"""
+    try:
+        data = request.get_json(silent=True) or {}
+        task_ids = data.get('task_ids')
+        if task_ids is not None and (not isinstance(task_ids, list)
+                                     or not all(isinstance(i, int) for i in task_ids)):
+            return jsonify({'error': 'task_ids must be a list of task ids'}), 400
+        requeued = services().scan_queue.requeue_dead(task_ids)
+        return jsonify({'message': f'Requeued {requeued} tasks', 'requeued': requeued})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/scan-runs', methods=['GET'])
+def get_scan_runs():
+    """The latest ?limit= passes from the scan ledger, newest first"""
+    try:
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 500)
+        runs = ScanRun.query.order_by(ScanRun.id.desc()).limit(limit)
+        return jsonify([run.to_dict() for run in runs])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/scan-runs/<int:run_id>', methods=['GET'])
+def get_scan_run(run_id):
+    """One pass and what each of its account checks did"""
+    try:
+        run = db.session.get(ScanRun, run_id)
+        if run is None:
+            return jsonify({'error': 'Scan run not found'}), 404
+        results = ScanAccountResult.query.filter_by(run_id=run_id).order_by(ScanAccountResult.id)
+        return jsonify(dict(run.to_dict(), results=[result.to_dict() for result in results]))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def analytics_since():
+    """Start of the ?hours= window (default a day, at most LEDGER_ROLLUP_DAYS worth)"""
+    hours = min(max(request.args.get('hours', 24, type=int), 1), services().ledger.rollup_days * 24)
+    return datetime.utcnow() - timedelta(hours=hours)
+
+
+@bp.route('/api/analytics/throughput', methods=['GET'])
+def analytics_throughput():
+    """Checks, new posts, bytes, errors and average check time per hour"""
+    try:
+        return jsonify(throughput(analytics_since()))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/analytics/slowest', methods=['GET'])
+def analytics_slowest():
+    """Accounts with the highest average check time over the window"""
+    try:
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+        return jsonify(slowest_accounts(analytics_since(), limit))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/analytics/errors', methods=['GET'])
+def analytics_errors():
+    """Accounts with the most failed checks over the window"""
+    try:
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+        return jsonify(error_hotspots(analytics_since(), limit))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/profiler', methods=['GET'])
+def profiler_report():
+    """Stage timings and costliest accounts over the last ?passes= profiled passes"""
+    try:
+        passes = request.args.get('passes', type=int)
+        return jsonify(services().profiler.report(passes=passes, top=request.args.get('top', 10, type=int)))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/profiler', methods=['POST'])
+def configure_profiler():
+    """Turn stage timing and stack sampling on or off at runtime"""
+    try:
+        data = request.get_json(silent=True) or {}
+        profiler = services().profiler
+        for key in ('enabled', 'sampling'):
+            if key in data and not isinstance(data[key], bool):
+                return jsonify({'error': f'{key} must be true or false'}), 400
+        interval_ms = data.get('interval_ms')
+        if interval_ms is not None and (not isinstance(interval_ms, (int, float)) or not 1 <= interval_ms <= 1000):
+            return jsonify({'error': 'interval_ms must be between 1 and 1000'}), 400
+
+        if 'enabled' in data:
+            profiler.enabled = data['enabled']
+        if data.get('sampling') and profiler.enabled:
+            profiler.start_sampling(interval_ms / 1000 if interval_ms else None)
+        elif data.get('sampling') is False or not profiler.enabled:
+            profiler.stop_sampling()
+        print(f"🔬 Profiler {'on' if profiler.enabled else 'off'}, sampling {'on' if profiler.sampling else 'off'}")
+        return jsonify({'enabled': profiler.enabled, 'sampling': profiler.sampling,
+                        'sample_interval_ms': round(profiler.sample_interval * 1000, 3)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/profiler/stacks', methods=['GET'])
+def profiler_stacks():
+    """Sampled stacks of the last ?passes= passes in collapsed format, for flamegraph.pl or speedscope"""
+    try:
+        stacks = services().profiler.collapsed_stacks(passes=request.args.get('passes', type=int))
+        return Response(stacks, mimetype='text/plain')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/debug/memory', methods=['GET'])
+def memory_report():
+    """RSS, cache sizes and, while tracing, the allocation sites that grew since the last call"""
+    try:
+        report = services().memory.report(services(), limit=request.args.get('top', 10, type=int),
+                                          reset=request.args.get('reset', 'true').lower() != 'false')
+        return jsonify(report)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/debug/memory', methods=['POST'])
+def configure_memory_tracing():
+    """Start or stop tracemalloc; starting it takes the baseline for the next report"""
+    try:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data.get('tracemalloc'), bool):
+            return jsonify({'error': 'tracemalloc must be true or false'}), 400
+        monitor = services().memory
+        if data['tracemalloc']:
+            monitor.start()
+        else:
+            monitor.stop()
+        print(f"🧠 tracemalloc {'on' if monitor.tracing else 'off'}")
+        return jsonify({'tracemalloc': monitor.tracing})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/scanner-status', methods=['GET'])
+def scanner_status():
+    """Get the status of the auto-scanner"""
+    try:
+        active_accounts = MonitoredAccount.query.filter_by(is_active=True).count()
+        total_accounts = MonitoredAccount.query.count()
+
+        # Get the last check time for any account
+        last_checked = MonitoredAccount.query.filter_by(is_active=True).order_by(MonitoredAccount.last_checked.desc()).first()
+        last_check_time = last_checked.last_checked.isoformat() if last_checked else None
+
+        config = current_app.config
+        if config['SCHEDULER']:
+            interval = config['SCAN_INTERVAL_MINUTES']
+            scan_interval = f'{interval} minutes'
+            next_scan = f'Every {interval} minutes automatically'
+        else:
+            scan_interval = f"Manual only ({config['PLATFORM']})" if config['PLATFORM'] else 'Manual only'
+            next_scan = 'Manual trigger required'
+
+        return jsonify({
+            'status': 'running',
+            'active_accounts': active_accounts,
+            'total_accounts': total_accounts,
+            'last_check_time': last_check_time,
+            'scan_interval': scan_interval,
+            'next_scan': next_scan,
+            'scans': services().coordinator.status(),
+            'notifications': services().scanner.router.status(),
+            'response_cache': services().response_cache.status(),
+            'scan_queue': services().scan_queue.stats()['counts'] if config['SCAN_QUEUE'] else None,
+            'cassette': services().cassette.status() if services().cassette else None
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/accounts/search', methods=['GET'])
+@cached_response
+def search_accounts():
+    """Search accounts by username or display name"""
+    try:
+        query = request.args.get('q', '').strip()
+        status_filter = request.args.get('status', 'all').strip()
+
+        # Build query
+        accounts_query = MonitoredAccount.query
+
+        # Apply search filter
+        if query:
+            accounts_query = accounts_query.filter(
+                db.or_(
+                    MonitoredAccount.username.ilike(f'%{query}%'),
+                    MonitoredAccount.display_name.ilike(f'%{query}%')
+                )
+            )
+
+        # Apply status filter
+        if status_filter == 'active':
+            accounts_query = accounts_query.filter_by(is_active=True)
+        elif status_filter == 'inactive':
+            accounts_query = accounts_query.filter_by(is_active=False)
+
+        # Execute query
+        return json_response(account_dicts(accounts_query.order_by(MonitoredAccount.id)))
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,212 @@
+"""
+Keyword and regex alert rules
+Rules are global (account_id NULL) or tied to one account. Once any rule
+applies to an account, only its posts that match a rule are notified.
+All keywords share one Aho-Corasick automaton, so a post is scanned once
+however many keywords there are; regexes are joined into one alternation
+per account. Changing a rule only rebuilds what it touches.
+"""
+
+import re
+import threading
+from collections import Counter, deque
+
+KEYWORD = 'keyword'
+REGEX = 'regex'
+RULE_KINDS = (KEYWORD, REGEX)
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over lowercased keywords; each keyword carries a value"""
+
+    def __init__(self):
+        self._keywords = {}
+        self._reset()
+        self._stale = False
+        self._links_stale = False
+
+    def _reset(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+    def _insert(self, keyword, value):
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(value)
+
+    def add(self, keyword, value):
+        keyword = keyword.lower()
+        if not keyword:
+            return
+        self._keywords[value] = keyword
+        if not self._stale:
+            # New keywords extend the trie in place; only the failure links are redone
+            self._insert(keyword, value)
+        self._links_stale = True
+
+    def remove(self, value):
+        if self._keywords.pop(value, None) is not None:
+            self._stale = True
+
+    def __len__(self):
+        return len(self._keywords)
+
+    def _build(self):
+        if self._stale:
+            self._reset()
+            for value, keyword in self._keywords.items():
+                self._insert(keyword, value)
+            self._stale = False
+
+        # Failure links breadth first; each state also reports its fallback's keywords
+        goto, fail = self._goto, self._fail
+        matches = [list(values) for values in self._out]
+        queue = deque(goto[0].values())
+        for state in queue:
+            fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                matches[nxt] = self._out[nxt] + matches[fail[nxt]]
+                queue.append(nxt)
+        self._matches = matches
+        self._links_stale = False
+
+    def iter_matches(self, text):
+        """Values of every keyword found in text"""
+        if self._links_stale or self._stale:
+            self._build()
+        goto, fail, matches = self._goto, self._fail, self._matches
+        state = 0
+        for ch in text.lower():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if matches[state]:
+                yield from matches[state]
+
+
+class RuleSet:
+    """All active alert rules, compiled for matching"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self):
+        self._automaton = KeywordAutomaton()
+        # account_id (None for global) -> {rule_id: compiled pattern}
+        self._patterns = {}
+        self._combined = {}
+        self._keyword_scopes = {}
+        self._scope_counts = Counter()
+        self._rules = {}
+
+    def __len__(self):
+        return len(self._rules)
+
+    @property
+    def signature(self):
+        """(count, max id, sum of ids), comparable with the same aggregate over the table"""
+        with self._lock:
+            if not self._rules:
+                return (0, None, None)
+            return (len(self._rules), max(self._rules), sum(self._rules))
+
+    def load(self, rules):
+        """Replace every rule with (id, account_id, kind, pattern) rows"""
+        with self._lock:
+            self._clear()
+            for rule_id, account_id, kind, pattern in rules:
+                self.add(rule_id, account_id, kind, pattern)
+
+    def add(self, rule_id, account_id, kind, pattern):
+        with self._lock:
+            if rule_id in self._rules:
+                self.remove(rule_id)
+            self._rules[rule_id] = (account_id, kind)
+            self._scope_counts[account_id] += 1
+            if kind == KEYWORD:
+                self._automaton.add(pattern, rule_id)
+                self._keyword_scopes[rule_id] = account_id
+            else:
+                self._patterns.setdefault(account_id, {})[rule_id] = re.compile(pattern, re.IGNORECASE)
+                self._combined.pop(account_id, None)
+
+    def remove(self, rule_id):
+        with self._lock:
+            rule = self._rules.pop(rule_id, None)
+            if rule is None:
+                return False
+            account_id, kind = rule
+            self._scope_counts[account_id] -= 1
+            if not self._scope_counts[account_id]:
+                del self._scope_counts[account_id]
+            if kind == KEYWORD:
+                self._automaton.remove(rule_id)
+                del self._keyword_scopes[rule_id]
+            else:
+                patterns = self._patterns[account_id]
+                del patterns[rule_id]
+                if not patterns:
+                    del self._patterns[account_id]
+                self._combined.pop(account_id, None)
+            return True
+
+    def applies_to(self, account_id):
+        """True if any rule covers this account, i.e. its posts are filtered"""
+        return None in self._scope_counts or account_id in self._scope_counts
+
+    def _regex_for(self, account_id):
+        """One alternation of every regex in a scope, compiled on first use"""
+        combined = self._combined.get(account_id)
+        if combined is None:
+            patterns = self._patterns[account_id]
+            try:
+                combined = re.compile('|'.join(f'(?:{p.pattern})' for p in patterns.values()), re.IGNORECASE)
+            except re.error:
+                # Patterns with inline global flags can't be joined; match them one by one
+                combined = False
+            self._combined[account_id] = combined
+        return combined
+
+    def match(self, account_id, text):
+        """Id of a rule covering account_id that matches text, or None"""
+        with self._lock:
+            for rule_id in self._automaton.iter_matches(text):
+                scope = self._keyword_scopes[rule_id]
+                if scope is None or scope == account_id:
+                    return rule_id
+
+            for scope in (None, account_id):
+                patterns = self._patterns.get(scope)
+                if not patterns:
+                    continue
+                combined = self._regex_for(scope)
+                if combined and not combined.search(text):
+                    continue
+                # Only on a hit: find which rule it was
+                for rule_id, pattern in patterns.items():
+                    if pattern.search(text):
+                        return rule_id
+            return None
+
+    def should_notify(self, account_id, text):
+        """Accounts without rules get every post, others only matching ones"""
+        with self._lock:
+            if not self._rules or not self.applies_to(account_id):
+                return True
+            return self.match(account_id, text) is not None
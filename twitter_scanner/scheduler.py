@@ -0,0 +1,126 @@
+"""
+Background scheduler for scan passes and retention
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from .models import db
+
+
+class Cadence:
+    """Fixed-rate start times anchor + k * interval, so a pass that starts late shows up as lag
+
+    schedule plans the next run from the end of the previous one, which
+    hides an overrun: a 7 minute pass on a 5 minute interval would look on
+    time. Here the slots stay put, and after an overrun the next pass gets
+    the latest slot already passed, started at once and recorded as late.
+    """
+
+    def __init__(self, seconds, anchor=None):
+        self.seconds = seconds
+        self.last = anchor or datetime.now()
+
+    def next_slot(self, now=None):
+        """Planned start of the next run"""
+        now = now or datetime.now()
+        slot = self.last + timedelta(seconds=self.seconds)
+        if now > slot:
+            # Slots missed while the previous run overran collapse into the latest one
+            slot += timedelta(seconds=self.seconds * int((now - slot).total_seconds() // self.seconds))
+        self.last = slot
+        return slot
+
+
+def run_scan_loop(coordinator, cadence, stop=None):
+    """Run scheduled passes on the cadence until stop (a threading.Event) is set"""
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        slot = cadence.next_slot()
+        if stop.wait(max(0.0, (slot - datetime.now()).total_seconds())):
+            break
+        try:
+            coordinator.run_pass(trigger='schedule', planned_at=slot)
+        except Exception as e:
+            print(f"❌ Error in scan pass: {e}")
+
+
+def run_retention(app):
+    """Archive and delete expired post history, and roll up and prune the scan ledger"""
+    services = app.extensions['twitter_scanner']
+    with app.app_context():
+        try:
+            stats = services.retention_job.run()
+            if stats['archived']:
+                print(f"🗄️  Archived {stats['archived']} old posts in {stats['batches']} batches")
+        except Exception as e:
+            print(f"❌ Error in retention job: {e}")
+            db.session.rollback()
+        try:
+            stats = services.ledger.maintain()
+            if stats['rolled_up'] or stats['results']:
+                print(f"📒 Rolled up {stats['rolled_up']} hourly scan totals, pruned {stats['results']} scan results")
+        except Exception as e:
+            print(f"❌ Error in scan ledger maintenance: {e}")
+            db.session.rollback()
+
+
+def enqueue_scan(app):
+    """Queue a check for every active account, for scan workers to pick up"""
+    with app.app_context():
+        try:
+            queued = app.extensions['twitter_scanner'].scan_queue.enqueue_pass()
+            print(f"📥 Queued {queued} account checks")
+            return queued
+        except Exception as e:
+            print(f"❌ Error queueing scan tasks: {e}")
+            db.session.rollback()
+            return 0
+
+
+# Schedule monitoring
+def run_scheduler(app):
+    """Run the background scheduler for monitoring accounts"""
+    services = app.extensions['twitter_scanner']
+    interval = app.config['SCAN_INTERVAL_MINUTES']
+
+    # Only scheduler profiles pay for importing schedule
+    import schedule
+
+    # A private scheduler so two apps in one process don't share jobs
+    scheduler = schedule.Scheduler()
+    if app.config['SCAN_QUEUE']:
+        # Checks run in scan_worker.py processes, this one only hands them out
+        scheduler.every(interval).minutes.do(enqueue_scan, app)
+    else:
+        # Passes get their own thread so a long one doesn't hold up retention and digest flushes
+        threading.Thread(target=run_scan_loop, args=(services.coordinator, Cadence(interval * 60)), daemon=True,
+                         name="TwitterScannerPasses").start()
+    scheduler.every(int(os.getenv('RETENTION_INTERVAL_MINUTES', '60'))).minutes.do(run_retention, app)
+    scheduler.every(10).seconds.do(services.scanner.digest.flush_if_due)
+    print(f"⏰ Scheduler started - will check accounts every {interval} minutes")
+
+    while True:
+        try:
+            scheduler.run_pending()
+            time.sleep(1)
+        except Exception as e:
+            print(f"❌ Error in scheduler: {e}")
+            time.sleep(5)  # Wait 5 seconds before retrying
+
+
+# Start background scheduler
+def start_background_tasks(app):
+    """Start the background scheduler thread"""
+    try:
+        scheduler_thread = threading.Thread(target=run_scheduler, args=(app,), daemon=True,
+                                            name="TwitterScannerScheduler")
+        scheduler_thread.start()
+        print("✅ Background scheduler started")
+        print(f"🔄 Auto-scanning will run every {app.config['SCAN_INTERVAL_MINUTES']} minutes")
+        return True
+    except Exception as e:
+        print(f"❌ Error starting background scheduler: {e}")
+        return False
@@ -0,0 +1,356 @@
+"""
+Twitter scrapers
+MinimalTwitterScraper reads public profile pages; MockTwitterScraper stands
+in on platforms where live scraping would get rate limited.
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from .profile_cache import ProfileCache, parse_profile
+from .profiling import ScanProfiler
+from .ratelimit import RateLimiter
+from .records import PageStats, ScrapedPost, TweetDetails, response_size
+from .streaming import CHUNK_SIZE, StreamStats, TimelineReader, TimelineWatcher, content_length
+
+
+class ScrapeError(Exception):
+    """A timeline fetch that failed; status_code is None for network errors"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def is_known_post(tweet_id, since_id):
+    """True if tweet_id is at or below the high-water mark"""
+    # Snowflake ids grow over time, so numeric ids can be compared directly
+    if tweet_id.isdigit() and since_id.isdigit():
+        return int(tweet_id) <= int(since_id)
+    return tweet_id == since_id
+
+
+def parse_post_time(value):
+    """Naive UTC datetime from a <time datetime="..."> value, None if unparseable"""
+    if not value:
+        return None
+    try:
+        # Twitter always sends UTC with a Z suffix, e.g. 2024-05-01T12:34:56.000Z
+        if value[-1] == 'Z':
+            return datetime.fromisoformat(value[:-1])
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def is_pinned(container):
+    """Pinned posts carry a 'Pinned' social context label"""
+    context = container.find(attrs={'data-testid': 'socialContext'})
+    return bool(context and 'pinned' in context.get_text(strip=True).lower())
+
+
+# Simple Twitter Scraper (minimal dependencies)
+class MinimalTwitterScraper:
+    def __init__(self):
+        self._session = None
+        # Every fetch goes through one limiter, whichever thread makes it
+        self.rate_limiter = RateLimiter(
+            rate=float(os.getenv('SCRAPER_RATE_LIMIT', '5')),
+            burst=int(os.getenv('SCRAPER_RATE_BURST', '10'))
+        )
+        self.profile_cache = ProfileCache(ttl=int(os.getenv('PROFILE_CACHE_TTL', '3600')),
+                                          max_entries=int(os.getenv('PROFILE_CACHE_MAX_ENTRIES', '5000')))
+        self.max_posts_cap = int(os.getenv('SCRAPER_MAX_POSTS_CAP', '40'))
+        # Read profile pages only as far as the posts we need, see streaming.py
+        self.streaming = os.getenv('SCRAPER_STREAMING', '').lower() in ('1', 'true', 'yes')
+        self.max_body_bytes = int(os.getenv('SCRAPER_MAX_BODY_KB', '4096')) * 1024
+        self.stream_stats = StreamStats()
+        # Set when the session records to or replays from an HTTP cassette
+        self.cassette = None
+        # The app's profiler replaces this disabled one
+        self.profiler = ScanProfiler()
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        """requests.Session, created on first use so importing the app stays cheap"""
+        if self._session is None:
+            import requests
+            session = requests.Session()
+            session.headers.update({
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            })
+            self._session = session
+        return self._session
+
+    @property
+    def page_stats(self):
+        """PageStats of the last profile page fetched on this thread"""
+        stats = getattr(self._local, 'page_stats', None)
+        if stats is None:
+            stats = self._local.page_stats = PageStats()
+        return stats
+
+    def fetch(self, url):
+        """Rate-limited GET through the shared session"""
+        with self.profiler.stage('throttle'):
+            self.rate_limiter.acquire()
+        with self.profiler.stage('fetch'):
+            return self.session.get(url, timeout=10)
+
+    def get_user_profile(self, username):
+        """Get user profile information, from the profile cache when possible"""
+        profile = self.profile_cache.get_or_fetch(username, self._fetch_profile)
+        return profile or {'exists': False}
+
+    def _fetch_profile(self, username):
+        """Download and parse a profile page; None means the result shouldn't be cached"""
+        try:
+            url = f"https://twitter.com/{username}"
+            response = self.fetch(url)
+
+            if response.status_code == 200:
+                from bs4 import BeautifulSoup
+                with self.profiler.stage('parse'):
+                    soup = BeautifulSoup(response.text, 'html.parser')
+                    try:
+                        return parse_profile(soup, username)
+                    finally:
+                        soup.decompose()
+            elif response.status_code == 404:
+                return {'exists': False}
+            else:
+                print(f"❌ Failed to load profile for @{username}: HTTP {response.status_code}")
+                return None
+
+        except Exception as e:
+            print(f"Error getting profile for {username}: {e}")
+            return None
+
+    def get_user_posts(self, username, max_posts=5, since_id=None, since_time=None, cap=None):
+        """Get recent posts from a user's profile
+
+        With since_id (the account's high-water mark) parsing stops at the first
+        already-seen post, and keeps going past max_posts up to cap (at most
+        max_posts_cap) when the mark hasn't been reached yet so bursts aren't
+        cut off.
+        since_time (the mark's post time) also stops parsing at the first post
+        that isn't newer, and drops old pinned posts before any further work.
+        Raises ScrapeError when the page can't be fetched or shows no posts at all.
+        """
+        url = f"https://twitter.com/{username}"
+        page = self.page_stats
+        page.reset()
+        try:
+            if self.streaming:
+                status_code, html = self.fetch_timeline(url, self.read_limit(max_posts, since_id, cap),
+                                                        since_id, since_time)
+            else:
+                response = self.fetch(url)
+                status_code, html = response.status_code, response.text
+                page.bytes = response_size(response, html)
+        except Exception as e:
+            raise ScrapeError(str(e)) from e
+        page.status_code = status_code
+        return self.parse_user_posts(username, status_code, html, max_posts, since_id, since_time, cap)
+
+    def read_limit(self, max_posts, since_id=None, cap=None):
+        """Most posts one check reads: max_posts on a first scan, else up to cap or max_posts_cap"""
+        return min(cap or self.max_posts_cap, self.max_posts_cap) if since_id else max_posts
+
+    def timeline_reader(self, limit, since_id=None, since_time=None, encoding=None):
+        """TimelineReader that stops where parse_user_posts would with the same arguments"""
+        def is_known(tweet_id, time_value):
+            if since_id and is_known_post(tweet_id, since_id):
+                return True
+            tweet_time = parse_post_time(time_value)
+            return bool(since_time and tweet_time and tweet_time <= since_time)
+        return TimelineReader(TimelineWatcher(limit, is_known), encoding, self.max_body_bytes)
+
+    def fetch_timeline(self, url, limit, since_id=None, since_time=None):
+        """(status_code, html) for a profile page, downloaded only as far as the parse will look"""
+        with self.profiler.stage('throttle'):
+            self.rate_limiter.acquire()
+        with self.profiler.stage('fetch'):
+            return self.read_timeline(self.session.get(url, timeout=10, stream=True), limit, since_id, since_time)
+
+    def read_timeline(self, response, limit, since_id=None, since_time=None):
+        """Read a stream=True response until the timeline has what the parse needs"""
+        try:
+            if response.status_code != 200:
+                self.page_stats.bytes = response_size(response, response.text)
+                return response.status_code, response.text
+            reader = self.timeline_reader(limit, since_id, since_time, response.encoding)
+            for chunk in response.iter_content(CHUNK_SIZE):
+                if reader.feed(chunk):
+                    break
+            # Bytes off the wire, which is what Content-Length counts for compressed pages
+            wire_bytes = getattr(response.raw, 'tell', lambda: reader.bytes)()
+            self.stream_stats.record(wire_bytes, content_length(response.headers), reader.done)
+            self.page_stats.bytes = wire_bytes
+            return response.status_code, reader.text()
+        finally:
+            # Closing before the end drops the connection instead of reading the rest
+            response.close()
+
+    def parse_user_posts(self, username, status_code, html, max_posts=5, since_id=None, since_time=None, cap=None):
+        """Posts from an already downloaded profile page, as get_user_posts returns them"""
+        if status_code != 200:
+            raise ScrapeError(f"HTTP {status_code}", status_code)
+        started = time.perf_counter()
+        try:
+            with self.profiler.stage('parse', username):
+                return self._parse_user_posts(username, status_code, html, max_posts, since_id, since_time, cap)
+        finally:
+            self.page_stats.parse_seconds = time.perf_counter() - started
+
+    def _parse_user_posts(self, username, status_code, html, max_posts, since_id, since_time, cap):
+        soup = None
+        try:
+            from bs4 import BeautifulSoup
+            # Parse the HTML to extract tweets
+            soup = BeautifulSoup(html, 'html.parser')
+
+            # The profile header comes with the page, cache it for free
+            self.profile_cache.put(username, parse_profile(soup, username))
+
+            limit = self.read_limit(max_posts, since_id, cap)
+            reached_mark = False
+
+            # Walk tweet containers lazily so a quiet account stops after one or two
+            username = sys.intern(username)
+            tweets = []
+            container = soup.find('article', {'data-testid': 'tweet'})
+            i = 0
+            while container is not None and len(tweets) < limit:
+                try:
+                    # Extract tweet ID from data attributes
+                    tweet_id = container.get('data-tweet-id', f'tweet_{int(time.time())}_{i}')
+                    pinned = is_pinned(container)
+
+                    time_elem = container.find('time')
+                    tweet_time = parse_post_time(time_elem.get('datetime')) if time_elem else None
+
+                    if (since_id and is_known_post(tweet_id, since_id)) or \
+                            (since_time and tweet_time and tweet_time <= since_time):
+                        # Pinned posts sit above the timeline and can be old
+                        if not pinned:
+                            reached_mark = True
+                            break
+                        continue
+
+                    # Extract tweet text
+                    text_elem = container.find('div', {'data-testid': 'tweetText'})
+                    if text_elem:
+                        tweet_text = text_elem.get_text(strip=True)
+                        tweets.append(ScrapedPost(tweet_id, username, tweet_text,
+                                                  tweet_time or datetime.utcnow(), pinned))
+                except Exception as e:
+                    print(f"Error parsing tweet {i}: {e}")
+                finally:
+                    container = container.find_next('article', {'data-testid': 'tweet'})
+                    i += 1
+
+            if since_id and not reached_mark:
+                print(f"⚠️  High-water mark for @{username} not on the page, some posts may have been missed")
+
+            if tweets:
+                print(f"✅ Found {len(tweets)} real posts for @{username}")
+                return tweets
+            elif i:
+                print(f"💤 No new posts for @{username}")
+                return []
+            else:
+                # Protected and suspended accounts, or a Twitter layout change
+                raise ScrapeError("No posts on the profile page", status_code)
+
+        except ScrapeError:
+            raise
+        except Exception as e:
+            raise ScrapeError(str(e)) from e
+        finally:
+            # The tree is one big reference cycle; taking it apart frees it now rather than at the next GC
+            if soup is not None:
+                soup.decompose()
+
+    def get_tweet_details(self, tweet_url):
+        """Get full details of a specific tweet"""
+        try:
+            # Try to get the actual tweet content
+            response = self.fetch(tweet_url)
+            return self.parse_tweet_details(tweet_url, response.status_code, response.text)
+        except Exception as e:
+            print(f"Error getting tweet details for {tweet_url}: {e}")
+            return TweetDetails(f'Tweet from {tweet_url}', tweet_url)
+
+    def parse_tweet_details(self, tweet_url, status_code, html):
+        """TweetDetails from an already downloaded tweet page"""
+        if status_code == 200:
+            from bs4 import BeautifulSoup
+            with self.profiler.stage('parse'):
+                soup = BeautifulSoup(html, 'html.parser')
+                try:
+                    # Look for tweet text
+                    text_elem = soup.find('div', {'data-testid': 'tweetText'})
+                    if text_elem:
+                        tweet_text = text_elem.get_text(strip=True)
+                        return TweetDetails(tweet_text, tweet_url)
+                finally:
+                    soup.decompose()
+
+        # Fallback to basic content
+        return TweetDetails(f'Tweet from {tweet_url}', tweet_url)
+
+
+class MockTwitterScraper(MinimalTwitterScraper):
+    """Returns one fake post per check
+
+    With offline=False profiles are still validated against twitter.com;
+    with offline=True nothing touches the network.
+    """
+
+    def __init__(self, label='mock', offline=False):
+        super().__init__()
+        self.label = label
+        self.offline = offline
+
+    def get_user_profile(self, username):
+        """Get user profile information"""
+        if self.offline:
+            return {
+                'username': username,
+                'display_name': username,
+                'profile_image_url': '',
+                'exists': True
+            }
+        return super().get_user_profile(username)
+
+    def get_user_posts(self, username, max_posts=5, since_id=None, since_time=None, cap=None):
+        """Get recent posts from a user's profile"""
+        prefix = self.label.lower()
+        return [
+            ScrapedPost(
+                f'{prefix}_{int(time.time())}',
+                username,
+                f'{self.label} deployment test from @{username} - {datetime.now().strftime("%Y-%m-%d %H:%M")}',
+                datetime.utcnow()
+            )
+        ]
+
+    def get_tweet_details(self, tweet_url):
+        """Get full details of a specific tweet"""
+        return TweetDetails(f'{self.label} deployment tweet from {tweet_url}', tweet_url)
+
+
+def create_scraper(kind, label=None):
+    if kind == 'twitter':
+        return MinimalTwitterScraper()
+    if kind in ('mock', 'offline'):
+        return MockTwitterScraper(label or 'Mock', offline=kind == 'offline')
+    raise ValueError(f"Unknown scraper '{kind}'")
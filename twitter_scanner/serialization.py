@@ -0,0 +1,98 @@
+"""
+Fast JSON for the list endpoints
+Rows are selected column by column instead of hydrating ORM objects, and
+datetimes are left for the encoder to format in one go: orjson when it is
+installed, the standard library otherwise. The dicts match to_dict().
+"""
+
+import json
+
+from flask import Response
+
+from .models import MonitoredAccount, PostHistory
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ACCOUNT_COLUMNS = (
+    MonitoredAccount.id, MonitoredAccount.username, MonitoredAccount.display_name,
+    MonitoredAccount.profile_image_url, MonitoredAccount.is_active, MonitoredAccount.created_at,
+    MonitoredAccount.last_checked, MonitoredAccount.retention_days, MonitoredAccount.retention_max_posts,
+    MonitoredAccount.last_seen_post_id, MonitoredAccount.last_seen_post_at, MonitoredAccount.notify_mode,
+    MonitoredAccount.group_id, MonitoredAccount.breaker_state, MonitoredAccount.breaker_failures, MonitoredAccount.breaker_status_code,
+    MonitoredAccount.breaker_error, MonitoredAccount.breaker_until,
+)
+
+POST_COLUMNS = (
+    PostHistory.id, PostHistory.account_id, PostHistory.post_id, PostHistory.text,
+    PostHistory.created_at, PostHistory.url, PostHistory.is_notified,
+)
+
+
+def _isoformat(value):
+    try:
+        return value.isoformat()
+    except AttributeError:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data):
+    """JSON bytes; datetimes become ISO 8601 strings like isoformat() gives"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, default=_isoformat, separators=(',', ':')).encode()
+
+
+def json_response(data, status=200):
+    return Response(dumps(data), status=status, mimetype='application/json')
+
+
+def account_dicts(query):
+    """MonitoredAccount.to_dict() for every row of a query, without loading ORM objects"""
+    return [
+        {
+            'id': id_,
+            'username': username,
+            'display_name': display_name,
+            'profile_image_url': profile_image_url,
+            'is_active': is_active,
+            'created_at': created_at,
+            'last_checked': last_checked,
+            'retention_days': retention_days,
+            'retention_max_posts': retention_max_posts,
+            'last_seen_post_id': last_seen_post_id,
+            'last_seen_post_at': last_seen_post_at,
+            'notify_mode': notify_mode,
+            'group_id': group_id,
+            'breaker': {
+                'state': breaker_state or 'closed',
+                'failures': breaker_failures or 0,
+                'status_code': breaker_status_code,
+                'error': breaker_error,
+                'quarantined_until': breaker_until
+            }
+        }
+        for (id_, username, display_name, profile_image_url, is_active, created_at, last_checked,
+             retention_days, retention_max_posts, last_seen_post_id, last_seen_post_at, notify_mode,
+             group_id, breaker_state, breaker_failures, breaker_status_code, breaker_error, breaker_until)
+        in query.with_entities(*ACCOUNT_COLUMNS)
+    ]
+
+
+def post_dicts(query):
+    """PostHistory.to_dict() for every row of a query, without loading ORM objects"""
+    return [
+        {
+            'id': id_,
+            'account_id': account_id,
+            'post_id': post_id,
+            'text': text,
+            'created_at': created_at,
+            'url': url,
+            'is_notified': is_notified
+        }
+        for id_, account_id, post_id, text, created_at, url, is_notified
+        in query.with_entities(*POST_COLUMNS)
+    ]
@@ -0,0 +1,169 @@
+"""
+Streaming profile page downloads
+A profile page is read chunk by chunk and fed to TimelineWatcher, a small
+incremental HTML parser that follows the tweet <article>s going by. As soon
+as the watcher has seen everything parse_user_posts would look at (the
+account's high-water mark, or enough new posts) the download is cut off,
+and only the part already received is handed to the regular parser. Pages
+that run past the size limit are abandoned.
+"""
+
+import codecs
+import threading
+from html.parser import HTMLParser
+
+CHUNK_SIZE = 16 * 1024
+
+
+class BodyTooLarge(Exception):
+    """A streamed page grew past the size limit"""
+
+
+class TimelineWatcher(HTMLParser):
+    """Follows tweet articles as the page streams in; done once the parse has what it needs
+
+    Mirrors parse_user_posts: a finished article that is_known(tweet_id,
+    time_value) reports as seen ends the timeline unless it is pinned, and
+    otherwise articles with text count towards limit.
+    """
+
+    def __init__(self, limit, is_known):
+        super().__init__()
+        self.limit = limit
+        self.is_known = is_known
+        self.done = False
+        self.articles = 0
+        self.new_posts = 0
+        self._article = None
+        self._depth = 0
+        self._context = None
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        attrs = dict(attrs)
+        testid = attrs.get('data-testid')
+        if tag == 'article':
+            if self._article is None:
+                if testid != 'tweet':
+                    return
+                self._article = {'id': attrs.get('data-tweet-id'), 'time': None, 'text': False, 'context': None}
+            self._depth += 1
+            return
+        article = self._article
+        if article is None:
+            return
+        if self._context is not None:
+            if tag == self._context[0]:
+                self._context[1] += 1
+        elif testid == 'socialContext' and article['context'] is None:
+            article['context'] = []
+            self._context = [tag, 1]
+        if tag == 'time' and article['time'] is None:
+            article['time'] = attrs.get('datetime') or ''
+        elif tag == 'div' and testid == 'tweetText':
+            article['text'] = True
+
+    def handle_endtag(self, tag):
+        if self._article is None or self.done:
+            return
+        if self._context is not None and tag == self._context[0]:
+            self._context[1] -= 1
+            if not self._context[1]:
+                self._context = None
+        if tag == 'article':
+            self._depth -= 1
+            if not self._depth:
+                self._finish_article()
+
+    def handle_data(self, data):
+        if self._context is not None:
+            self._article['context'].append(data)
+
+    def _finish_article(self):
+        article, self._article = self._article, None
+        self._context = None
+        self.articles += 1
+        pinned = 'pinned' in ''.join(article['context'] or ()).lower()
+        try:
+            # Articles without an id get a made-up one, which is never known
+            known = article['id'] is not None and self.is_known(article['id'], article['time'])
+        except Exception:
+            # parse_user_posts skips articles it can't make sense of
+            return
+        if known:
+            if not pinned:
+                self.done = True
+            return
+        if article['text']:
+            self.new_posts += 1
+            if self.new_posts >= self.limit:
+                self.done = True
+
+
+class TimelineReader:
+    """Decodes and collects a streamed page until its watcher is done"""
+
+    def __init__(self, watcher, encoding=None, max_bytes=None):
+        self.watcher = watcher
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._decoder = codecs.getincrementaldecoder(encoding or 'utf-8')('replace')
+        self._parts = []
+
+    @property
+    def done(self):
+        return self.watcher.done
+
+    def feed(self, chunk):
+        """Take the next chunk of the body; True once the rest isn't needed"""
+        self.bytes += len(chunk)
+        if self.max_bytes and self.bytes > self.max_bytes:
+            raise BodyTooLarge(f"Page is larger than {self.max_bytes} bytes")
+        text = self._decoder.decode(chunk)
+        self._parts.append(text)
+        self.watcher.feed(text)
+        return self.watcher.done
+
+    def text(self):
+        self._parts.append(self._decoder.decode(b'', final=True))
+        return ''.join(self._parts)
+
+
+class StreamStats:
+    """Running totals of streamed page downloads"""
+
+    FIELDS = ('pages', 'cut_short', 'bytes_read', 'bytes_saved')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.cut_short = 0
+        self.bytes_read = 0
+        self.bytes_saved = 0
+
+    def record(self, bytes_read, content_length=None, cut_short=False):
+        """Count one download; saved bytes are only known when the server sent Content-Length"""
+        with self._lock:
+            self.pages += 1
+            self.bytes_read += bytes_read
+            if cut_short:
+                self.cut_short += 1
+                if content_length:
+                    self.bytes_saved += max(0, content_length - bytes_read)
+
+    def snapshot(self):
+        with self._lock:
+            return {field: getattr(self, field) for field in self.FIELDS}
+
+    def since(self, snapshot):
+        """Totals accumulated since an earlier snapshot()"""
+        current = self.snapshot()
+        return {field: current[field] - snapshot[field] for field in self.FIELDS}
+
+
+def content_length(headers):
+    try:
+        return int(headers.get('Content-Length'))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,264 @@
+"""
+Durable scan queue
+Scan work is stored as one ScanTask row per account check, so any number of
+worker processes (scan_worker.py) can share it and a crash loses nothing but
+the leases it held. On PostgreSQL tasks are claimed with SELECT ... FOR
+UPDATE SKIP LOCKED; SQLite has no row locks, but a claim there is a single
+UPDATE statement and SQLite runs one writer at a time. A leased task whose
+worker dies becomes claimable again after the visibility timeout. Failures
+are retried with exponential backoff and dead-lettered after max_attempts.
+"""
+
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, func, or_, select, update
+
+from .models import db, MonitoredAccount, ScanTask
+
+QUEUED = 'queued'
+LEASED = 'leased'
+DONE = 'done'
+DEAD = 'dead'
+TASK_STATES = (QUEUED, LEASED, DONE, DEAD)
+
+
+class ScanQueue:
+    """Enqueue, claim, finish and dead-letter ScanTask rows; call inside an app context"""
+
+    def __init__(self, visibility_timeout=300, max_attempts=5, retry_backoff=30, keep_done_hours=24, groups=None):
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = retry_backoff
+        self.keep_done_hours = keep_done_hours
+        # FairScheduler whose group policies decide what a pass queues, and in what order
+        self.groups = groups
+
+    @classmethod
+    def from_env(cls, groups=None):
+        return cls(
+            visibility_timeout=int(os.getenv('SCAN_QUEUE_VISIBILITY_SECONDS', '300')),
+            max_attempts=int(os.getenv('SCAN_QUEUE_MAX_ATTEMPTS', '5')),
+            retry_backoff=int(os.getenv('SCAN_QUEUE_RETRY_BACKOFF_SECONDS', '30')),
+            keep_done_hours=int(os.getenv('SCAN_QUEUE_KEEP_DONE_HOURS', '24')),
+            groups=groups
+        )
+
+    def enqueue_pass(self, now=None):
+        """Queue a check for every active account without one pending; returns how many were queued"""
+        now = now or datetime.utcnow()
+        pending = select(ScanTask.account_id).where(ScanTask.state.in_((QUEUED, LEASED)))
+        rows = db.session.query(MonitoredAccount.id, MonitoredAccount.group_id, MonitoredAccount.last_checked).filter(
+            MonitoredAccount.is_active.is_(True), MonitoredAccount.id.not_in(pending)
+        ).order_by(MonitoredAccount.last_checked.asc(), MonitoredAccount.id).all()
+        # Ids follow the plan, so workers claim accounts in fair order across groups
+        if self.groups is not None:
+            self.groups.load()
+            account_ids, _ = self.groups.plan(rows, now)
+        else:
+            account_ids = [account_id for account_id, _, _ in rows]
+
+        db.session.bulk_insert_mappings(ScanTask, [
+            {'account_id': account_id, 'state': QUEUED, 'attempts': 0, 'available_at': now, 'created_at': now}
+            for account_id in account_ids
+        ])
+        self.purge(now)
+        db.session.commit()
+        return len(account_ids)
+
+    def _claimable(self, now):
+        return or_(
+            and_(ScanTask.state == QUEUED, ScanTask.available_at <= now),
+            and_(ScanTask.state == LEASED, ScanTask.leased_until <= now)
+        )
+
+    def claim(self, owner, limit=1, now=None):
+        """Lease up to `limit` due tasks to owner, oldest first"""
+        now = now or datetime.utcnow()
+        leased_until = now + timedelta(seconds=self.visibility_timeout)
+
+        # Leases that expired on their last attempt go to the dead letters, not back to work
+        db.session.execute(update(ScanTask).where(
+            ScanTask.state == LEASED, ScanTask.leased_until <= now, ScanTask.attempts >= self.max_attempts
+        ).values(state=DEAD, finished_at=now, lease_owner=None, leased_until=None,
+                 last_error='Lease expired on the last attempt'), execution_options={'synchronize_session': False})
+
+        candidates = select(ScanTask.id).where(self._claimable(now)) \
+            .order_by(ScanTask.available_at, ScanTask.id).limit(limit)
+        if db.engine.dialect.name == 'postgresql':
+            # Concurrent workers skip each other's rows instead of queueing behind them
+            candidates = candidates.with_for_update(skip_locked=True)
+        # Repeating the condition makes the UPDATE a compare-and-set where there are no row locks
+        db.session.execute(update(ScanTask).where(ScanTask.id.in_(candidates), self._claimable(now)).values(
+            state=LEASED, lease_owner=owner, leased_until=leased_until, attempts=ScanTask.attempts + 1
+        ), execution_options={'synchronize_session': False})
+        db.session.commit()
+
+        return ScanTask.query.filter_by(state=LEASED, lease_owner=owner, leased_until=leased_until) \
+            .order_by(ScanTask.available_at, ScanTask.id).all()
+
+    def _finish(self, task, owner, **values):
+        """Update a task only while owner still holds its lease; False if the lease was lost"""
+        result = db.session.execute(update(ScanTask).where(
+            ScanTask.id == task.id, ScanTask.state == LEASED, ScanTask.lease_owner == owner
+        ).values(**values), execution_options={'synchronize_session': False})
+        db.session.commit()
+        db.session.expire(task)
+        return bool(result.rowcount)
+
+    def extend(self, task, owner, now=None):
+        """Push the lease back by another visibility timeout"""
+        now = now or datetime.utcnow()
+        return self._finish(task, owner, leased_until=now + timedelta(seconds=self.visibility_timeout))
+
+    def complete(self, task, owner, now=None):
+        return self._finish(task, owner, state=DONE, finished_at=now or datetime.utcnow(),
+                            lease_owner=None, leased_until=None)
+
+    def release(self, task, owner):
+        """Hand an unstarted task back without using up an attempt, e.g. on shutdown"""
+        return self._finish(task, owner, state=QUEUED, attempts=ScanTask.attempts - 1,
+                            lease_owner=None, leased_until=None)
+
+    def fail(self, task, owner, error, now=None):
+        """Retry later with backoff, or dead-letter once the attempts are used up"""
+        now = now or datetime.utcnow()
+        attempts = task.attempts
+        values = {'lease_owner': None, 'leased_until': None, 'last_error': str(error)[:500]}
+        if attempts >= self.max_attempts:
+            values.update(state=DEAD, finished_at=now)
+        else:
+            values.update(state=QUEUED,
+                          available_at=now + timedelta(seconds=self.retry_backoff * 2 ** (attempts - 1)))
+        return self._finish(task, owner, **values)
+
+    def requeue_dead(self, task_ids=None, now=None):
+        """Give dead-lettered tasks a fresh set of attempts; returns how many"""
+        query = ScanTask.query.filter_by(state=DEAD)
+        if task_ids:
+            query = query.filter(ScanTask.id.in_(task_ids))
+        count = query.update({'state': QUEUED, 'attempts': 0, 'available_at': now or datetime.utcnow(),
+                              'finished_at': None}, synchronize_session=False)
+        db.session.commit()
+        return count
+
+    def purge(self, now=None):
+        """Delete finished tasks older than keep_done_hours; dead letters stay until requeued"""
+        cutoff = (now or datetime.utcnow()) - timedelta(hours=self.keep_done_hours)
+        return ScanTask.query.filter(ScanTask.state == DONE, ScanTask.finished_at < cutoff) \
+            .delete(synchronize_session=False)
+
+    def stats(self, now=None):
+        """Task counts by state, how long the oldest due task has waited and recent dead letters"""
+        now = now or datetime.utcnow()
+        counts = dict(db.session.query(ScanTask.state, func.count(ScanTask.id)).group_by(ScanTask.state).all())
+        oldest = db.session.query(func.min(ScanTask.available_at)) \
+            .filter(ScanTask.state == QUEUED, ScanTask.available_at <= now).scalar()
+        dead = ScanTask.query.filter_by(state=DEAD).order_by(ScanTask.finished_at.desc()).limit(20)
+        return {
+            'counts': {state: counts.get(state, 0) for state in TASK_STATES},
+            'oldest_due_seconds': round((now - oldest).total_seconds(), 1) if oldest else None,
+            'dead_letters': [task.to_dict() for task in dead],
+        }
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class ScanWorker:
+    """Claims ScanTasks and runs Scanner.check_account for each"""
+
+    def __init__(self, app, queue=None, worker_id=None, batch_size=5, poll_interval=2):
+        self.app = app
+        services = app.extensions['twitter_scanner']
+        self.scanner = services.scanner
+        self.queue = queue or services.scan_queue
+        self.worker_id = worker_id or default_worker_id()
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.stopping = threading.Event()
+        self.completed = 0
+        self.failed = 0
+        self.new_posts = 0
+
+    def stop(self):
+        """Finish the current task, hand back the rest of the batch and exit"""
+        self.stopping.set()
+
+    def run_task(self, task):
+        """Check one task's account; the task is completed, or failed if anything raised"""
+        try:
+            account = db.session.get(MonitoredAccount, task.account_id)
+            if account is None or not account.is_active:
+                pass
+            elif not self.scanner.breaker.allow(account):
+                print(f"⏸️  Skipping @{account.username}, quarantined until "
+                      f"{account.breaker_until:%Y-%m-%d %H:%M} UTC")
+            else:
+                print(f"📱 Checking @{account.username}...")
+                self.new_posts += self.scanner.check_account(account)
+            if self.queue.complete(task, self.worker_id):
+                self.completed += 1
+            else:
+                print(f"⚠️  Lease on task {task.id} expired before it finished, another worker may redo it")
+        except Exception as e:
+            print(f"❌ Error in scan task {task.id}: {e}")
+            db.session.rollback()
+            self.failed += 1
+            self.queue.fail(task, self.worker_id, e)
+
+    def run_batch(self):
+        """Claim and run up to batch_size tasks; returns how many were claimed"""
+        with self.app.app_context():
+            self.scanner.refresh_rules()
+            self.scanner.refresh_groups()
+            # Other workers store posts too; near-duplicates of theirs should be caught here
+            self.scanner.sync_dedup_index()
+            tasks = self.queue.claim(self.worker_id, limit=self.batch_size)
+            # Workers have no passes, each batch is profiled as one
+            if tasks:
+                self.scanner.profiler.begin_pass('worker')
+                self.scanner.ledger.begin_run('worker')
+            for i, task in enumerate(tasks):
+                if self.stopping.is_set():
+                    for unstarted in tasks[i:]:
+                        self.queue.release(unstarted, self.worker_id)
+                    break
+                # The batch's later tasks have been waiting on the earlier ones
+                if i:
+                    self.queue.extend(task, self.worker_id)
+                self.run_task(task)
+                self.scanner.digest.flush_if_due()
+                if i < len(tasks) - 1:
+                    self.stopping.wait(self.scanner.scan_delay)
+            if tasks:
+                self.scanner.profiler.end_pass()
+                self.scanner.ledger.finish_run()
+            return len(tasks)
+
+    def run(self, once=False):
+        """Work until stop(), or with once=True until nothing is due"""
+        print(f"👷 Scan worker {self.worker_id} started")
+        with self.app.app_context():
+            self.scanner.ensure_dedup_index()
+
+        while not self.stopping.is_set():
+            try:
+                claimed = self.run_batch()
+            except Exception as e:
+                print(f"❌ Error in scan worker: {e}")
+                claimed = 0
+            if not claimed:
+                if once:
+                    break
+                self.stopping.wait(self.poll_interval)
+
+        # Nothing buffered may be left behind when the process exits
+        self.scanner.digest.flush()
+        self.scanner.router.drain(self.app.config['NOTIFY_DRAIN_SECONDS'])
+        print(f"👋 Scan worker {self.worker_id} stopped: {self.completed} tasks done, "
+              f"{self.failed} failed, {self.new_posts} new posts")
+        return {'completed': self.completed, 'failed': self.failed, 'new_posts': self.new_posts}